@@ -38,6 +38,12 @@ DEFAULT_CONFIG = {
     ################
     "MONGO": "",
     "MONGO_TIMEOUT": 30,
+    "MONGO_WRITE_BEHIND_INTERVAL": 0,
+    "SETTINGS_CACHE_TTL": 300,
+    "SETTINGS_CACHE_MAX_SIZE": 20000,
+    "PREFIX_CACHE_TTL": 1800,
+    "PREFIX_CACHE_MAX_SIZE": 50000,
+    "LOCAL_DATABASE_SQLITE": False,
     "SENSITIVE_INFO_WARN": True,
 
     ####################
@@ -66,6 +72,34 @@ DEFAULT_CONFIG = {
     "PLAYER_INFO_BACKUP_INTERVAL": 45,
     "PLAYER_INFO_BACKUP_INTERVAL_MONGO": 300,
     "PLAYER_SESSIONS_MONGODB": False,
+    "PLAYER_SESSIONS_MONGO_FLUSH_DELAY": 10,
+    "PLAYER_SESSIONS_JOURNAL": False,
+    "PLAYER_SESSIONS_SQLITE": False,
+    "PLAYER_SESSIONS_JOURNAL_COMPACT": 50,
+    "PLAYER_RESUME_CONCURRENCY": 8,
+    "PLAYER_RESUME_NODE_CONCURRENCY": 4,
+    "PLAYER_RESUME_VOICE_RATE": 30,
+    "HTTP_POOL_LIMIT": 200,
+    "HTTP_POOL_LIMIT_PER_HOST": 30,
+    "HTTP_DNS_CACHE_TTL": 300,
+    "HTTP_KEEPALIVE_TIMEOUT": 60,
+    "LAVALINK_NODE_REQUEST_LIMIT": 10,
+    "LAVALINK_EVENT_QUEUE_SIZE": 2000,
+    "LAVALINK_EVENT_LANE_TIMEOUT": 10,
+    "LAVALINK_PLAYER_UPDATE_TICK_MS": 1000,
+    "LAVALINK_JSON_CODEC": "auto",
+    "TRACK_CACHE_TTL": 259200,
+    "TRACK_CACHE_SEARCH_TTL": 3600,
+    "TRACK_CACHE_PLAYLIST_TTL": 1800,
+    "TRACK_CACHE_MAX_SIZE": 5000,
+    "TRACK_CACHE_DISK_MAX_SIZE": 100000,
+    "TRACK_INDEX_TTL": 2592000,
+    "TRACK_INDEX_CACHE_SIZE": 20000,
+    "AUTOCOMPLETE_CACHE_TTL": 600,
+    "AUTOCOMPLETE_CACHE_SIZE": 5000,
+    "AUTOCOMPLETE_TIMEOUT_MS": 2000,
+    "PARTIALTRACK_PREFETCH": 3,
+    "PARTIALTRACK_PREFETCH_NODE_CONCURRENCY": 4,
     "QUEUE_MAX_ENTRIES": 0,
     "ENABLE_DEFER_TYPING": True,
     "DEFAULT_SEARCH_PROVIDER": "ytsearch",
@@ -75,6 +109,8 @@ DEFAULT_CONFIG = {
     ######################################
     "SPOTIFY_CLIENT_ID": '',
     "SPOTIFY_CLIENT_SECRET": '',
+    "SPOTIFY_PAGE_CONCURRENCY": 4,
+    "SPOTIFY_CACHE_SIZE": 2000,
     "PARTIALTRACK_SEARCH_PROVIDER": "ytsearch",
 
     ###########################################
@@ -137,6 +173,9 @@ DEFAULT_CONFIG = {
     ### Tests ####
     ##############
     "USE_YTDL": False,
+    "YTDL_PROCESS_WORKERS": 0,
+    "YTDL_TIMEOUT": 30,
+    "YTDL_MAX_CONCURRENCY": 8,
     "SILENT_PUBLICBOT_WARNING": False
 }
 
@@ -186,12 +225,47 @@ def load_config():
         "PRESENCE_INTERVAL",
         "HINT_RATE",
         "MONGO_TIMEOUT",
+        "MONGO_WRITE_BEHIND_INTERVAL",
+        "SETTINGS_CACHE_TTL",
+        "SETTINGS_CACHE_MAX_SIZE",
+        "PREFIX_CACHE_TTL",
+        "PREFIX_CACHE_MAX_SIZE",
         "INVITE_PERMISSIONS",
         "PREFIXED_POOL_TIMEOUT",
         "PLAYER_INFO_BACKUP_INTERVAL",
         "PLAYER_INFO_BACKUP_INTERVAL_MONGO",
+        "PLAYER_SESSIONS_JOURNAL_COMPACT",
+        "PLAYER_SESSIONS_MONGO_FLUSH_DELAY",
+        "PLAYER_RESUME_CONCURRENCY",
+        "PLAYER_RESUME_NODE_CONCURRENCY",
+        "PLAYER_RESUME_VOICE_RATE",
+        "HTTP_POOL_LIMIT",
+        "HTTP_POOL_LIMIT_PER_HOST",
+        "HTTP_DNS_CACHE_TTL",
+        "HTTP_KEEPALIVE_TIMEOUT",
+        "LAVALINK_NODE_REQUEST_LIMIT",
+        "LAVALINK_EVENT_QUEUE_SIZE",
+        "LAVALINK_EVENT_LANE_TIMEOUT",
+        "LAVALINK_PLAYER_UPDATE_TICK_MS",
+        "TRACK_CACHE_TTL",
+        "TRACK_CACHE_SEARCH_TTL",
+        "TRACK_CACHE_PLAYLIST_TTL",
+        "TRACK_CACHE_MAX_SIZE",
+        "TRACK_CACHE_DISK_MAX_SIZE",
+        "TRACK_INDEX_TTL",
+        "TRACK_INDEX_CACHE_SIZE",
+        "AUTOCOMPLETE_CACHE_TTL",
+        "AUTOCOMPLETE_CACHE_SIZE",
+        "AUTOCOMPLETE_TIMEOUT_MS",
+        "PARTIALTRACK_PREFETCH",
+        "PARTIALTRACK_PREFETCH_NODE_CONCURRENCY",
         "LAVALINK_RECONNECT_RETRIES",
         "QUEUE_MAX_ENTRIES",
+        "SPOTIFY_PAGE_CONCURRENCY",
+        "SPOTIFY_CACHE_SIZE",
+        "YTDL_PROCESS_WORKERS",
+        "YTDL_TIMEOUT",
+        "YTDL_MAX_CONCURRENCY",
     ]:
         try:
             CONFIG[i] = int(CONFIG[i])
@@ -215,7 +289,10 @@ def load_config():
         "ADD_REGISTER_COMMAND",
         "ENABLE_DISCORD_URLS_PLAYBACK",
         "PLAYER_SESSIONS_MONGODB",
+        "PLAYER_SESSIONS_JOURNAL",
+        "PLAYER_SESSIONS_SQLITE",
         "SENSITIVE_INFO_WARN",
+        "LOCAL_DATABASE_SQLITE",
         "ENABLE_DEFER_TYPING",
 
         "BANS_INTENT",
@@ -268,6 +345,11 @@ def load_config():
     if CONFIG["PLAYER_INFO_BACKUP_INTERVAL_MONGO"] < 120:
         CONFIG["PLAYER_INFO_BACKUP_INTERVAL_MONGO"] = 120
 
+    for i in ("PLAYER_RESUME_CONCURRENCY", "PLAYER_RESUME_NODE_CONCURRENCY", "PLAYER_RESUME_VOICE_RATE",
+              "PARTIALTRACK_PREFETCH_NODE_CONCURRENCY", "SPOTIFY_PAGE_CONCURRENCY"):
+        if CONFIG[i] < 1:
+            CONFIG[i] = 1
+
     if CONFIG["LAVALINK_RECONNECT_RETRIES"] < 5:
         CONFIG["LAVALINK_RECONNECT_RETRIES"] = 0
 
@@ -6,7 +6,6 @@ import traceback
 from typing import TYPE_CHECKING, Optional
 
 import disnake
-from aiohttp import ClientSession
 from disnake.ext import commands
 
 from utils.music.converters import URL_REG
@@ -128,6 +127,7 @@ class ErrorHandler(commands.Cog):
             traceback.print_exc()
 
         if kill_process:
+            await self.bot.pool.flush_database()
             await asyncio.create_subprocess_shell("kill 1")
             return
 
@@ -230,6 +230,7 @@ class ErrorHandler(commands.Cog):
         await func(components=components, **kwargs)
 
         if kill_process:
+            await self.bot.pool.flush_database()
             await asyncio.create_subprocess_shell("kill 1")
             return
 
@@ -430,9 +431,8 @@ class ErrorHandler(commands.Cog):
         if file:
             kwargs["file"] = file
 
-        async with ClientSession() as session:
-            webhook = disnake.Webhook.from_url(self.bot.config["AUTO_ERROR_REPORT_WEBHOOK"], session=session)
-            await webhook.send(**kwargs)
+        webhook = disnake.Webhook.from_url(self.bot.config["AUTO_ERROR_REPORT_WEBHOOK"], session=self.bot.session)
+        await webhook.send(**kwargs)
 
 
 def setup(bot: BotCore):
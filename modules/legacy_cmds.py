@@ -581,7 +581,6 @@ class Owner(commands.Cog):
             guild_data = await self.bot.get_global_data(ctx.guild.id, db_name=DBModel.guilds)
             ctx.global_guild_data = guild_data
 
-        self.bot.pool.guild_prefix_cache[ctx.guild.id] = prefix
         guild_data["prefix"] = prefix
         await self.bot.update_global_data(ctx.guild.id, guild_data, db_name=DBModel.guilds)
 
@@ -612,7 +611,6 @@ class Owner(commands.Cog):
             raise GenericError("**No prefix configured in the server.**")
 
         guild_data["prefix"] = ""
-        self.bot.pool.guild_prefix_cache[ctx.guild.id] = ""
 
         await self.bot.update_global_data(ctx.guild.id, guild_data, db_name=DBModel.guilds)
 
@@ -645,7 +643,6 @@ class Owner(commands.Cog):
             ctx.global_user_data = user_data
 
         user_data["custom_prefix"] = prefix
-        self.bot.pool.user_prefix_cache[ctx.author.id] = prefix
         await self.bot.update_global_data(ctx.author.id, user_data, db_name=DBModel.users)
 
         prefix = disnake.utils.escape_markdown(prefix)
@@ -672,7 +669,6 @@ class Owner(commands.Cog):
             raise GenericError("**You do not have a configured prefix.**")
 
         user_data["custom_prefix"] = ""
-        self.bot.pool.user_prefix_cache[ctx.author.id] = ""
         await self.bot.update_global_data(ctx.author.id, user_data, db_name=DBModel.users)
 
         embed = disnake.Embed(
@@ -709,8 +705,6 @@ class Owner(commands.Cog):
             await self.bot.update_global_data(server_id, guild_data, db_name=DBModel.guilds)
             embed.description = f"**The prefix for the server with the specified ID is now:** {disnake.utils.escape_markdown(prefix)}"
 
-        self.bot.pool.guild_prefix_cache[ctx.guild.id] = prefix
-
         await ctx.send(embed=embed)
 
     @commands.is_owner()
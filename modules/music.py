@@ -32,8 +32,9 @@ from utils.music.errors import GenericError, MissingVoicePerms, NoVoice, PoolExc
     EmptyFavIntegration
 from utils.music.interactions import VolumeInteraction, QueueInteraction, SelectInteraction, FavMenuView, ViewMode, \
     SetStageTitle, SelectBotVoice
-from utils.music.models import LavalinkPlayer, LavalinkTrack, LavalinkPlaylist, PartialTrack
+from utils.music.models import LavalinkPlayer, LavalinkTrack, LavalinkPlaylist, PartialTrack, PartialPlaylist
 from utils.music.spotify import process_spotify, spotify_regex_w_user
+from utils.music.track_queue import iter_queue, match_tracks
 from utils.others import check_cmd, send_idle_embed, CustomContext, PlayerControls, queue_track_index, \
     pool_command, string_to_file, CommandArgparse, music_source_emoji_url, SongRequestPurgeMode, song_request_buttons, \
     select_bot_pool, get_inter_guild_data, update_inter, ProgressBar
@@ -116,7 +117,7 @@ class Music(commands.Cog):
             pass
 
         for t in tracks:
-            tinfo = {"track": t.id, "info": t.info}
+            tinfo = {"track": t.id, "info": t.to_dict()}
             tinfo["info"]["extra"]["playlist"] = {"name": t.playlist_name, "url": t.playlist_url}
             tracks_info.append(tinfo)
 
@@ -180,7 +181,7 @@ class Music(commands.Cog):
                     pass
 
                 for t in tracks:
-                    tinfo = {"track": t.id, "info": t.info}
+                    tinfo = {"track": t.id, "info": t.to_dict()}
                     tinfo["info"]["extra"]["playlist"] = {"name": t.playlist_name, "url": t.playlist_url}
                     tracks_info.append(tinfo)
 
@@ -420,7 +421,7 @@ class Music(commands.Cog):
         except AttributeError:
             return [current[:99]]
 
-        return await google_search(bot, current)
+        return await google_search(bot, current, user_id=inter.author.id)
 
     @is_dj()
     @has_player()
@@ -683,6 +684,38 @@ class Music(commands.Cog):
         await self.play.callback(self=self, inter=inter, query="", position=position, options=False, force_play=force_play,
                                  manual_selection=False, source=None, repeat_amount=repeat_amount, server=server)
 
+    async def enqueue_remaining_tracks(self, player: LavalinkPlayer, playlist: PartialPlaylist, loaded: int):
+
+        try:
+            await playlist.loading_task
+        except Exception:
+            traceback.print_exc()
+
+        if player.is_closing or not (tracks := playlist.tracks[loaded:]):
+            return
+
+        # the remaining tracks are added right after the loaded tracks of the playlist that are still in the
+        # queue (tracks added in the meantime stay after the playlist).
+        index = 0
+
+        for t in reversed(playlist.tracks[:loaded]):
+            try:
+                index = player.queue.index(t) + 1
+                break
+            except ValueError:
+                continue
+
+        if index >= len(player.queue):
+            player.queue.extend(tracks)
+        else:
+            for i, t in enumerate(tracks, start=index):
+                player.queue.insert(i, t)
+
+        player.update = True
+
+        if not player.current and not player.locked:
+            await player.process_next()
+
     async def check_player_queue(self, user: disnake.User, bot: BotCore, guild_id: int, tracks: Union[list, LavalinkPlaylist] = None):
 
         count = self.bot.config["QUEUE_MAX_ENTRIES"]
@@ -1279,7 +1312,7 @@ class Music(commands.Cog):
                     except:
                         pass
 
-                    result = await self.bot.loop.run_in_executor(None, lambda: self.bot.spotify.user_playlists(user_id))
+                    result = await self.bot.spotify.user_playlists(user_id)
 
                     info = {"entries": [{"title": t["name"], "url": t["external_urls"]["spotify"]} for t in result["items"]]}
 
@@ -1295,7 +1328,7 @@ class Music(commands.Cog):
                     except:
                         pass
 
-                    info = await loop.run_in_executor(None, lambda: self.bot.pool.ytdl.extract_info(query, download=False))
+                    info = await self.bot.pool.ytdl.extract(query, loop=loop)
 
                     try:
                         if not info["entries"]:
@@ -1486,7 +1519,10 @@ class Music(commands.Cog):
             await inter.response.defer(ephemeral=ephemeral)
 
         if not queue_loaded:
-            tracks, node = await self.get_tracks(query, inter.author, node=node, track_loops=repeat_amount, source=source, bot=bot)
+            # the remaining pages of large playlists are added to the queue in background (only when no
+            # option/position/queue limit needs the full list before adding).
+            tracks, node = await self.get_tracks(query, inter.author, node=node, track_loops=repeat_amount, source=source, bot=bot,
+                                                 progressive=not options and position < 1 and self.bot.config["QUEUE_MAX_ENTRIES"] < 1)
             tracks = await self.check_player_queue(inter.author, bot, guild.id, tracks)
 
         try:
@@ -1726,6 +1762,9 @@ class Music(commands.Cog):
                     tracks.tracks.reverse()
                 for track in tracks.tracks:
                     player.queue.append(track)
+
+                if isinstance(tracks, PartialPlaylist) and tracks.loading_task and not tracks.loading_task.done():
+                    self.bot.loop.create_task(self.enqueue_remaining_tracks(player, tracks, loaded=len(tracks.tracks)))
             else:
                 if options != "reversed":
                     tracks.tracks.reverse()
@@ -1747,7 +1786,9 @@ class Music(commands.Cog):
 
             loadtype = "playlist"
 
-            log_text = f"{inter.author.mention} added the playlist [`{fix_characters(tracks.name, 20)}`]({tracks.url}){pos_txt} `({len(tracks.tracks)})`."
+            track_count = tracks.track_count if isinstance(tracks, PartialPlaylist) else len(tracks.tracks)
+
+            log_text = f"{inter.author.mention} added the playlist [`{fix_characters(tracks.name, 20)}`]({tracks.url}){pos_txt} `({track_count})`."
 
             total_duration = 0
 
@@ -1767,7 +1808,7 @@ class Music(commands.Cog):
                     icon_url=music_source_image(tracks.tracks[0].info['sourceName'])
                 )
             embed.set_thumbnail(url=tracks.thumb)
-            embed.description = f"`{len(tracks.tracks)} song(s)`**┃**`{time_format(total_duration)}`**┃**{inter.author.mention}"
+            embed.description = f"`{track_count} song(s)`**┃**`{time_format(total_duration)}`**┃**{inter.author.mention}"
             emoji = "🎶"
 
             if reg_query is not None:
@@ -1875,7 +1916,7 @@ class Music(commands.Cog):
         if not vc or not query:
             return favs[:20]
 
-        return await google_search(self.bot, query, max_entries=20) or favs[:20]
+        return await google_search(self.bot, query, max_entries=20, user_id=inter.author.id) or favs[:20]
 
     skip_back_cd = commands.CooldownMapping.from_cooldown(2, 13, commands.BucketType.member)
     skip_back_mc = commands.MaxConcurrency(1, per=commands.BucketType.member, wait=False)
@@ -2060,7 +2101,7 @@ class Music(commands.Cog):
                 player.loop = False
 
         try:
-            (player.current or player.last_track).info["extra"]["track_loops"] = 0
+            (player.current or player.last_track).track_loops = 0
         except AttributeError:
             pass
 
@@ -2548,12 +2589,12 @@ class Music(commands.Cog):
 
         if mode == 'off':
             mode = False
-            player.current.info["extra"]["track_loops"] = 0
+            player.current.track_loops = 0
             emoji = "⭕"
             txt = ['disabled loop.', f"{emoji} **⠂{inter.author.mention} disabled loop.**"]
 
         elif mode == "current":
-            player.current.info["extra"]["track_loops"] = 0
+            player.current.track_loops = 0
             emoji = "🔂"
             txt = ["enabled loop for the current song.",
                    f"{emoji} **⠂{inter.author.mention} enabled loop for the current song.**"]
@@ -2588,7 +2629,7 @@ class Music(commands.Cog):
 
         player: LavalinkPlayer = bot.music.players[inter.guild_id]
 
-        player.current.info["extra"]["track_loops"] = value
+        player.current.track_loops = value
 
         txt = [
             f"set the number of loops for the song "
@@ -2759,7 +2800,7 @@ class Music(commands.Cog):
 
         player: LavalinkPlayer = bot.music.players[inter.guild_id]
 
-        track = (player.queue + player.queue_autoplay)[index]
+        track = player.queue[index] if index < len(player.queue) else player.queue_autoplay[index - len(player.queue)]
 
         if index <= 0:
             raise GenericError(f"**The song **[`{track.title}`]({track.uri or track.search_uri}) is already next in the queue.")
@@ -2960,10 +3001,10 @@ class Music(commands.Cog):
         components = [disnake.ui.Button(custom_id=f"np_{inter.author.id}", label="Update", emoji="🔄")]
 
         if player.queue or player.queue_autoplay:
-            txt += f"### 🎶 ⠂Next songs ({(qsize:=len(player.queue + player.queue_autoplay))}):\n" + ("\n> `" + ("-"*38) + "`\n").join(
+            txt += f"### 🎶 ⠂Next songs ({(qsize:=len(player.queue) + len(player.queue_autoplay))}):\n" + ("\n> `" + ("-"*38) + "`\n").join(
                 f"> `{n+1})` [`{fix_characters(t.title, limit=38)}`]({t.uri})\n" \
                 f"> `⏲️ {time_format(t.duration) if not t.is_stream else '🔴 Live'}`" + (f" - `Repetitions: {t.track_loops}`" if t.track_loops else "") + \
-                f" **|** " + (f"`✋` <@{t.requester}>" if not t.autoplay else f"`👍⠂Recommended`") for n, t in enumerate(itertools.islice(player.queue + player.queue_autoplay, 3))
+                f" **|** " + (f"`✋` <@{t.requester}>" if not t.autoplay else f"`👍⠂Recommended`") for n, t in enumerate(itertools.islice(iter_queue(player), 3))
             )
 
             if qsize > 3:
@@ -3285,16 +3326,18 @@ class Music(commands.Cog):
         tracks = []
 
         if player.current:
-            player.current.info["id"] = player.current.id
+            info = player.current.to_dict()
+            info["id"] = player.current.id
             if player.current.playlist:
-                player.current.info["playlist"] = {"name": player.current.playlist_name, "url": player.current.playlist_url}
-            tracks.append(player.current.info)
+                info["playlist"] = {"name": player.current.playlist_name, "url": player.current.playlist_url}
+            tracks.append(info)
 
         for t in player.queue:
-            t.info["id"] = t.id
+            info = t.to_dict()
+            info["id"] = t.id
             if t.playlist:
-                t.info["playlist"] = {"name": t.playlist_name, "url": t.playlist_url}
-            tracks.append(t.info)
+                info["playlist"] = {"name": t.playlist_name, "url": t.playlist_url}
+            tracks.append(info)
 
         if len(tracks) < 3:
             raise GenericError(f"**You need to have at least 3 songs to save (current and/or in the queue)**")
@@ -3373,7 +3416,7 @@ class Music(commands.Cog):
         if len(player.queue) < 3:
             raise GenericError("**The queue must have at least 3 songs to be shuffled.**")
 
-        shuffle(player.queue)
+        player.queue.shuffle()
 
         await self.interaction_message(
             inter,
@@ -4177,33 +4220,13 @@ class Music(commands.Cog):
         except KeyError:
             return
 
-        results = []
-
-        count = 0
+        results = [f"{track.title[:81]} || ID > {track.unique_id}" for track in player.queue.search(query, limit=20)]
 
-        for track in player.queue + player.queue_autoplay:
+        if len(results) < 20:
+            results.extend(f"{track.title[:81]} || ID > {track.unique_id}" for track in
+                           match_tracks(player.queue_autoplay, query)[:20 - len(results)])
 
-            if count == 20:
-                break
-
-            title = track.title.lower().split()
-
-            query_words = query.lower().split()
-
-            word_count = 0
-
-            for query_word in query.lower().split():
-                for title_word in title:
-                    if query_word in title_word:
-                        title.remove(title_word)
-                        word_count += 1
-                        break
-
-            if word_count == len(query_words):
-                results.append(f"{track.title[:81]} || ID > {track.unique_id}")
-                count += 1
-
-        return results or [f"{track.title[:81]} || ID > {track.unique_id}" for n, track in enumerate(player.queue + player.queue_autoplay)
+        return results or [f"{track.title[:81]} || ID > {track.unique_id}" for track in iter_queue(player)
                            if query.lower() in track.title.lower()][:20]
 
     @move.autocomplete("song_author")
@@ -5588,14 +5611,24 @@ class Music(commands.Cog):
         if message.author.bot and not isinstance(message.channel, disnake.StageChannel):
             return
 
+        player: Optional[LavalinkPlayer] = self.bot.music.players.get(message.guild.id)
+
+        thread_request = player and isinstance(message.channel, disnake.Thread) and not player.static
+
+        if not thread_request:
+            try:
+                cached_data = self.bot.peek_cached_data(message.guild.id, db_name=DBModel.guilds)
+            except AttributeError:
+                return
+            if cached_data is not None and not cached_data['player_controller']['channel']:
+                return
+
         try:
             data = await self.bot.get_data(message.guild.id, db_name=DBModel.guilds)
         except AttributeError:
             return
 
-        player: Optional[LavalinkPlayer] = self.bot.music.players.get(message.guild.id)
-
-        if player and isinstance(message.channel, disnake.Thread) and not player.static:
+        if thread_request:
 
             try:
                 if player.text_channel.id != message.id:
@@ -6144,11 +6177,12 @@ class Music(commands.Cog):
 
         if not isinstance(tracks, list):
             player.queue.extend(tracks.tracks)
+            track_count = tracks.track_count if isinstance(tracks, PartialPlaylist) else len(tracks.tracks)
             if (isinstance(message.channel, disnake.Thread) and
                     (not isinstance(message.channel.parent, disnake.ForumChannel) or
                      data['player_controller']['purge_mode'] != SongRequestPurgeMode.on_message)):
                 embed.description = f"✋ **⠂ Requested by:** {message.author.mention}\n" \
-                                    f"🎼 **⠂ Track(s):** `[{len(tracks.tracks)}]`"
+                                    f"🎼 **⠂ Track(s):** `[{track_count}]`"
                 embed.set_thumbnail(url=tracks.tracks[0].thumb)
                 embed.set_author(name="⠂" + fix_characters(tracks.tracks[0].playlist_name, 35), url=message.content,
                                  icon_url=music_source_image(tracks.tracks[0].info["sourceName"]))
@@ -6177,7 +6211,7 @@ class Music(commands.Cog):
 
             elif data['player_controller']['purge_mode'] != SongRequestPurgeMode.on_message:
 
-                txt = f"> 🎼 **⠂** [`{fix_characters(tracks.tracks[0].playlist_name, 35)}`](<{message.content}>) `[{len(tracks.tracks)} track(s)]` {message.author.mention}"
+                txt = f"> 🎼 **⠂** [`{fix_characters(tracks.tracks[0].playlist_name, 35)}`](<{message.content}>) `[{track_count} track(s)]` {message.author.mention}"
 
                 try:
                     txt += f" `|` {message.author.voice.channel.mention}"
@@ -6192,7 +6226,7 @@ class Music(commands.Cog):
             else:
                 player.set_command_log(
                     text=f"{message.author.mention} added the playlist [`{fix_characters(tracks.data['playlistInfo']['name'], 20)}`]"
-                         f"({tracks.tracks[0].playlist_url}) `({len(tracks.tracks)})`.",
+                         f"({tracks.tracks[0].playlist_url}) `({track_count})`.",
                     emoji="🎶"
                 )
                 if destroy_message:
@@ -6533,7 +6567,7 @@ class Music(commands.Cog):
 
     async def get_tracks(
             self, query: str, user: disnake.Member, node: wavelink.Node = None,
-            track_loops=0, use_cache=True, source=None, bot: BotCore = None):
+            track_loops=0, use_cache=True, source=None, bot: BotCore = None, progressive=False):
 
         if not bot:
             bot = self.bot
@@ -6541,7 +6575,7 @@ class Music(commands.Cog):
         if not node:
             node = await self.get_best_node(bot)
 
-        tracks = await process_spotify(self.bot, user.id, query)
+        tracks = await process_spotify(self.bot, user.id, query, progressive=progressive)
 
         exceptions = set()
 
@@ -6595,7 +6629,8 @@ class Music(commands.Cog):
 
                     try:
                         tracks = await node_search.get_tracks(
-                            search_query, track_cls=LavalinkTrack, playlist_cls=LavalinkPlaylist, requester=user.id
+                            search_query, track_cls=LavalinkTrack, playlist_cls=LavalinkPlaylist, requester=user.id,
+                            use_cache=use_cache
                         )
                     except ClientConnectorCertificateError:
                         node_search.available = False
@@ -6607,7 +6642,8 @@ class Music(commands.Cog):
 
                             try:
                                 tracks = await n.get_tracks(
-                                    search_query, track_cls=LavalinkTrack, playlist_cls=LavalinkPlaylist, requester=user.id
+                                    search_query, track_cls=LavalinkTrack, playlist_cls=LavalinkPlaylist, requester=user.id,
+                                    use_cache=use_cache
                                 )
                                 node_search = n
                                 break
@@ -6631,7 +6667,7 @@ class Music(commands.Cog):
             raise GenericError("**There were no results for your search.**")
 
         if isinstance(tracks, list):
-            tracks[0].info["extra"]["track_loops"] = track_loops
+            tracks[0].track_loops = track_loops
 
         else:
 
@@ -6948,10 +6984,10 @@ def setup(bot: BotCore):
 
     if bot.config["USE_YTDL"] and not hasattr(bot.pool, 'ytdl'):
 
-        from yt_dlp import YoutubeDL
+        from utils.music.ytdl_tools import YTDLTools
 
-        bot.pool.ytdl = YoutubeDL(
-            {
+        bot.pool.ytdl = YTDLTools(
+            opts={
                 'extract_flat': True,
                 'quiet': True,
                 'no_warnings': True,
@@ -6981,7 +7017,10 @@ def setup(bot: BotCore):
                         "skip": ["webpage"]
                     }
                 }
-            }
+            },
+            process_workers=bot.config["YTDL_PROCESS_WORKERS"],
+            timeout=bot.config["YTDL_TIMEOUT"],
+            max_concurrency=bot.config["YTDL_MAX_CONCURRENCY"]
         )
 
     bot.add_cog(Music(bot))
@@ -4,23 +4,129 @@
 import asyncio
 import os
 import pickle
-import shutil
+import struct
+import time
 import traceback
+import uuid
 import zlib
-from base64 import b64decode, b64encode
-from typing import Union
+from base64 import b64decode
+from collections import deque
+from copy import deepcopy
+from typing import Union, Optional
 
 import aiofiles
 import disnake
+import msgpack
 from disnake.ext import commands
 
 import wavelink
 from utils.client import BotCore
+from utils.db import PlayerSessionStore
 from utils.music.checks import can_connect, can_send_message
 from utils.music.models import LavalinkPlayer, LavalinkTrack, PartialTrack, PartialPlaylist, LavalinkPlaylist
 from utils.others import SongRequestPurgeMode, send_idle_embed, CustomContext
 
 
+SESSION_TRACK_LISTS = ("queue", "played", "queue_autoplay", "failed_tracks")
+
+# fixed field order for the track rows (fields like author/sourceName/playlist are stored once per session).
+SESSION_TRACK_FIELDS = ("id", "title", "author", "uri", "length", "identifier", "isStream", "isSeekable",
+                        "sourceName", "position", "artworkUrl", "isrc", "extra", "playlist")
+SESSION_INTERNED_FIELDS = ("author", "sourceName", "playlist")
+
+
+def _session_default(obj):
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Unsupported type: {type(obj)}")
+
+
+def encode_session(data: dict) -> bytes:
+
+    interned = []
+    interned_ids = {}
+
+    def intern(value):
+        key = tuple(value.items()) if isinstance(value, dict) else value
+        try:
+            return interned_ids[key]
+        except KeyError:
+            interned_ids[key] = len(interned)
+            interned.append(value)
+            return interned_ids[key]
+
+    tracks = {}
+
+    for name in SESSION_TRACK_LISTS:
+
+        rows = []
+
+        for info in data.get(name, []):
+
+            mask = 0
+            row = [0]
+
+            for n, field in enumerate(SESSION_TRACK_FIELDS):
+                try:
+                    value = info[field]
+                except KeyError:
+                    row.append(None)
+                    continue
+                mask |= 1 << n
+                row.append(intern(value) if field in SESSION_INTERNED_FIELDS else value)
+
+            row[0] = mask
+
+            if extra_fields := {k: v for k, v in info.items() if k not in SESSION_TRACK_FIELDS}:
+                row.append(extra_fields)
+
+            rows.append(row)
+
+        tracks[name] = rows
+
+    return zlib.compress(msgpack.packb(
+        {
+            "fields": SESSION_TRACK_FIELDS,
+            "interned": interned,
+            "session": {k: v for k, v in data.items() if k not in SESSION_TRACK_LISTS},
+            "tracks": tracks,
+        }, default=_session_default, datetime=True
+    ))
+
+
+def decode_session(content: bytes) -> dict:
+
+    payload = msgpack.unpackb(zlib.decompress(content), timestamp=3, strict_map_key=False)
+
+    fields = payload["fields"]
+    interned = payload["interned"]
+
+    data = payload["session"]
+
+    for name, rows in payload["tracks"].items():
+
+        track_list = []
+
+        for row in rows:
+
+            mask = row[0]
+            info = {}
+
+            for n, field in enumerate(fields):
+                if mask >> n & 1:
+                    value = row[n + 1]
+                    info[field] = interned[value] if field in SESSION_INTERNED_FIELDS else value
+
+            if len(row) > len(fields) + 1:
+                info.update(row[-1])
+
+            track_list.append(info)
+
+        data[name] = track_list
+
+    return data
+
+
 class PlayerSession(commands.Cog):
 
     def __init__(self, bot: BotCore):
@@ -35,6 +141,15 @@ class PlayerSession(commands.Cog):
         if not hasattr(bot, 'players_resumed'):
             bot.players_resumed ={}
 
+        # last persisted state of each player (used to write only the changes in the journal).
+        self.journal_states: dict = {}
+
+        self.resume_node_semaphores: dict = {}
+        self.session_store: Optional[PlayerSessionStore] = None
+        self.mongo_dirty_sessions: dict = {}
+        self.mongo_flush_task: Optional[asyncio.Task] = None
+        self.voice_connect_timestamps: dict = {}
+
         self.resume_task = bot.loop.create_task(self.resume_players())
 
     @commands.Cog.listener()
@@ -45,6 +160,8 @@ class PlayerSession(commands.Cog):
         except:
             pass
 
+        self.journal_states.pop(player.guild.id, None)
+
         await self.delete_data(player)
 
     @commands.Cog.listener('on_wavelink_track_end')
@@ -104,38 +221,12 @@ class PlayerSession(commands.Cog):
             text_channel_id = None
             message_id = None
 
-        tracks = []
-        played = []
-        autoqueue = []
-        failed_tracks = []
-
-        if player.current:
-            player.current.info["id"] = player.current.id
-            if player.current.playlist_name:
-                player.current.info["playlist"] = {"name": player.current.playlist_name, "url": player.current.playlist_url}
-            tracks.append(player.current.info)
-
-        for t in player.queue:
-            t.info["id"] = t.id
-            if t.playlist:
-                t.info["playlist"] = {"name": t.playlist_name, "url": t.playlist_url}
-            tracks.append(t.info)
-
-        for t in player.played:
-            t.info["id"] = t.id
-            if t.playlist:
-                t.info["playlist"] = {"name": t.playlist_name, "url": t.playlist_url}
-            played.append(t.info)
-
-        for t in player.queue_autoplay:
-            t.info["id"] = t.id
-            autoqueue.append(t.info)
-
-        for t in player.failed_tracks:
-            t.info["id"] = t.id
-            if t.playlist:
-                t.info["playlist"] = {"name": t.playlist_name, "url": t.playlist_url}
-            failed_tracks.append(t.info)
+        track_lists = {
+            "queue": ([player.current] if player.current else []) + list(player.queue),
+            "played": list(player.played),
+            "queue_autoplay": list(player.queue_autoplay),
+            "failed_tracks": list(player.failed_tracks),
+        }
 
         try:
             vc_id = player.guild.me.voice.channel.id
@@ -168,10 +259,6 @@ class PlayerSession(commands.Cog):
             "restrict_mode": player.restrict_mode,
             "mini_queue_enabled": player.mini_queue_enabled,
             "listen_along_invite": player.listen_along_invite,
-            "queue": tracks,
-            "played": played,
-            "queue_autoplay": autoqueue,
-            "failed_tracks": failed_tracks,
             "prefix_info": player.prefix_info,
             "purge_mode": player.purge_mode,
             "voice_state": player._voice_state,
@@ -188,10 +275,173 @@ class PlayerSession(commands.Cog):
             data["custom_skin_data"] = {custom_skin: player.custom_skin_data[custom_skin]}
 
         try:
-            await self.save_session(player, data=data)
+            if self.bot.config["PLAYER_SESSIONS_JOURNAL"] and not (self.bot.config["PLAYER_SESSIONS_MONGODB"] and self.bot.config["MONGO"]):
+                await self.save_session_journal(player, data, track_lists)
+            else:
+                self.add_session_tracks(data, track_lists)
+                await self.save_session(player, data=data)
         except:
             traceback.print_exc()
 
+    def track_session_info(self, track: Union[LavalinkTrack, PartialTrack], playlist=True):
+        # new dict to avoid creating/keeping the info dict of the queued tracks.
+        data = track.to_dict()
+        data["id"] = track.id
+        if playlist and track.playlist:
+            data["playlist"] = {"name": track.playlist_name, "url": track.playlist_url}
+        return data
+
+    def add_session_tracks(self, data: dict, track_lists: dict):
+        for name, tracks in track_lists.items():
+            data[name] = [self.track_session_info(t, playlist=name != "queue_autoplay") for t in tracks]
+
+    def diff_session_tracks(self, name: str, old_ids: list, tracks: list) -> Optional[list]:
+        # returns the journal operations to turn the old list into the current one
+        # (or None when the list was reordered and a full snapshot is needed).
+
+        new_ids = [t.unique_id for t in tracks]
+
+        if old_ids == new_ids:
+            return []
+
+        if not new_ids:
+            return [("clear", name, None)]
+
+        try:
+            skip = old_ids.index(new_ids[0])
+        except ValueError:
+            skip = len(old_ids)
+
+        kept = len(old_ids) - skip
+
+        if old_ids[skip:] != new_ids[:kept]:
+            return
+
+        ops = []
+
+        if skip:
+            ops.append(("pop", name, skip))
+
+        if new_tracks := tracks[kept:]:
+            ops.append(("enqueue", name, [self.track_session_info(t, playlist=name != "queue_autoplay") for t in new_tracks]))
+
+        return ops
+
+    async def save_session_journal(self, player: LavalinkPlayer, data: dict, track_lists: dict):
+
+        try:
+            player = player.bot.music.players[player.guild.id]
+        except:
+            try:
+                player.queue_updater_task.cancel()
+            except:
+                pass
+            return
+
+        ops = None
+
+        if (state := self.journal_states.get(player.guild.id)) and state["entries"] < self.bot.config["PLAYER_SESSIONS_JOURNAL_COMPACT"]:
+
+            ops = []
+
+            if changes := {k: v for k, v in data.items() if k not in state["data"] or state["data"][k] != v}:
+                ops.append(("state", None, deepcopy(changes)))
+
+            for name, tracks in track_lists.items():
+                if (track_ops := self.diff_session_tracks(name, state["tracks"][name], tracks)) is None:
+                    ops = None
+                    break
+                ops.extend(track_ops)
+
+        state_tracks = {name: [t.unique_id for t in tracks] for name, tracks in track_lists.items()}
+
+        if ops is None:
+            # base snapshot (first save, compaction or queue reordered).
+            journal_id = uuid.uuid4().hex
+            snapshot = dict(data, journal_id=journal_id)
+            self.add_session_tracks(snapshot, track_lists)
+            await self.save_session_local(player.guild.id, snapshot)
+            self.journal_states[player.guild.id] = {
+                "journal_id": journal_id, "data": deepcopy(data), "tracks": state_tracks, "entries": 0
+            }
+            return
+
+        if not ops:
+            return
+
+        await self.append_session_journal(player.guild.id, state["journal_id"], ops)
+
+        state["data"].update(deepcopy(data))
+        state["tracks"] = state_tracks
+        state["entries"] += 1
+
+    async def append_session_journal(self, id_: Union[int, str], journal_id: str, ops: list):
+
+        record = zlib.compress(pickle.dumps({"journal_id": journal_id, "ops": ops}))
+
+        if self.bot.config["PLAYER_SESSIONS_SQLITE"]:
+            await self.get_session_store().append_journal(id_, record)
+            return
+
+        async with aiofiles.open(f'./local_database/player_sessions/{self.bot.user.id}/{id_}.journal', 'ab') as f:
+            await f.write(struct.pack(">I", len(record)) + record)
+
+    async def load_session_journal(self, data: dict):
+
+        if not data.get("journal_id"):
+            return
+
+        try:
+            async with aiofiles.open(f'./local_database/player_sessions/{self.bot.user.id}/{data["_id"]}.journal', 'rb') as f:
+                content = await f.read()
+        except FileNotFoundError:
+            return
+
+        records = []
+
+        offset = 0
+
+        while offset + 4 <= len(content):
+
+            size = struct.unpack(">I", content[offset:offset + 4])[0]
+            offset += 4
+
+            if offset + size > len(content):
+                # incomplete record (interrupted write).
+                break
+
+            records.append(content[offset:offset + size])
+
+            offset += size
+
+        self.apply_session_journal(data, records)
+
+    def apply_session_journal(self, data: dict, records: list):
+
+        if not (journal_id := data.get("journal_id")):
+            return
+
+        for record in records:
+
+            try:
+                record = pickle.loads(zlib.decompress(record))
+            except Exception:
+                traceback.print_exc()
+                break
+
+            if record["journal_id"] != journal_id:
+                continue
+
+            for op, name, payload in record["ops"]:
+                if op == "state":
+                    data.update(payload)
+                elif op == "clear":
+                    data[name] = []
+                elif op == "pop":
+                    del data[name][:payload]
+                elif op == "enqueue":
+                    data[name].extend(payload)
+
     def process_track_cls(self, data: list, playlists: dict = None):
 
         if not playlists:
@@ -279,7 +529,7 @@ class PlayerSession(commands.Cog):
                     data_list[d["_id"]] = d
                     print(f"{self.bot.user} - Migrating session data from the server: {d['_id']} | Local DB -> Mongo")
                     await self.save_session_mongo(d["_id"], d)
-                    self.delete_data_local(d["_id"])
+                    await self.delete_data_local(d["_id"])
                 for d in mongo_sessions:
                     data_list[d["_id"]] = d
 
@@ -298,24 +548,109 @@ class PlayerSession(commands.Cog):
 
             hints = self.bot.config["EXTRA_HINTS"].split("||")
 
-            for data in data_list.values():
+            semaphore = asyncio.Semaphore(self.bot.config["PLAYER_RESUME_CONCURRENCY"])
+
+            sessions = sorted(data_list.values(), key=self.resume_priority, reverse=True)
+
+            data_list.clear()
+
+            stats = {"total": len(sessions), "done": 0, "resumed": 0, "latencies": []}
+
+            tasks = []
+
+            for data in sessions:
 
                 try:
                     self.bot.players_resumed[data['_id']]
                 except KeyError:
-                    self.bot.players_resumed[data['_id']] = self.bot.loop.create_task(self.resume_player(data, hints=hints))
-                    await asyncio.sleep(1)
+                    self.bot.players_resumed[data['_id']] = task = self.bot.loop.create_task(
+                        self.scheduled_resume_player(data, hints=hints, semaphore=semaphore, stats=stats)
+                    )
+                    tasks.append(task)
+
+            if tasks:
+                start = time.monotonic()
+                await asyncio.wait(tasks)
+                latencies = stats["latencies"] or [0]
+                print(f"{self.bot.user} - Players resumed: {stats['resumed']}/{stats['total']} in {time.monotonic() - start:.1f}s "
+                      f"(avg: {sum(latencies) / len(latencies):.1f}s | max: {max(latencies):.1f}s)")
 
         except Exception:
-            print(f"{self.bot.user} - Failure to resume player {data['_id']}:\n{traceback.format_exc()}")
+            print(f"{self.bot.user} - Failure to resume players:\n{traceback.format_exc()}")
 
         self.bot.player_resumed = True
 
+    def resume_priority(self, data: dict):
+
+        # players with more listeners (and then the most recently active ones) are resumed first.
+        try:
+            listeners = len([m for m in self.bot.get_channel(data["voice_channel"]).members if not m.bot])
+        except AttributeError:
+            listeners = 0
+
+        try:
+            last_activity = data["time"].timestamp()
+        except (KeyError, AttributeError):
+            last_activity = 0
+
+        return listeners, last_activity
+
+    async def scheduled_resume_player(self, data: dict, hints: list, semaphore: asyncio.Semaphore, stats: dict):
+
+        async with semaphore:
+
+            start = time.monotonic()
+
+            try:
+                await self.resume_player(data, hints=hints)
+            finally:
+                latency = time.monotonic() - start
+                stats["done"] += 1
+
+                if self.bot.music.players.get(int(data["_id"])):
+                    stats["resumed"] += 1
+                    stats["latencies"].append(latency)
+
+                if stats["done"] % 25 == 0 and stats["done"] < stats["total"]:
+                    print(f"{self.bot.user} - Resuming players: {stats['done']}/{stats['total']}")
+
+    def get_resume_node_semaphore(self, node: wavelink.Node) -> asyncio.Semaphore:
+        try:
+            return self.resume_node_semaphores[node.identifier]
+        except KeyError:
+            semaphore = asyncio.Semaphore(self.bot.config["PLAYER_RESUME_NODE_CONCURRENCY"])
+            self.resume_node_semaphores[node.identifier] = semaphore
+            return semaphore
+
+    async def wait_voice_ratelimit(self, shard_id: int):
+
+        # keeps the voice state updates sent during the resume below the limit per shard (leaving room for other
+        # gateway events).
+        try:
+            timestamps = self.voice_connect_timestamps[shard_id]
+        except KeyError:
+            timestamps = self.voice_connect_timestamps[shard_id] = deque()
+
+        while True:
+
+            now = time.monotonic()
+
+            while timestamps and now - timestamps[0] > 60:
+                timestamps.popleft()
+
+            if len(timestamps) < self.bot.config["PLAYER_RESUME_VOICE_RATE"]:
+                timestamps.append(now)
+                return
+
+            await asyncio.sleep(60 - (now - timestamps[0]))
+
     async def resume_player(self, data: dict, hints: list = None):
 
         if hints is None:
             hints = []
 
+        node_semaphore = None
+
         try:
             guild = self.bot.get_guild(data["_id"])
 
@@ -436,6 +771,9 @@ class PlayerSession(commands.Cog):
 
                 break
 
+            node_semaphore = self.get_resume_node_semaphore(node)
+            await node_semaphore.acquire()
+
             try:
                 player: LavalinkPlayer = self.bot.music.get_player(
                     node_id=node.identifier,
@@ -495,6 +833,8 @@ class PlayerSession(commands.Cog):
             if player.nightcore:
                 await player.set_timescale(pitch=1.2, speed=1.1)
 
+            await self.wait_voice_ratelimit(guild.shard_id)
+
             await player.connect(voice_channel.id)
 
             wait_counter = 30
@@ -596,6 +936,10 @@ class PlayerSession(commands.Cog):
         except Exception:
             print(f"{self.bot.user} - Critical failure when resuming players:\n{traceback.format_exc()}")
 
+        finally:
+            if node_semaphore:
+                node_semaphore.release()
+
     async def get_player_sessions_mongo(self):
 
         if not self.bot.config["MONGO"]:
@@ -603,24 +947,71 @@ class PlayerSession(commands.Cog):
 
         guild_data = []
 
-        for d in (await self.bot.pool.mongo_database.query_data(db_name=str(self.bot.user.id), collection="player_sessions")):
+        async for d in self.bot.pool.mongo_database.iter_data(db_name=str(self.bot.user.id), collection="player_sessions"):
 
             try:
                 data = d["data"]
             except KeyError:
                 await self.delete_data(int(d["_id"]))
                 continue
-            data = b64decode(data)
+
             try:
-                data = zlib.decompress(data)
-            except zlib.error:
-                pass
-            guild_data.append(pickle.loads(data))
+                if d.get("encoding") == "msgpack":
+                    guild_data.append(decode_session(data))
+                    continue
+                data = b64decode(data)
+                try:
+                    data = zlib.decompress(data)
+                except zlib.error:
+                    pass
+                guild_data.append(pickle.loads(data))
+            except Exception:
+                print(f"{self.bot.user} - Failed to load the player session of the server: {d['_id']}\n{traceback.format_exc()}")
 
         return guild_data
 
+    def get_session_store(self) -> PlayerSessionStore:
+        if not self.session_store:
+            self.session_store = PlayerSessionStore(f"./local_database/player_sessions/{self.bot.user.id}.sqlite3")
+        return self.session_store
+
     async def get_player_sessions_local(self):
 
+        if self.bot.config["PLAYER_SESSIONS_SQLITE"]:
+            return await self.get_player_sessions_sqlite()
+
+        return await self.get_player_sessions_files()
+
+    async def get_player_sessions_sqlite(self):
+
+        guild_data = []
+
+        for guild_id, content, journal in await self.get_session_store().load_all():
+
+            try:
+                data = pickle.loads(zlib.decompress(content))
+            except Exception:
+                print(f"{self.bot.user} - Failed to load the player session of the server: {guild_id}\n{traceback.format_exc()}")
+                continue
+
+            try:
+                self.apply_session_journal(data, journal)
+            except Exception:
+                traceback.print_exc()
+
+            guild_data.append(data)
+
+        # import the sessions still saved in the old format (one file per server).
+        for data in await self.get_player_sessions_files():
+            print(f"{self.bot.user} - Migrating session data from the server: {data['_id']} | Files -> SQLite")
+            await self.get_session_store().save(data["_id"], zlib.compress(pickle.dumps(data)))
+            self.delete_session_files(data["_id"])
+            guild_data.append(data)
+
+        return guild_data
+
+    async def get_player_sessions_files(self):
+
         guild_data = []
 
         try:
@@ -644,38 +1035,87 @@ class PlayerSession(commands.Cog):
                 data = pickle.loads(file_content)
 
             if data:
+                try:
+                    await self.load_session_journal(data)
+                except Exception:
+                    traceback.print_exc()
                 guild_data.append(data)
 
         return guild_data
 
     async def save_session_mongo(self, id_: Union[int, str], data: dict):
-        await self.bot.pool.mongo_database.update_data(
-            id_=str(id_),
-            data={"data": b64encode(zlib.compress(pickle.dumps(data))).decode('utf-8')},
-            collection="player_sessions",
-            db_name=str(self.bot.user.id)
-        )
+        self.mongo_dirty_sessions[str(id_)] = data
+        await self.flush_sessions_mongo()
+
+    def queue_session_mongo(self, id_: Union[int, str], data: dict):
+
+        self.mongo_dirty_sessions[str(id_)] = data
+        self.schedule_flush_sessions_mongo()
+
+    def schedule_flush_sessions_mongo(self):
+        if not self.mongo_flush_task or self.mongo_flush_task.done():
+            self.mongo_flush_task = self.bot.loop.create_task(self.delayed_flush_sessions_mongo())
+
+    async def delayed_flush_sessions_mongo(self):
+        # sessions queued (or that failed to save) while flushing are sent in the next round.
+        while self.mongo_dirty_sessions:
+            await asyncio.sleep(self.bot.config["PLAYER_SESSIONS_MONGO_FLUSH_DELAY"])
+            await self.flush_sessions_mongo()
+
+    async def flush_sessions_mongo(self):
+
+        if not self.mongo_dirty_sessions:
+            return
+
+        sessions, self.mongo_dirty_sessions = self.mongo_dirty_sessions, {}
+
+        documents = {}
+
+        for id_, data in sessions.items():
+            try:
+                documents[id_] = {"data": encode_session(data), "encoding": "msgpack"}
+            except Exception:
+                print(f"{self.bot.user} - Failed to encode the player session of the server: {id_}\n{traceback.format_exc()}")
+
+        try:
+            await self.bot.pool.mongo_database.bulk_update(
+                documents, db_name=str(self.bot.user.id), collection="player_sessions"
+            )
+        except asyncio.CancelledError:
+            for id_, data in sessions.items():
+                self.mongo_dirty_sessions.setdefault(id_, data)
+            raise
+        except Exception:
+            traceback.print_exc()
+            for id_, data in sessions.items():
+                self.mongo_dirty_sessions.setdefault(id_, data)
+            self.schedule_flush_sessions_mongo()
 
     async def save_session_local(self, id_: Union[int, str], data: dict):
 
+        if self.bot.config["PLAYER_SESSIONS_SQLITE"]:
+            try:
+                await self.get_session_store().save(id_, zlib.compress(pickle.dumps(data)))
+            except Exception:
+                traceback.print_exc()
+            return
+
         if not os.path.isdir(f"./local_database/player_sessions/{self.bot.user.id}"):
             os.makedirs(f"./local_database/player_sessions/{self.bot.user.id}")
 
         path = f'./local_database/player_sessions/{self.bot.user.id}/{id_}'
 
+        # write to a temp file and replace the old one (the previous session is kept intact if the write fails).
         try:
-            async with aiofiles.open(f"{path}.pkl", "wb") as f:
+            async with aiofiles.open(f"{path}.tmp", "wb") as f:
                 await f.write(zlib.compress(pickle.dumps(data)))
+            os.replace(f"{path}.tmp", f"{path}.pkl")
         except Exception:
             traceback.print_exc()
-            try:
-                os.rename(f"{path}.bak", f"{path}.pkl")
-            except:
-                pass
             return
 
         try:
-            shutil.copy(f'{path}.pkl', f'{path}.bak')
+            os.remove(f'{path}.journal')
         except FileNotFoundError:
             pass
         except Exception:
@@ -694,7 +1134,7 @@ class PlayerSession(commands.Cog):
 
         try:
             if self.bot.config["PLAYER_SESSIONS_MONGODB"] and self.bot.config["MONGO"]:
-                await self.save_session_mongo(player.guild.id, data)
+                self.queue_session_mongo(player.guild.id, data)
             else:
                 await self.save_session_local(player.guild.id, data)
 
@@ -702,11 +1142,20 @@ class PlayerSession(commands.Cog):
             print(f"❌ - {self.bot.user} - Saving cancelled: {repr(e)}")
 
     async def delete_data_mongo(self, id_: Union[LavalinkPlayer, int]):
+        self.mongo_dirty_sessions.pop(str(id_), None)
         await self.bot.pool.mongo_database.delete_data(id_=str(id_), db_name=str(self.bot.user.id),
                                                        collection="player_sessions")
 
-    def delete_data_local(self, id_: Union[LavalinkPlayer, int]):
-        for ext in ('.pkl', '.bak'):
+    async def delete_data_local(self, id_: Union[LavalinkPlayer, int]):
+
+        if self.bot.config["PLAYER_SESSIONS_SQLITE"]:
+            await self.get_session_store().delete(id_)
+            return
+
+        self.delete_session_files(id_)
+
+    def delete_session_files(self, id_: Union[LavalinkPlayer, int]):
+        for ext in ('.pkl', '.bak', '.tmp', '.journal'):
             try:
                 os.remove(f'./local_database/player_sessions/{self.bot.user.id}/{id_}{ext}')
             except FileNotFoundError:
@@ -724,7 +1173,7 @@ class PlayerSession(commands.Cog):
         if self.bot.config["PLAYER_SESSIONS_MONGODB"] and self.bot.config["MONGO"]:
             await self.delete_data_mongo(guild_id)
         else:
-            self.delete_data_local(guild_id)
+            await self.delete_data_local(guild_id)
 
     def cog_unload(self):
         try:
@@ -732,6 +1181,18 @@ class PlayerSession(commands.Cog):
         except:
             pass
 
+        if self.session_store:
+            self.bot.loop.create_task(self.session_store.close())
+
+        try:
+            self.mongo_flush_task.cancel()
+        except AttributeError:
+            pass
+
+        # pending sessions are saved in BotCore.close() (awaited before closing the connection).
+        if self.mongo_dirty_sessions and not self.bot.is_closed():
+            self.bot.loop.create_task(self.flush_sessions_mongo())
+
         for guild_id in list(self.bot.players_resumed):
             try:
                 self.bot.players_resumed[guild_id].cancel()
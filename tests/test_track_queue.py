@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+import random
+from collections import deque
+
+import pytest
+
+from utils.music.track_queue import TrackQueue
+
+
+class FakeTrack:
+
+    def __init__(self, n: int):
+        self.unique_id = f"id{n}"
+        self.title = f"{random.choice(['blue', 'red', 'green'])} song {n}"
+        self.author = random.choice(["alpha", "beta", "gamma"])
+        self.playlist_name = random.choice(["", "mix", "top hits"])
+
+    def __repr__(self):
+        return self.unique_id
+
+
+def tokens(track) -> set:
+    return set(f"{track.title} {track.author} {track.playlist_name}".lower().split())
+
+
+def check_queue(queue: TrackQueue, expected: deque, tracks: list):
+
+    assert len(queue) == len(expected)
+    assert list(queue) == list(expected)
+    assert list(reversed(queue)) == list(reversed(expected))
+
+    for track in tracks:
+
+        if track in expected:
+            assert queue.get_track(track.unique_id) is track
+            assert queue.index(track) == expected.index(track)
+            assert queue.count(track) == expected.count(track)
+        else:
+            assert queue.get_track(track.unique_id) is None
+            with pytest.raises(ValueError):
+                queue.index(track)
+
+    for query in ("blue", "so", "alpha", "top hits", "gre song", "song 1"):
+        words = query.split()
+        matches = {t.unique_id for t in expected if all(any(k.startswith(w) for k in tokens(t)) for w in words)}
+        results = queue.search(query, limit=len(tracks) + 1)
+        assert {t.unique_id for t in results} == matches
+        assert len(results) == len(matches)
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("load", [2, 4, 128])
+def test_random_operations(seed: int, load: int):
+
+    random.seed(seed)
+
+    tracks = [FakeTrack(n) for n in range(40)]
+
+    queue = TrackQueue()
+    queue.load = load
+    expected = deque()
+    snapshots = []
+
+    for _ in range(300):
+
+        op = random.choice(["append", "appendleft", "pop", "popleft", "extend", "insert", "delitem", "setitem",
+                            "remove", "rotate", "clear", "snapshot"])
+        track = random.choice(tracks)
+
+        if op == "append":
+            queue.append(track)
+            expected.append(track)
+
+        elif op == "appendleft":
+            queue.appendleft(track)
+            expected.appendleft(track)
+
+        elif op in ("pop", "popleft"):
+            if expected:
+                assert getattr(queue, op)() is getattr(expected, op)()
+            else:
+                with pytest.raises(IndexError):
+                    getattr(queue, op)()
+
+        elif op == "extend":
+            items = random.choices(tracks, k=random.randint(0, load * 3))
+            queue.extend(items)
+            expected.extend(items)
+
+        elif op == "insert":
+            # negative and out of range indexes are clamped (same as deque).
+            index = random.randint(-len(expected) - 5, len(expected) + 5)
+            queue.insert(index, track)
+            expected.insert(index, track)
+
+        elif op in ("delitem", "setitem"):
+            index = random.randint(-len(expected) - 2, len(expected) + 1)
+            if -len(expected) <= index < len(expected):
+                if op == "delitem":
+                    del queue[index]
+                    del expected[index]
+                else:
+                    queue[index] = track
+                    expected[index] = track
+            else:
+                with pytest.raises(IndexError):
+                    if op == "delitem":
+                        del queue[index]
+                    else:
+                        queue[index] = track
+
+        elif op == "remove":
+            if track in expected:
+                queue.remove(track)
+                expected.remove(track)
+            else:
+                with pytest.raises(ValueError):
+                    queue.remove(track)
+
+        elif op == "rotate":
+            n = random.randint(-load * 3, load * 3)
+            queue.rotate(n)
+            expected.rotate(n)
+
+        elif op == "clear":
+            if random.random() < 0.2:
+                queue.clear()
+                expected.clear()
+
+        elif op == "snapshot":
+            snapshots.append((queue.snapshot(), list(expected)))
+
+        check_queue(queue, expected, tracks)
+
+        if expected:
+            index = random.randrange(-len(expected), len(expected))
+            assert queue[index] is expected[index]
+
+    # the snapshots keep the content of the queue at the time they were created.
+    for snapshot, items in snapshots:
+        assert list(snapshot) == items
+        assert len(snapshot) == len(items)
+        for index in range(-len(items), len(items)):
+            assert snapshot[index] is items[index]
+
+
+def test_duplicates():
+
+    random.seed(0)
+
+    track, other = FakeTrack(1), FakeTrack(2)
+
+    queue = TrackQueue()
+    queue.load = 2
+
+    for _ in range(5):
+        queue.append(other)
+    queue.append(track)
+    queue.insert(1, track)
+
+    # the first copy is returned even when the last copy was added before.
+    assert queue.index(track) == 1
+    assert queue.count(track) == 2
+
+    del queue[1]
+    assert queue.index(track) == 5
+    assert queue.get_track(track.unique_id) is track
+
+    queue.remove(track)
+    assert queue.get_track(track.unique_id) is None
+    assert queue.search(track.title.split()[0]) == [other] * (track.title.split()[0] in other.title)
+
+
+def test_search_order():
+
+    random.seed(0)
+
+    tracks = [FakeTrack(n) for n in range(4)]
+    tracks[0].title, tracks[0].author = "intro", "night"
+    tracks[1].title, tracks[1].author = "night song", "x"
+    tracks[2].title, tracks[2].author = "night song", "x"
+    tracks[3].title, tracks[3].author = "other", "x"
+
+    queue = TrackQueue(tracks)
+
+    # title matches first, ties by position in the queue.
+    assert queue.search("night") == [tracks[1], tracks[2], tracks[0]]
+
+    queue.insert(0, queue[2])
+    assert queue.search("night song") == [tracks[2], tracks[1]]
+
+
+def test_maxlen():
+
+    tracks = [FakeTrack(n) for n in range(5)]
+
+    queue = TrackQueue(maxlen=3)
+    expected = deque(maxlen=3)
+
+    for t in tracks:
+        queue.append(t)
+        expected.append(t)
+
+    assert list(queue) == list(expected)
+
+    with pytest.raises(IndexError):
+        queue.insert(0, tracks[0])
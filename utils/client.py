@@ -11,6 +11,7 @@ import pickle
 import subprocess
 import traceback
 from configparser import ConfigParser
+from copy import deepcopy
 from importlib import import_module
 from subprocess import check_output
 from typing import Optional, Union, List
@@ -18,22 +19,24 @@ from typing import Optional, Union, List
 import aiohttp
 import disnake
 import requests
-import spotipy
 from disnake.ext import commands
 from disnake.http import Route
 from dotenv import dotenv_values
 from user_agent import generate_user_agent
 
 from config_loader import load_config
-from utils.db import MongoDatabase, LocalDatabase, get_prefix, DBModel, global_db_models
+from utils.db import MongoDatabase, LocalDatabase, SQLiteDatabase, get_prefix, DBModel, global_db_models, TTLCache, \
+    TrackLoadCache, TrackResolutionIndex
 from utils.music.checks import check_pool_bots
+from utils.music.converters import SuggestionService
 from utils.music.errors import GenericError
 from utils.music.local_lavalink import run_lavalink
 from utils.music.models import music_mode, LavalinkPlayer
-from utils.music.spotify import spotify_client
+from utils.music.spotify import spotify_client, SpotifyClient
 from utils.others import CustomContext, token_regex, sort_dict_recursively
 from utils.owner_panel import PanelView
 from web_app import WSClient, start
+from wavelink.codec import get_codec
 
 
 class BotPool:
@@ -59,12 +62,17 @@ class BotPool:
 
     def __init__(self):
         self.playlist_cache = {}
-        self.user_prefix_cache = {}
-        self.guild_prefix_cache = {}
+        self.user_prefix_cache: Optional[TTLCache] = None
+        self.guild_prefix_cache: Optional[TTLCache] = None
+        self.settings_cache: Optional[TTLCache] = None
+        self.track_cache: Optional[TrackLoadCache] = None
+        self.track_index: Optional[TrackResolutionIndex] = None
+        self.suggestions: Optional[SuggestionService] = None
         self.mongo_database: Optional[MongoDatabase] = None
-        self.local_database: Optional[LocalDatabase] = None
+        self.local_database: Optional[Union[LocalDatabase, SQLiteDatabase]] = None
         self.ws_client: Optional[WSClient] = None
-        self.spotify: Optional[spotipy.Spotify] = None
+        self.http_session: Optional[aiohttp.ClientSession] = None
+        self.spotify: Optional[SpotifyClient] = None
         self.lavalink_instance: Optional[subprocess.Popen] = None
         self.config = {}
         self.emoji_data = {}
@@ -85,7 +93,7 @@ class BotPool:
 
 
     @property
-    def database(self) -> Union[LocalDatabase, MongoDatabase]:
+    def database(self) -> Union[LocalDatabase, SQLiteDatabase, MongoDatabase]:
 
         if self.config["MONGO"]:
             return self.mongo_database
@@ -148,6 +156,8 @@ class BotPool:
 
                 await asyncio.sleep(5)
 
+                await self.flush_database()
+
                 await asyncio.create_subprocess_shell("kill 1")
 
                 return
@@ -184,6 +194,31 @@ class BotPool:
             self.failed_bots[bot.identifier] = e
             self.bots.remove(bot)
 
+    def get_http_session(self) -> aiohttp.ClientSession:
+
+        # connector shared by all the bots, lavalink nodes, rpc client and webhooks (keeps the connections alive between requests).
+        if not self.http_session or self.http_session.closed:
+            self.http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.config["HTTP_POOL_LIMIT"],
+                    limit_per_host=self.config["HTTP_POOL_LIMIT_PER_HOST"],
+                    ttl_dns_cache=self.config["HTTP_DNS_CACHE_TTL"],
+                    keepalive_timeout=self.config["HTTP_KEEPALIVE_TIMEOUT"],
+                )
+            )
+
+        return self.http_session
+
+    async def flush_database(self):
+
+        for db in (self.mongo_database, self.local_database):
+            if not db:
+                continue
+            try:
+                await db.flush()
+            except Exception:
+                traceback.print_exc()
+
     async def run_bots(self, bots: List[BotCore]):
         await asyncio.wait(
             [asyncio.create_task(self.start_bot(bot)) for bot in bots]
@@ -313,12 +348,46 @@ class BotPool:
         mongo_key = self.config.get("MONGO")
 
         if mongo_key:
-            self.mongo_database = MongoDatabase(mongo_key, timeout=self.config["MONGO_TIMEOUT"])
+            self.mongo_database = MongoDatabase(
+                mongo_key, timeout=self.config["MONGO_TIMEOUT"],
+                write_behind_interval=self.config["MONGO_WRITE_BEHIND_INTERVAL"]
+            )
             print("Database in use: MongoDB")
+        elif self.config["LOCAL_DATABASE_SQLITE"]:
+            print("Database in use: SQLite | Note: Database file will be saved locally in: local_database/database.sqlite3")
         else:
             print("Database in use: TinyMongo | Note: Database files will be saved locally in the folder: local_database")
 
-        self.local_database = LocalDatabase()
+        if self.config["LOCAL_DATABASE_SQLITE"]:
+            self.local_database = SQLiteDatabase()
+        else:
+            self.local_database = LocalDatabase()
+
+        self.settings_cache = TTLCache(ttl=self.config["SETTINGS_CACHE_TTL"], max_size=self.config["SETTINGS_CACHE_MAX_SIZE"])
+        self.user_prefix_cache = TTLCache(ttl=self.config["PREFIX_CACHE_TTL"], max_size=self.config["PREFIX_CACHE_MAX_SIZE"])
+        self.guild_prefix_cache = TTLCache(ttl=self.config["PREFIX_CACHE_TTL"], max_size=self.config["PREFIX_CACHE_MAX_SIZE"])
+        self.track_cache = TrackLoadCache(
+            ttl=self.config["TRACK_CACHE_TTL"],
+            search_ttl=self.config["TRACK_CACHE_SEARCH_TTL"],
+            playlist_ttl=self.config["TRACK_CACHE_PLAYLIST_TTL"],
+            max_size=self.config["TRACK_CACHE_MAX_SIZE"],
+            path="./local_database/track_cache.db",
+            disk_max_size=self.config["TRACK_CACHE_DISK_MAX_SIZE"],
+            codec=get_codec(self.config["LAVALINK_JSON_CODEC"]),
+        )
+
+        self.suggestions = SuggestionService(
+            ttl=self.config["AUTOCOMPLETE_CACHE_TTL"],
+            max_size=self.config["AUTOCOMPLETE_CACHE_SIZE"],
+            timeout=self.config["AUTOCOMPLETE_TIMEOUT_MS"] / 1000,
+        )
+
+        if self.config["TRACK_INDEX_TTL"] > 0:
+            self.track_index = TrackResolutionIndex(
+                "./local_database/track_index.db",
+                ttl=self.config["TRACK_INDEX_TTL"],
+                max_size=self.config["TRACK_INDEX_CACHE_SIZE"],
+            )
 
         try:
             self.commit = check_output(['git', 'rev-parse', 'HEAD']).decode('ascii').strip()
@@ -338,7 +407,7 @@ class BotPool:
 
         self.ws_client = WSClient(self.config["RPC_SERVER"], pool=self)
 
-        self.spotify: Optional[spotipy.Spotify] = spotify_client(self.config)
+        self.spotify: Optional[SpotifyClient] = spotify_client(self.config, session_getter=self.get_http_session)
 
         all_tokens = {}
 
@@ -642,11 +711,11 @@ class BotPool:
 class BotCore(commands.AutoShardedBot):
 
     def __init__(self, *args, **kwargs):
-        self.session: Optional[aiohttp.ClientError] = None
+        self.session: Optional[aiohttp.ClientSession] = None
         self.pool: BotPool = kwargs.pop('pool')
         self.default_prefix = kwargs.pop("default_prefix", "!!")
-        self.spotify: Optional[spotipy.Spotify] = self.pool.spotify
-        self.session = aiohttp.ClientSession()
+        self.spotify: Optional[SpotifyClient] = self.pool.spotify
+        self.session = self.pool.get_http_session()
         self.color = kwargs.pop("embed_color", None)
         self.identifier = kwargs.pop("identifier", "")
         self.appinfo: Optional[disnake.AppInfo] = None
@@ -677,6 +746,23 @@ class BotCore(commands.AutoShardedBot):
             except ValueError:
                 print(f"Owner_ID invalid {i}")
 
+    async def close(self):
+
+        if session_cog := self.get_cog("PlayerSession"):
+            # the sessions of an interrupted flush return to the pending sessions.
+            if (task := session_cog.mongo_flush_task) and not task.done():
+                task.cancel()
+                await asyncio.wait({task})
+            await session_cog.flush_sessions_mongo()
+
+        await self.pool.flush_database()
+        self.music.close()
+        try:
+            self.pool.ytdl.close()
+        except AttributeError:
+            pass
+        await super().close()
+
     async def edit_voice_channel_status(
             self, status: Optional[str], *, channel_id: int, reason: Optional[str] = None
     ):
@@ -742,18 +828,14 @@ class BotCore(commands.AutoShardedBot):
         return self.pool.ws_client
 
     async def get_data(self, id_: int, *, db_name: Union[DBModel.guilds, DBModel.users]):
-        return await self.pool.database.get_data(
-            id_=id_, db_name=db_name, collection=str(self.user.id)
-        )
+        return await self.get_cached_data(id_=id_, db_name=db_name, collection=str(self.user.id))
 
     async def update_data(self, id_, data: dict, *, db_name: Union[DBModel.guilds, DBModel.users]):
-        return await self.pool.database.update_data(
-            id_=id_, data=data, db_name=db_name, collection=str(self.user.id)
-        )
+        return await self.update_cached_data(id_=id_, data=data, db_name=db_name, collection=str(self.user.id))
 
     async def get_global_data(self, id_: int, *, db_name: Union[DBModel.guilds, DBModel.users]):
 
-        data = await self.pool.database.get_data(
+        data = await self.get_cached_data(
             id_=id_, db_name=db_name, collection="global", default_model=global_db_models
         )
 
@@ -772,11 +854,50 @@ class BotCore(commands.AutoShardedBot):
                 self.pool.rpc_token_cache[int(id_)] = data["token"]
             except KeyError:
                 pass
+            try:
+                self.pool.user_prefix_cache[int(id_)] = data["custom_prefix"]
+            except KeyError:
+                self.pool.user_prefix_cache.pop(int(id_))
+
+        elif db_name == DBModel.guilds:
+            try:
+                self.pool.guild_prefix_cache[int(id_)] = data["prefix"] or ""
+            except KeyError:
+                self.pool.guild_prefix_cache.pop(int(id_))
 
-        return await self.pool.database.update_data(
+        return await self.update_cached_data(
             id_=id_, data=data, db_name=db_name, collection="global", default_model=global_db_models
         )
 
+    def peek_cached_data(self, id_: int, *, db_name: Union[DBModel.guilds, DBModel.users], collection: str = None) -> Optional[dict]:
+        # returns the cached data without copying it (read-only usage) or None if the data is not cached.
+        return self.pool.settings_cache.get((collection or str(self.user.id), db_name, str(id_)))
+
+    async def get_cached_data(self, id_: int, *, db_name: str, collection: str, default_model: dict = None):
+
+        key = (collection, db_name, str(id_))
+
+        if (data := self.pool.settings_cache.get(key)) is not None:
+            return deepcopy(data)
+
+        data = await self.pool.database.get_data(
+            id_=id_, db_name=db_name, collection=collection, default_model=default_model
+        )
+
+        self.pool.settings_cache.add(key, deepcopy(data))
+
+        return data
+
+    async def update_cached_data(self, id_, data: dict, *, db_name: str, collection: str, default_model: dict = None):
+
+        data = await self.pool.database.update_data(
+            id_=id_, data=data, db_name=db_name, collection=collection, default_model=default_model
+        )
+
+        self.pool.settings_cache.set((collection, db_name, str(id_)), deepcopy(data))
+
+        return data
+
     def check_skin(self, skin: str):
 
         if skin is None:
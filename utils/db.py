@@ -1,23 +1,32 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import asyncio
 import collections.abc
 import json
 import os
+import re
 import shutil
+import time
 import traceback
+import weakref
+from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Union, Optional
 from urllib.parse import urlparse, parse_qs, urlunparse, urlencode
 
+import aiosqlite
 import disnake
 from disnake.ext import commands
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
 from tinydb_serialization import Serializer, SerializationMiddleware
 from tinymongo import TinyMongoClient
 from tinymongo.serializers import DateTimeSerializer
 
+from wavelink.codec import JSONCodec, get_codec
+
 if TYPE_CHECKING:
     from utils.client import BotCore
 
@@ -100,7 +109,8 @@ async def get_prefix(bot: BotCore, message: disnake.Message):
         guild_prefix = bot.pool.guild_prefix_cache[message.guild.id]
     except KeyError:
         data = await bot.get_global_data(message.guild.id, db_name=DBModel.guilds)
-        guild_prefix = data.get("prefix")
+        guild_prefix = data.get("prefix") or ""
+        bot.pool.guild_prefix_cache[message.guild.id] = guild_prefix
 
     if not guild_prefix:
         guild_prefix = bot.config.get("DEFAULT_PREFIX") or "!!"
@@ -108,6 +118,80 @@ async def get_prefix(bot: BotCore, message: disnake.Message):
     return guild_prefix
 
 
+_missing = object()
+
+
+class TTLCache:
+
+    def __init__(self, ttl: int = 300, max_size: int = 10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, key):
+        if (value := self.get(key, _missing)) is _missing:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def get(self, key, default=None):
+
+        try:
+            expires_at, value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+
+        self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def add(self, key, value):
+        # only stores the value if there's no live entry (avoids overwriting a newer value written during a db read).
+        try:
+            if self._data[key][0] >= time.monotonic():
+                return
+        except KeyError:
+            pass
+        self.set(key, value)
+
+    def pop(self, key, default=None):
+        try:
+            return self._data.pop(key)[1]
+        except KeyError:
+            return default
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        return {"size": len(self._data), "max_size": self.max_size, "ttl": self.ttl,
+                "hits": self.hits, "misses": self.misses}
+
+
 class BaseDB:
 
     def get_default(self, collection: str, db_name: Union[DBModel.guilds, DBModel.users]):
@@ -115,6 +199,9 @@ class BaseDB:
             return deepcopy(global_db_models[db_name])
         return deepcopy(db_models[db_name])
 
+    async def flush(self):
+        pass
+
 
 
 class DatetimeSerializer(Serializer):
@@ -196,11 +283,565 @@ class LocalDatabase(BaseDB):
             return
 
 
+async def connect_sqlite(path: str, *schema: str) -> aiosqlite.Connection:
+
+    connection = await aiosqlite.connect(path)
+    await connection.execute("PRAGMA journal_mode=WAL")
+    await connection.execute("PRAGMA synchronous=NORMAL")
+
+    for statement in schema:
+        await connection.execute(statement)
+
+    await connection.commit()
+
+    return connection
+
+
+class SQLiteDatabase(BaseDB):
+
+    def __init__(self, path="./local_database/database.sqlite3", migrate_from: str = "./local_database"):
+        super().__init__()
+
+        if not os.path.isdir(dir_:=os.path.dirname(path) or "."):
+            os.makedirs(dir_)
+
+        self.path = path
+        self.migrate_from = migrate_from
+        self._connect: Optional[aiosqlite.Connection] = None
+        self._connect_lock = asyncio.Lock()
+        # one lock per document (update_data reads and writes the document in separate steps).
+        self._update_locks = weakref.WeakValueDictionary()
+
+    async def get_connection(self) -> aiosqlite.Connection:
+
+        if self._connect:
+            return self._connect
+
+        async with self._connect_lock:
+
+            if self._connect:
+                return self._connect
+
+            connection = await connect_sqlite(
+                self.path,
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "collection TEXT NOT NULL, db_name TEXT NOT NULL, _id TEXT NOT NULL, data BLOB NOT NULL, "
+                "PRIMARY KEY (collection, db_name, _id)) WITHOUT ROWID"
+            )
+
+            if self.migrate_from:
+                try:
+                    await self.migrate_tinymongo(connection, self.migrate_from)
+                except:
+                    traceback.print_exc()
+
+            self._connect = connection
+
+        return self._connect
+
+    async def migrate_tinymongo(self, connection: aiosqlite.Connection, dir_: str):
+
+        if not os.path.isdir(dir_):
+            return
+
+        files = [f for f in os.listdir(dir_) if f.endswith(".json")]
+
+        if not files:
+            return
+
+        if not os.path.isdir(backup_dir:=os.path.join(dir_, "backups")):
+            os.makedirs(backup_dir)
+
+        for f in files:
+
+            with open(os.path.join(dir_, f)) as file:
+                data = json.load(file)
+
+            collection = f[:-5]
+            documents = []
+
+            for db_name, db_data in data.items():
+
+                if not db_data or db_name == "_default":
+                    continue
+
+                for doc in db_data.values():
+                    try:
+                        documents.append((collection, db_name, str(doc["_id"]), json.dumps(doc, default=str)))
+                    except KeyError:
+                        continue
+
+            await connection.executemany(
+                "INSERT OR IGNORE INTO documents (collection, db_name, _id, data) VALUES (?, ?, ?, ?)", documents
+            )
+            await connection.commit()
+
+            shutil.move(os.path.join(dir_, f), os.path.join(backup_dir, f))
+
+            print(f"SQLite: {len(documents)} documents migrated from {f}")
+
+    async def find_one(self, id_: str, *, db_name: str, collection: str) -> Optional[dict]:
+
+        connection = await self.get_connection()
+
+        async with connection.execute(
+                "SELECT data FROM documents WHERE collection = ? AND db_name = ? AND _id = ?", (collection, db_name, id_)
+        ) as cursor:
+            row = await cursor.fetchone()
+
+        if row:
+            return json.loads(row[0])
+
+    async def get_data(self, id_: int, *, db_name: Union[DBModel.guilds, DBModel.users],
+                       collection: str, default_model: dict = None):
+
+        if not default_model:
+            default_model = db_models
+
+        id_ = str(id_)
+
+        data = await self.find_one(id_, db_name=db_name, collection=collection)
+
+        if not data:
+            data = default_model[db_name].copy()
+            data["_id"] = id_
+            await self.update_data(id_, data, db_name=db_name, collection=collection)
+
+        elif data["ver"] != default_model[db_name]["ver"]:
+            data = update_values(default_model[db_name].copy(), data)
+            data["ver"] = default_model[db_name]["ver"]
+
+            await self.update_data(id_, data, db_name=db_name, collection=collection)
+
+        return data
+
+    async def update_data(self, id_, data: dict, *, db_name: Union[DBModel.guilds, DBModel.users],
+                          collection: str, default_model: dict = None):
+
+        id_ = str(id_)
+        data["_id"] = id_
+
+        try:
+            lock = self._update_locks[(collection, db_name, id_)]
+        except KeyError:
+            lock = self._update_locks[(collection, db_name, id_)] = asyncio.Lock()
+
+        async with lock:
+
+            # same behavior of $set: only the provided top-level fields are replaced.
+            if current_data := await self.find_one(id_, db_name=db_name, collection=collection):
+                current_data.update(data)
+            else:
+                current_data = data
+
+            connection = await self.get_connection()
+
+            try:
+                await connection.execute(
+                    "INSERT INTO documents (collection, db_name, _id, data) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (collection, db_name, _id) DO UPDATE SET data = excluded.data",
+                    (collection, db_name, id_, json.dumps(current_data, default=str))
+                )
+                await connection.commit()
+            except:
+                traceback.print_exc()
+
+        return data
+
+    async def query_data(self, db_name: str, collection: str, filter: dict = None, limit=500) -> list:
+
+        connection = await self.get_connection()
+
+        if not filter:
+            async with connection.execute(
+                    "SELECT data FROM documents WHERE collection = ? AND db_name = ? LIMIT ?", (collection, db_name, limit)
+            ) as cursor:
+                return [json.loads(row[0]) async for row in cursor]
+
+        results = []
+
+        # the filter is checked on the decoded documents (the rows are read until the limit is reached).
+        async with connection.execute(
+                "SELECT data FROM documents WHERE collection = ? AND db_name = ?", (collection, db_name)
+        ) as cursor:
+            async for row in cursor:
+                data = json.loads(row[0])
+                if any(data.get(k) != v for k, v in filter.items()):
+                    continue
+                results.append(data)
+                if len(results) >= limit:
+                    break
+
+        return results
+
+    async def delete_data(self, id_, db_name: str, collection: str):
+
+        connection = await self.get_connection()
+
+        await connection.execute(
+            "DELETE FROM documents WHERE collection = ? AND db_name = ? AND _id = ?", (collection, db_name, str(id_))
+        )
+        await connection.commit()
+
+    async def close(self):
+        if self._connect:
+            await self._connect.close()
+            self._connect = None
+
+
+class PlayerSessionStore:
+
+    def __init__(self, path: str):
+
+        if not os.path.isdir(dir_:=os.path.dirname(path) or "."):
+            os.makedirs(dir_)
+
+        self.path = path
+        self._connect: Optional[aiosqlite.Connection] = None
+        self._connect_lock = asyncio.Lock()
+
+    async def get_connection(self) -> aiosqlite.Connection:
+
+        if self._connect:
+            return self._connect
+
+        async with self._connect_lock:
+
+            if not self._connect:
+                self._connect = await connect_sqlite(
+                    self.path,
+                    "CREATE TABLE IF NOT EXISTS sessions (guild_id TEXT PRIMARY KEY, data BLOB NOT NULL) WITHOUT ROWID",
+                    "CREATE TABLE IF NOT EXISTS journal (seq INTEGER PRIMARY KEY AUTOINCREMENT, guild_id TEXT NOT NULL, data BLOB NOT NULL)",
+                    "CREATE INDEX IF NOT EXISTS journal_guild_id ON journal (guild_id)",
+                )
+
+        return self._connect
+
+    async def save(self, id_, data: bytes):
+        # the snapshot replaces the previous one and its journal entries in a single transaction.
+        connection = await self.get_connection()
+        await connection.execute(
+            "INSERT INTO sessions (guild_id, data) VALUES (?, ?) "
+            "ON CONFLICT (guild_id) DO UPDATE SET data = excluded.data", (str(id_), data)
+        )
+        await connection.execute("DELETE FROM journal WHERE guild_id = ?", (str(id_),))
+        await connection.commit()
+
+    async def append_journal(self, id_, data: bytes):
+        connection = await self.get_connection()
+        await connection.execute("INSERT INTO journal (guild_id, data) VALUES (?, ?)", (str(id_), data))
+        await connection.commit()
+
+    async def load_all(self) -> list:
+
+        connection = await self.get_connection()
+
+        journal = {}
+
+        async with connection.execute("SELECT guild_id, data FROM journal ORDER BY seq") as cursor:
+            async for guild_id, data in cursor:
+                journal.setdefault(guild_id, []).append(data)
+
+        async with connection.execute("SELECT guild_id, data FROM sessions") as cursor:
+            return [(guild_id, data, journal.get(guild_id, [])) async for guild_id, data in cursor]
+
+    async def delete(self, id_):
+        connection = await self.get_connection()
+        await connection.execute("DELETE FROM sessions WHERE guild_id = ?", (str(id_),))
+        await connection.execute("DELETE FROM journal WHERE guild_id = ?", (str(id_),))
+        await connection.commit()
+
+    async def close(self):
+        if self._connect:
+            await self._connect.close()
+            self._connect = None
+
+
+class TrackCacheStore:
+
+    def __init__(self, path: str, max_size: int = 100000):
+
+        if not os.path.isdir(dir_:=os.path.dirname(path) or "."):
+            os.makedirs(dir_)
+
+        self.path = path
+        self.max_size = max_size
+        self._connect: Optional[aiosqlite.Connection] = None
+        self._connect_lock = asyncio.Lock()
+        self._writes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get_connection(self) -> aiosqlite.Connection:
+
+        if self._connect:
+            return self._connect
+
+        async with self._connect_lock:
+
+            if not self._connect:
+                self._connect = await connect_sqlite(
+                    self.path,
+                    "CREATE TABLE IF NOT EXISTS tracks (key TEXT PRIMARY KEY, data BLOB NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID",
+                    "CREATE INDEX IF NOT EXISTS tracks_expires_at ON tracks (expires_at)",
+                )
+
+        return self._connect
+
+    async def get(self, key: str) -> Optional[tuple]:
+
+        connection = await self.get_connection()
+
+        async with connection.execute("SELECT data, expires_at FROM tracks WHERE key = ?", (key,)) as cursor:
+            row = await cursor.fetchone()
+
+        if not row or row[1] < time.time():
+            return
+
+        return row
+
+    async def set(self, key: str, data: bytes, ttl: float):
+
+        connection = await self.get_connection()
+        await connection.execute(
+            "INSERT INTO tracks (key, data, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at",
+            (key, data, time.time() + ttl)
+        )
+        await connection.commit()
+
+        self._writes += 1
+
+        # the size cap is checked periodically (instead of counting the rows on every write).
+        if self._writes >= 100:
+            self._writes = 0
+            await self.evict()
+
+    async def evict(self):
+
+        connection = await self.get_connection()
+
+        cursor = await connection.execute("DELETE FROM tracks WHERE expires_at < ?", (time.time(),))
+        self.expirations += max(cursor.rowcount, 0)
+
+        async with connection.execute("SELECT COUNT(*) FROM tracks") as c:
+            size = (await c.fetchone())[0]
+
+        if size > self.max_size:
+            # removes the entries closest to expiring.
+            cursor = await connection.execute(
+                "DELETE FROM tracks WHERE key IN (SELECT key FROM tracks ORDER BY expires_at LIMIT ?)",
+                (size - self.max_size,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+
+        await connection.commit()
+
+    def stats(self):
+        return {"max_size": self.max_size, "evictions": self.evictions, "expirations": self.expirations}
+
+    async def close(self):
+        if self._connect:
+            await self._connect.close()
+            self._connect = None
+
+
+class TrackLoadCache:
+
+    search_regex = re.compile(r"^[a-z]+search:", re.IGNORECASE)
+
+    def __init__(self, *, ttl: int = 259200, search_ttl: int = 3600, playlist_ttl: int = 1800,
+                 max_size: int = 5000, path: Optional[str] = None, disk_max_size: int = 100000,
+                 codec: Optional[JSONCodec] = None):
+
+        self.codec = codec or get_codec()
+        self.ttl = ttl
+        self.search_ttl = search_ttl
+        self.playlist_ttl = playlist_ttl
+        self.memory = TTLCache(ttl=ttl, max_size=max_size)
+        self.store = TrackCacheStore(path, max_size=disk_max_size) if path and disk_max_size > 0 else None
+        self.disk_hits = 0
+        self.disk_errors = 0
+
+    def get_ttl(self, query: str, data) -> int:
+
+        if not isinstance(data, dict):
+            return 0
+
+        loadtype = data.get("loadType")
+
+        # errors and empty results are not cached.
+        if loadtype not in ("track", "TRACK_LOADED", "playlist", "PLAYLIST_LOADED", "search", "SEARCH_RESULT"):
+            return 0
+
+        # searches and youtube mixes (the results change over time).
+        if loadtype in ("search", "SEARCH_RESULT") or self.search_regex.match(query) or "list=RD" in query:
+            return self.search_ttl
+
+        if loadtype in ("playlist", "PLAYLIST_LOADED"):
+            return self.playlist_ttl
+
+        return self.ttl
+
+    async def get(self, key: str):
+
+        if (data := self.memory.get(key)) is None and self.store:
+
+            try:
+                row = await self.store.get(key)
+            except Exception:
+                self.disk_errors += 1
+                traceback.print_exc()
+                row = None
+
+            if row:
+                data = row[0]
+                self.disk_hits += 1
+                self.memory.set(key, data, ttl=row[1] - time.time())
+
+        if data is not None:
+            # each call returns a new object (the tracks built from the result are modified by the players).
+            return self.codec.loads(data)
+
+    async def set(self, key: str, query: str, data):
+
+        if not (ttl := self.get_ttl(query, data)):
+            return
+
+        data = self.codec.dumps(data)
+
+        self.memory.set(key, data, ttl=ttl)
+
+        if self.store:
+            try:
+                await self.store.set(key, data, ttl)
+            except Exception:
+                self.disk_errors += 1
+                traceback.print_exc()
+
+    def stats(self):
+        stats = {"memory": self.memory.stats(), "disk_hits": self.disk_hits, "disk_errors": self.disk_errors}
+        if self.store:
+            stats["disk"] = self.store.stats()
+        return stats
+
+
+class TrackResolutionIndex:
+
+    def __init__(self, path: str, *, ttl: int = 2592000, max_size: int = 20000):
+
+        if not os.path.isdir(dir_:=os.path.dirname(path) or "."):
+            os.makedirs(dir_)
+
+        self.path = path
+        self.ttl = ttl
+        self.memory = TTLCache(ttl=ttl, max_size=max_size)
+        self._connect: Optional[aiosqlite.Connection] = None
+        self._connect_lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get_connection(self) -> aiosqlite.Connection:
+
+        if self._connect:
+            return self._connect
+
+        async with self._connect_lock:
+
+            if not self._connect:
+                self._connect = await connect_sqlite(
+                    self.path,
+                    "CREATE TABLE IF NOT EXISTS resolved (key TEXT PRIMARY KEY, track TEXT NOT NULL, identifier TEXT, "
+                    "length INTEGER, validated_at REAL NOT NULL) WITHOUT ROWID",
+                )
+
+        return self._connect
+
+    async def get(self, *keys: str) -> Optional[dict]:
+
+        for key in keys:
+
+            if (data := self.memory.get(key)) is None:
+
+                connection = await self.get_connection()
+
+                async with connection.execute(
+                        "SELECT track, identifier, length, validated_at FROM resolved WHERE key = ?", (key,)
+                ) as cursor:
+                    row = await cursor.fetchone()
+
+                if not row:
+                    continue
+
+                data = {"track": row[0], "identifier": row[1], "length": row[2], "validated_at": row[3]}
+                self.memory.set(key, data)
+
+            # entries resolved a long time ago are resolved again (the chosen track can become unavailable).
+            if data["validated_at"] + self.ttl < time.time():
+                continue
+
+            self.hits += 1
+            return data
+
+        self.misses += 1
+
+    async def set(self, keys: list, *, track: str, identifier: str, length: int):
+
+        data = {"track": track, "identifier": identifier, "length": length, "validated_at": time.time()}
+
+        for key in keys:
+            self.memory.set(key, data)
+
+        connection = await self.get_connection()
+        await connection.executemany(
+            "INSERT INTO resolved (key, track, identifier, length, validated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET track = excluded.track, identifier = excluded.identifier, "
+            "length = excluded.length, validated_at = excluded.validated_at",
+            [(key, track, identifier, length, data["validated_at"]) for key in keys]
+        )
+        await connection.commit()
+
+    async def invalidate(self, keys: list):
+
+        for key in keys:
+            self.memory.pop(key)
+
+        connection = await self.get_connection()
+        await connection.executemany("DELETE FROM resolved WHERE key = ?", [(key,) for key in keys])
+        await connection.commit()
+
+        self.invalidations += 1
+
+    def stats(self):
+        return {"memory": self.memory.stats(), "hits": self.hits, "misses": self.misses,
+                "invalidations": self.invalidations}
+
+    async def close(self):
+        if self._connect:
+            await self._connect.close()
+            self._connect = None
+
+
 class MongoDatabase(BaseDB):
 
-    def __init__(self, token: str, timeout=30):
+    def __init__(self, token: str, timeout=30, write_behind_interval: float = 0):
         super().__init__()
 
+        self.write_behind_interval = write_behind_interval
+        self._pending_writes: dict = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self.write_behind_stats = {
+            "queued": 0,
+            "coalesced": 0,
+            "flushes": 0,
+            "flushed_docs": 0,
+            "errors": 0,
+            "last_flush_latency": 0.0,
+            "max_flush_latency": 0.0,
+        }
+
         try:
             shutil.rmtree("./.db_cache")
         except:
@@ -280,6 +921,9 @@ class MongoDatabase(BaseDB):
         if not data:
             data = await self._connect[collection][db_name].find_one({"_id": id_})
 
+            if data and (pending_data := self._pending_writes.get((collection, db_name, id_))):
+                data.update(pending_data)
+
         if not data:
             data = default_model[db_name].copy()
             try:
@@ -304,16 +948,102 @@ class MongoDatabase(BaseDB):
     async def update_data(self, id_, data: dict, *, db_name: Union[DBModel.guilds, DBModel.users, str],
                           collection: str, default_model: dict = None):
 
-        await self._connect[collection][db_name].update_one({'_id': str(id_)}, {'$set': data}, upsert=True)
+        if self.write_behind_interval > 0:
+            self.queue_write(id_, data, db_name=db_name, collection=collection)
+        else:
+            await self._connect[collection][db_name].update_one({'_id': str(id_)}, {'$set': data}, upsert=True)
+
         await self.cache.update_data(id_, data, db_name=db_name, collection=collection, default_model=default_model)
         return data
 
+    def queue_write(self, id_, data: dict, *, db_name: str, collection: str):
+
+        key = (collection, db_name, str(id_))
+
+        try:
+            self._pending_writes[key].update(deepcopy(data))
+            self.write_behind_stats["coalesced"] += 1
+        except KeyError:
+            self._pending_writes[key] = deepcopy(data)
+
+        self.write_behind_stats["queued"] += 1
+
+        if not self._flush_task or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    @property
+    def pending_writes(self) -> int:
+        return len(self._pending_writes)
+
+    async def _delayed_flush(self):
+        while self._pending_writes:
+            await asyncio.sleep(self.write_behind_interval)
+            await self.flush()
+
+    async def flush(self):
+
+        async with self._flush_lock:
+
+            if not self._pending_writes:
+                return
+
+            pending_writes, self._pending_writes = self._pending_writes, {}
+
+            operations = {}
+
+            for (collection, db_name, id_), data in pending_writes.items():
+                operations.setdefault((collection, db_name), []).append(
+                    UpdateOne({'_id': id_}, {'$set': data}, upsert=True)
+                )
+
+            start = time.perf_counter()
+
+            for (collection, db_name), ops in operations.items():
+                try:
+                    await self._connect[collection][db_name].bulk_write(ops, ordered=False)
+                except Exception:
+                    traceback.print_exc()
+                    self.write_behind_stats["errors"] += 1
+                    # requeue failed writes without overwriting newer data queued during the flush.
+                    for key, data in pending_writes.items():
+                        if key[:2] == (collection, db_name):
+                            self._pending_writes[key] = dict(data, **self._pending_writes.get(key, {}))
+                else:
+                    self.write_behind_stats["flushed_docs"] += len(ops)
+
+            latency = time.perf_counter() - start
+
+            self.write_behind_stats["flushes"] += 1
+            self.write_behind_stats["last_flush_latency"] = latency
+            if latency > self.write_behind_stats["max_flush_latency"]:
+                self.write_behind_stats["max_flush_latency"] = latency
+
+    def stats(self):
+        return dict(self.write_behind_stats, queue_depth=len(self._pending_writes))
+
+    async def bulk_update(self, data: dict, *, db_name: str, collection: str):
+        # writes directly to mongo (bypasses the local cache and the write-behind queue).
+        if not data:
+            return
+        await self._connect[collection][db_name].bulk_write(
+            [UpdateOne({'_id': str(id_)}, {'$set': d}, upsert=True) for id_, d in data.items()], ordered=False
+        )
+
+    async def iter_data(self, db_name: str, collection: str, filter: dict = None, batch_size: int = 50):
+        async for d in self._connect[collection][db_name].find(filter or {}, batch_size=batch_size):
+            yield d
+
     async def query_data(self, db_name: str, collection: str, filter: dict = None, limit=100) -> list:
+        if self._pending_writes:
+            await self.flush()
         return [d async for d in self._connect[collection][db_name].find(filter or {})]
 
     async def delete_data(self, id_, db_name: str, collection: str):
-        await self.cache.delete_data(id_, db_name=db_name, collection=collection)
-        return await self._connect[collection][db_name].delete_one({'_id': str(id_)})
+        # waits for a flush in progress (its upsert would recreate the document after the delete).
+        async with self._flush_lock:
+            self._pending_writes.pop((collection, db_name, str(id_)), None)
+            await self.cache.delete_data(id_, db_name=db_name, collection=collection)
+            return await self._connect[collection][db_name].delete_one({'_id': str(id_)})
 
 
 def update_values(d, u):
@@ -1,14 +1,17 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import asyncio
 import datetime
 import json
 import re
 import traceback
-from typing import Union, TYPE_CHECKING
+from typing import Union, TYPE_CHECKING, Dict
 
 import disnake
 
+from utils.db import TTLCache
+
 if TYPE_CHECKING:
     pass
 
@@ -31,9 +34,20 @@ replaces = [
 ]
 
 
-async def google_search(bot, query: str, *, max_entries: int = 20) -> list:
+class SuggestionService:
+
+    # amount of suggestions returned by google for a query (when less are returned the list is complete).
+    full_size = 10
+
+    def __init__(self, *, ttl: int = 600, max_size: int = 5000, timeout: float = 2.0, min_results: int = 5):
+        self.cache = TTLCache(ttl=ttl, max_size=max_size)
+        self.timeout = timeout
+        self.min_results = min_results
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._user_queries: Dict[int, str] = {}
+
+    async def fetch(self, bot, query: str) -> list:
 
-    try:
         async with bot.session.get(
                 "https://suggestqueries.google.com/complete/search",
                 headers={'User-Agent': bot.pool.current_useragent} if bot.pool.current_useragent else None,
@@ -47,10 +61,76 @@ async def google_search(bot, query: str, *, max_entries: int = 20) -> list:
 
             text = await r.text()
             json_text = text[text.find("(") + 1:text.rfind(")")]
-            return [result[0] for result in json.loads(json_text)[1][:max_entries]]
-    except:
-        traceback.print_exc()
-        return []
+            return [result[0] for result in json.loads(json_text)[1]]
+
+    async def fetch_and_store(self, bot, key: str, query: str) -> list:
+
+        try:
+            results = await self.fetch(bot, query)
+        except Exception:
+            traceback.print_exc()
+            return []
+        else:
+            self.cache.set(key, results)
+            return results
+        finally:
+            self._pending.pop(key, None)
+
+    def get_local(self, key: str) -> tuple:
+
+        if (results := self.cache.get(key)) is not None:
+            return results, True
+
+        # filters the results of a shorter query already cached (ex: "abc" for "abcd").
+        for i in range(len(key) - 1, 0, -1):
+
+            if (results := self.cache.get(key[:i])) is None:
+                continue
+
+            filtered = [r for r in results if r.lower().startswith(key)]
+            return filtered, len(results) < self.full_size or len(filtered) >= self.min_results
+
+        return [], False
+
+    async def search(self, bot, query: str, *, user_id: int = None, max_entries: int = 20) -> list:
+
+        if not (key := " ".join(query.lower().split())):
+            return []
+
+        results, complete = self.get_local(key)
+
+        if complete:
+            return results[:max_entries]
+
+        if not (task := self._pending.get(key)):
+            task = self._pending[key] = bot.loop.create_task(self.fetch_and_store(bot, key, query))
+
+        if user_id is not None:
+
+            # cancels the previous search of the user (superseded by the new text typed).
+            if (previous := self._user_queries.get(user_id)) and previous != key and \
+                    (previous_task := self._pending.get(previous)) and \
+                    sum(1 for q in self._user_queries.values() if q == previous) == 1:
+                previous_task.cancel()
+
+            self._user_queries[user_id] = key
+
+        try:
+            # returns the partial/cached results if the search takes longer than the autocomplete time limit.
+            return (await asyncio.wait_for(asyncio.shield(task), timeout=self.timeout))[:max_entries]
+        except asyncio.TimeoutError:
+            return results[:max_entries]
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+            return results[:max_entries]
+        finally:
+            if user_id is not None and self._user_queries.get(user_id) == key:
+                del self._user_queries[user_id]
+
+
+async def google_search(bot, query: str, *, max_entries: int = 20, user_id: int = None) -> list:
+    return await bot.pool.suggestions.search(bot, query, user_id=user_id, max_entries=max_entries)
 
 
 def get_button_style(enabled: bool, red=True):
@@ -9,6 +9,7 @@ import traceback
 from base64 import b64decode, b64encode
 from copy import deepcopy
 from io import BytesIO
+from itertools import chain
 from typing import List, Union, Optional, TYPE_CHECKING, Literal
 
 import disnake
@@ -82,7 +83,7 @@ class QueueInteraction(disnake.ui.View):
 
         self.current_page = 0
         self.track_pages.clear()
-        self.track_pages = list(disnake.utils.as_chunks(player.queue + player.queue_autoplay, max_size=self.max_items))
+        self.track_pages = list(disnake.utils.as_chunks(chain(player.queue, player.queue_autoplay), max_size=self.max_items))
         self.current_track = self.track_pages[self.current_page][0]
         self.max_page = len(self.track_pages) - 1
         self.update_components()
@@ -189,18 +190,17 @@ class QueueInteraction(disnake.ui.View):
 
         track_id = interaction.values[0][13:]
 
-        track = None
-
         try:
             player: LavalinkPlayer = self.bot.music.players[self.user.guild.id]
         except KeyError:
             self.stop()
             return
 
-        for t in  player.queue + player.queue_autoplay:
-            if t.unique_id == track_id:
-                track = t
-                break
+        if not (track := player.queue.get_track(track_id)):
+            for t in player.queue_autoplay:
+                if t.unique_id == track_id:
+                    track = t
+                    break
 
         if not track:
             await interaction.send(f"Music with id \"{track_id}\" not found in the player's queue...", ephemeral=True)
@@ -956,7 +956,7 @@ class FavModalAdd(disnake.ui.Modal):
                     pass
 
                 try:
-                    result = await self.view.bot.loop.run_in_executor(None, lambda: self.view.bot.spotify.user(user_id))
+                    result = await self.view.bot.spotify.user(user_id)
                 except Exception as e:
                     await inter.send(
                         embed=disnake.Embed(
@@ -1019,7 +1019,7 @@ class FavModalAdd(disnake.ui.Modal):
                     pass
 
                 try:
-                    info = await loop.run_in_executor(None, lambda: self.view.bot.pool.ytdl.extract_info(base_url, download=False))
+                    info = await self.view.bot.pool.ytdl.extract(base_url, loop=loop)
                 except Exception as e:
                     traceback.print_exc()
                     await inter.edit_original_message(f"**An error occurred while retrieving information from the URL:** ```py\n{repr(e)}```")
@@ -3,25 +3,27 @@ from __future__ import annotations
 
 import asyncio
 import datetime
+import os
 import pprint
 import random
 import traceback
-import uuid
 from collections import deque
-from itertools import cycle
+from itertools import cycle, islice
 from time import time
-from typing import Optional, Union, TYPE_CHECKING, List
+from typing import Optional, Union, TYPE_CHECKING, List, Dict
 from urllib import parse
 from urllib.parse import quote
 
 import disnake
 
 import wavelink
+from wavelink.player import MISSING, intern_value
 from utils.db import DBModel
 from utils.music.checks import can_connect
 from utils.music.converters import fix_characters, time_format, get_button_style, YOUTUBE_VIDEO_REG
 from utils.music.filters import AudioFilter
 from utils.music.skin_utils import skin_converter
+from utils.music.track_queue import TrackQueue
 from utils.others import music_source_emoji, send_idle_embed, PlayerControls, SongRequestPurgeMode, \
     song_request_buttons
 
@@ -48,12 +50,19 @@ def get_start_pos(player, track, extra_milliseconds=0):
 
 
 class PartialPlaylist:
-    __slots__ = ('data', 'url', 'tracks')
+    __slots__ = ('data', 'url', 'tracks', 'loading_task', 'total')
 
     def __init__(self, data: dict, url: str):
         self.data = data
         self.url = url
         self.tracks = []
+        self.loading_task: Optional[asyncio.Task] = None
+        # number of tracks informed by the source (the tracks list can still be loading).
+        self.total: Optional[int] = None
+
+    @property
+    def track_count(self) -> int:
+        return max(self.total or 0, len(self.tracks))
 
     @property
     def name(self):
@@ -74,42 +83,266 @@ class PartialPlaylist:
             return ""
 
 
-class PartialTrack:
-    __slots__ = ('id', 'thumb', 'source_name', 'info', 'playlist', 'unique_id', 'ytid')
+class TrackExtraMixin:
+    # requester, loops, autoplay and thumb are kept in slots and the other "extra" keys in a small dict.
+    # the info dict is only created when accessed (after that the properties use it).
+    __slots__ = ()
+
+    def _load_extra(self, extra: Optional[dict], requester=0, track_loops=0, autoplay=False, thumb=MISSING):
+
+        if extra:
+            extra = dict(extra)
+            requester = extra.pop("requester", requester)
+            track_loops = extra.pop("track_loops", track_loops)
+            autoplay = extra.pop("autoplay", autoplay)
+            thumb = extra.pop("thumb", thumb)
+
+        self._requester = intern_value(requester)
+        self._track_loops = track_loops
+        self._autoplay = autoplay
+        self._thumb = thumb
+        self._extra = extra or None
+
+    def _dump_extra(self) -> dict:
+
+        extra = {
+            "requester": self._requester,
+            "track_loops": self._track_loops,
+            "autoplay": self._autoplay,
+        }
+
+        if self._thumb is not MISSING:
+            extra["thumb"] = self._thumb
+
+        if self._extra:
+            extra.update(self._extra)
+
+        return extra
+
+    def get_extra(self, key: str, default=None):
+        if self._info is not None:
+            return self._info["extra"].get(key, default)
+        if self._extra:
+            return self._extra.get(key, default)
+        return default
+
+    def set_extra(self, key: str, value):
+        if self._info is not None:
+            self._info["extra"][key] = value
+        elif self._extra is None:
+            self._extra = {key: value}
+        else:
+            self._extra[key] = value
+
+    def to_dict(self) -> dict:
+        # new dict with the track info (used to save the track without keeping the info dict in the track).
+        if self._info is not None:
+            return dict(self._info)
+        return self._build_info()
+
+    @property
+    def requester(self) -> int:
+        if self._info is not None:
+            return self._info["extra"]["requester"]
+        return self._requester
+
+    @property
+    def track_loops(self) -> int:
+        if self._info is not None:
+            return self._info["extra"]["track_loops"]
+        return self._track_loops
+
+    @track_loops.setter
+    def track_loops(self, value: int):
+        if self._info is not None:
+            self._info["extra"]["track_loops"] = value
+        else:
+            self._track_loops = value
+
+    @property
+    def autoplay(self) -> bool:
+        if self._info is not None:
+            return self._info["extra"].get("autoplay", False)
+        return self._autoplay
+
+    @property
+    def lyrics(self) -> str:
+        return self.get_extra("lyrics", "")
+
+    @property
+    def album_name(self) -> str:
+        try:
+            return self.get_extra("album")["name"]
+        except (TypeError, KeyError):
+            return ""
+
+    @property
+    def album_url(self) -> str:
+        try:
+            return self.get_extra("album")["url"]
+        except (TypeError, KeyError):
+            return ""
+
+    @property
+    def playlist_name(self) -> str:
+        try:
+            return self.playlist.name[:97]
+        except AttributeError:
+            return ""
+
+    @property
+    def playlist_url(self) -> str:
+        try:
+            return self.playlist.url
+        except AttributeError:
+            return ""
+
+
+class PartialTrack(TrackExtraMixin):
+    __slots__ = ('id', 'ytid', 'playlist', '_unique_id', '_info', '_author', '_title', '_uri', '_length',
+                 '_is_stream', '_source_name', '_isrc', '_original_id', '_others', '_requester', '_track_loops',
+                 '_autoplay', '_thumb', '_extra')
+
+    fields = {
+        "author": "_author",
+        "title": "_title",
+        "uri": "_uri",
+        "length": "_length",
+        "isStream": "_is_stream",
+        "sourceName": "_source_name",
+        "isrc": "_isrc",
+    }
 
     def __init__(self, *, uri: str = "", title: str = "", author="", thumb: str = "", duration: int = 0,
                  requester: int = 0, track_loops: int = 0, source_name: str = "", autoplay: bool = False,
                  original_id: str = "", info: dict = None, playlist: PartialPlaylist = None):
 
-        self.info = info or {
-            "author": fix_characters(author)[:97],
-            "title": title[:97],
-            "uri": uri,
-            "length": duration,
-            "isStream": False,
-            "isSeekable": True,
-            "sourceName": source_name,
-            "extra": {
-                "original_id": original_id,
-                "requester": requester,
-                "track_loops": track_loops,
-                "thumb": thumb,
-                "autoplay": autoplay
-            }
-        }
-
         self.id = ""
         self.ytid = ""
-        self.unique_id = str(uuid.uuid4().hex)[:10]
-        self.thumb = self.info["extra"]["thumb"]
+        self._unique_id = None
+        self._info = None
         self.playlist: Optional[PartialPlaylist] = playlist
 
+        if info:
+            self._load_info(info)
+            return
+
+        self._author = intern_value(fix_characters(author)[:97])
+        self._title = title[:97]
+        self._uri = uri
+        self._length = duration
+        self._is_stream = False
+        self._source_name = intern_value(source_name)
+        self._isrc = None
+        self._original_id = original_id
+        self._others = None
+        self._load_extra(None, requester, track_loops, autoplay, thumb)
+
+    def _load_info(self, info: dict):
+
+        info = dict(info)
+
+        for key, attr in self.fields.items():
+            setattr(self, attr, info.pop(key, None))
+
+        self._author = intern_value(self._author or "")
+        self._source_name = intern_value(self._source_name or "")
+        self._is_stream = bool(self._is_stream)
+
+        if info.get("isSeekable", True) is True:
+            info.pop("isSeekable", None)
+
+        self._load_extra(info.pop("extra", None))
+
+        try:
+            self._original_id = self._extra.pop("original_id", "")
+        except AttributeError:
+            self._original_id = ""
+
+        self._others = info or None
+
+    def _build_info(self) -> dict:
+
+        data = {
+            "author": self._author,
+            "title": self._title,
+            "uri": self._uri,
+            "length": self._length,
+            "isStream": self._is_stream,
+            "isSeekable": True,
+            "sourceName": self._source_name,
+        }
+
+        if self._isrc:
+            data["isrc"] = self._isrc
+
+        if self._others:
+            data.update(self._others)
+
+        extra = self._dump_extra()
+        extra["original_id"] = self._original_id
+        data["extra"] = extra
+
+        return data
+
+    def _get(self, key: str):
+        if self._info is not None:
+            return self._info.get(key)
+        return getattr(self, self.fields[key])
+
+    def _set(self, key: str, value):
+        if self._info is not None:
+            self._info[key] = value
+        else:
+            setattr(self, self.fields[key], value)
+
+    @property
+    def info(self) -> dict:
+        if self._info is None:
+            self._info = self._build_info()
+        return self._info
+
+    @info.setter
+    def info(self, value: dict):
+        self._info = value
+
     def __repr__(self):
-        return f"{self.info['sourceName']} - {self.duration} - {self.authors_string} - {self.title}"
+        return f"{self.source_name} - {self.duration} - {self.authors_string} - {self.title}"
+
+    @property
+    def unique_id(self) -> str:
+        if self._unique_id is None:
+            self._unique_id = os.urandom(5).hex()
+        return self._unique_id
+
+    @property
+    def thumb(self) -> str:
+        if self._info is not None:
+            return self._info["extra"].get("thumb", "")
+        return "" if self._thumb is MISSING else self._thumb
+
+    @thumb.setter
+    def thumb(self, value: str):
+        if self._info is not None:
+            self._info["extra"]["thumb"] = value
+        else:
+            self._thumb = value
+
+    @property
+    def source_name(self) -> str:
+        return self._get("sourceName")
+
+    @property
+    def isrc(self) -> Optional[str]:
+        return self._get("isrc")
+
+    @isrc.setter
+    def isrc(self, value: str):
+        self._set("isrc", value)
 
     @property
     def uri(self) -> str:
-        return self.info["uri"]
+        return self._get("uri")
 
     @property
     def url(self) -> str:
@@ -129,124 +362,100 @@ class PartialTrack:
 
     @property
     def original_id(self) -> str:
-        try:
-            return self.info["extra"]["original_id"]
-        except KeyError:
-            return ""
+        if self._info is not None:
+            return self._info["extra"].get("original_id", "")
+        return self._original_id
 
     @property
     def single_title(self) -> str:
-        return self.info["title"]
+        return self._get("title")
 
     @property
     def author(self) -> str:
-        return self.info["author"]
+        return self._get("author")
 
     @property
     def authors_string(self) -> str:
-        try:
-            return ", ".join(self.info["extra"]["authors"])
-        except KeyError:
-            return self.author
+        if authors := self.get_extra("authors"):
+            return ", ".join(authors)
+        return self.author
 
     @property
     def authors_md(self) -> str:
-        try:
-            return self.info["extra"]["authors_md"]
-        except KeyError:
-            return ""
+        return self.get_extra("authors_md", "")
 
-    @property
-    def authors(self) -> List[str]:
-        try:
-            return self.info["extra"]["authors"]
-        except KeyError:
-            return [self.author]
+    @authors_md.setter
+    def authors_md(self, value: str):
+        self.set_extra("authors_md", value)
 
     @property
-    def lyrics(self) -> str:
-
-        try:
-            return self.info["extra"]["lyrics"]
-        except KeyError:
-            return ""
+    def authors(self) -> List[str]:
+        return self.get_extra("authors") or [self.author]
 
-    @property
-    def requester(self) -> int:
-        return self.info["extra"]["requester"]
+    @authors.setter
+    def authors(self, value: List[str]):
+        self.set_extra("authors", [intern_value(a) for a in value])
 
     @property
-    def autoplay(self) -> bool:
-        try:
-            return self.info["extra"]["autoplay"]
-        except KeyError:
-            return False
+    def album(self) -> Optional[dict]:
+        return self.get_extra("album")
 
-    @property
-    def track_loops(self) -> int:
-        return self.info["extra"]["track_loops"]
+    @album.setter
+    def album(self, value: dict):
+        self.set_extra("album", value)
 
     @property
     def is_stream(self) -> bool:
-        return self.info["isStream"]
+        return self._get("isStream")
 
     @property
     def duration(self) -> int:
-        return self.info["length"]
-
-    @property
-    def album_name(self) -> str:
-        try:
-            return self.info["extra"]["album"]["name"]
-        except KeyError:
-            return ""
+        return self._get("length")
 
-    @property
-    def album_url(self) -> str:
-        try:
-            return self.info["extra"]["album"]["url"]
-        except KeyError:
-            return ""
-
-    @property
-    def playlist_name(self) -> str:
-        try:
-            return self.playlist.name[:97]
-        except AttributeError:
-            return ""
-
-    @property
-    def playlist_url(self) -> str:
-        try:
-            return self.playlist.url
-        except AttributeError:
-            return ""
+    @duration.setter
+    def duration(self, value: int):
+        self._set("length", value)
 
 
 class LavalinkPlaylist:
-    __slots__ = ('data', 'url', 'tracks')
+    __slots__ = ('data', 'url', 'tracks', '_list_id')
 
     def __init__(self, data: dict, **kwargs):
-        self.data = data
         self.url = kwargs.pop("url")
+        self._list_id = MISSING
 
         encoded_name = kwargs.pop("encoded_name", "track")
 
+        tracks = data.pop("tracks")
+
         try:
-            if self.data['tracks'][0]['info'].get("sourceName") == "youtube":
+            if tracks[0]['info'].get("sourceName") == "youtube":
                 try:
                     self.url = f"https://www.youtube.com/playlist?list={parse.parse_qs(parse.urlparse(self.url).query)['list'][0]}"
                 except KeyError:
                     pass
         except IndexError:
             pass
+
+        # the raw track dicts are not kept (the tracks have their own compact records).
+        self.data = data
         self.tracks = [LavalinkTrack(
-            id_=track[encoded_name], info=track['info'], playlist=self, **kwargs) for track in data['tracks']]
+            id_=track[encoded_name], info=track['info'], playlist=self, **kwargs) for track in tracks]
 
     @property
     def name(self):
         return self.data["playlistInfo"]["name"]
 
+    @property
+    def list_id(self) -> Optional[str]:
+        # youtube playlist id (parsed only once for all the tracks of the playlist).
+        if self._list_id is MISSING:
+            try:
+                self._list_id = parse.parse_qs(parse.urlparse(self.url).query)['list'][0]
+            except KeyError:
+                self._list_id = None
+        return self._list_id
+
     @property
     def thumb(self):
         try:
@@ -259,64 +468,136 @@ class LavalinkPlaylist:
             return ""
 
 
-class LavalinkTrack(wavelink.Track):
-    __slots__ = ('extra', 'playlist', 'unique_id')
+class LavalinkTrack(TrackExtraMixin, wavelink.Track):
+    __slots__ = ('playlist', '_unique_id', '_title_fixed', '_uri_fixed', '_requester', '_track_loops', '_autoplay',
+                 '_extra')
 
     def __init__(self, *args, **kwargs):
-        try:
-            args[1]['title'] = fix_characters(args[1]['title'])[:97]
-        except IndexError:
-            pass
         super().__init__(*args, **kwargs)
-        self.title = fix_characters(self.title)
-        self.info["title"] = self.title
-        self.unique_id = str(uuid.uuid4().hex)[:10]
 
-        try:
-            self.info['sourceName']
-        except:
-            self.info['sourceName'] = 'LavalinkTrack'
+        # title, uri (with the playlist), thumb and unique_id are only computed on the first access.
+        self._unique_id = None
+        self._title_fixed = False
+        self._uri_fixed = False
+
+        if not self._get('sourceName'):
+            self._set('sourceName', 'LavalinkTrack')
 
         try:
-            self.info["extra"]
-        except KeyError:
-            self.info["extra"] = {
-                "track_loops": kwargs.pop('track_loops', 0),
-                "requester": kwargs.pop('requester', ''),
-                "autoplay": kwargs.pop("autoplay", '')
-            }
+            extra = self._record.others.pop("extra")
+            if not self._record.others:
+                self._record.others = None
+        except (AttributeError, KeyError):
+            extra = None
+
+        # the values saved in the track info have priority over the kwargs.
+        self._load_extra(extra, kwargs.pop('requester', ''), kwargs.pop('track_loops', 0),
+                         kwargs.pop("autoplay", ''), self._thumb)
 
         self.playlist: Optional[LavalinkPlaylist] = kwargs.pop(
             "playlist", None)
 
-        if self.info["sourceName"] == "youtube":
-            self.info["extra"]["thumb"] = f"https://img.youtube.com/vi/{self.ytid}/mqdefault.jpg"
-            if "list=" not in self.uri:
-                try:
-                    self.uri = f"{self.uri}&list={parse.parse_qs(parse.urlparse(self.playlist_url).query)['list'][0]}"
-                    self.info["uri"] = self.uri
-                except KeyError:
-                    pass
+    def _build_info(self) -> dict:
+        # computes the lazy fields before creating the info dict.
+        self.title, self.uri, self.thumb
+        data = super()._build_info()
+        data["extra"] = self._dump_extra()
+        return data
+
+    @property
+    def extra(self) -> dict:
+        return self.info["extra"]
+
+    @property
+    def unique_id(self) -> str:
+        if self._unique_id is None:
+            self._unique_id = os.urandom(5).hex()
+        return self._unique_id
+
+    @property
+    def title(self) -> str:
+        if not self._title_fixed:
+            self._set('title', fix_characters((self._get('title') or '')[:97]))
+            self._title_fixed = True
+        return self._get('title')
+
+    @title.setter
+    def title(self, value: str):
+        self._set('title', value)
+        self._title_fixed = True
 
-        elif self.info["sourceName"] == "soundcloud":
+    @property
+    def uri(self) -> str:
 
-            self.info["extra"]["thumb"] = self.info.get(
-                "artworkUrl", "").replace('large.jpg', 't500x500.jpg')
+        if self._uri_fixed:
+            return self._get('uri')
 
-            if "?in=" not in self.uri:
+        self._uri_fixed = True
+
+        uri = self._get('uri')
+        source = self._get('sourceName')
+
+        if not self.playlist or not uri:
+            return uri
+
+        if source == "youtube":
+            if "list=" not in uri:
+                if (list_id := getattr(self.playlist, "list_id", MISSING)) is MISSING:
+                    try:
+                        list_id = parse.parse_qs(parse.urlparse(self.playlist_url).query)['list'][0]
+                    except KeyError:
+                        list_id = None
+                if list_id:
+                    uri = f"{uri}&list={list_id}"
+                    self._set('uri', uri)
+
+        elif source == "soundcloud":
+            if "?in=" not in uri:
                 try:
-                    self.uri = f"{self.uri}?in=" + self.playlist_url.split("soundcloud.com/")[1]
-                    self.info["uri"] = self.uri
+                    uri = f"{uri}?in=" + self.playlist_url.split("soundcloud.com/")[1]
+                    self._set('uri', uri)
                 except:
                     pass
 
+        return uri
+
+    @uri.setter
+    def uri(self, value: str):
+        self._set('uri', value)
+        self._uri_fixed = True
+
+    @property
+    def thumb(self) -> str:
+
+        if self._info is not None:
+            try:
+                return self._info["extra"]["thumb"] or ""
+            except KeyError:
+                pass
+        elif self._thumb is not MISSING:
+            return self._thumb or ""
+
+        source = self._get('sourceName')
+
+        if source == "youtube":
+            thumb = f"https://img.youtube.com/vi/{self.ytid}/mqdefault.jpg"
+        elif source == "soundcloud":
+            thumb = (self._get('artworkUrl') or "").replace('large.jpg', 't500x500.jpg')
         else:
-            self.info["extra"]["thumb"] = self.info.get("artworkUrl", "")
+            thumb = self._get('artworkUrl') or ""
 
-        self.thumb = self.info["extra"]["thumb"] or ""
+        self.thumb = thumb
+        return thumb
+
+    @thumb.setter
+    def thumb(self, value: str):
+        if self._info is not None:
+            self._info["extra"]["thumb"] = value
+        else:
+            self._thumb = value
 
     def __repr__(self):
-        return f"{self.info['sourceName']} - {self.duration if not self.is_stream else 'stream'} - {self.authors_string} - {self.title}"
+        return f"{self._get('sourceName')} - {self.duration if not self.is_stream else 'stream'} - {self.authors_string} - {self.title}"
 
     @property
     def name(self) -> str:
@@ -328,7 +609,7 @@ class LavalinkTrack(wavelink.Track):
 
     @property
     def url(self) -> str:
-        return self.info["uri"]
+        return self.uri
 
     @property
     def search_uri(self):
@@ -342,56 +623,6 @@ class LavalinkTrack(wavelink.Track):
     def authors_string(self) -> str:
         return f"{self.author}"
 
-    @property
-    def album_name(self) -> str:
-        try:
-            return self.info["extra"]["album"]["name"]
-        except KeyError:
-            return ""
-
-    @property
-    def album_url(self) -> str:
-        try:
-            return self.info["extra"]["album"]["url"]
-        except KeyError:
-            return ""
-
-    @property
-    def lyrics(self) -> str:
-        try:
-            return self.info["extra"]["lyrics"]
-        except KeyError:
-            return ""
-
-    @property
-    def requester(self) -> int:
-        return self.info["extra"]["requester"]
-
-    @property
-    def autoplay(self) -> bool:
-        try:
-            return self.info["extra"]["autoplay"]
-        except KeyError:
-            return False
-
-    @property
-    def track_loops(self) -> int:
-        return self.info["extra"]["track_loops"]
-
-    @property
-    def playlist_name(self) -> str:
-        try:
-            return self.playlist.name[:97]
-        except AttributeError:
-            return ""
-
-    @property
-    def playlist_url(self) -> str:
-        try:
-            return self.playlist.url
-        except AttributeError:
-            return ""
-
 
 class LavalinkPlayer(wavelink.Player):
     bot: BotCore
@@ -409,7 +640,7 @@ class LavalinkPlayer(wavelink.Player):
         self.skin_static: str = kwargs.pop("skin_static", None) or self.bot.default_static_skin
         self.custom_skin_data = kwargs.pop("custom_skin_data", {})
         self.custom_skin_static_data = kwargs.pop("custom_skin_static_data", {})
-        self.queue: deque = deque()
+        self.queue: TrackQueue = TrackQueue()
         self.played: deque = deque(maxlen=20)
         self.queue_autoplay: deque = deque(maxlen=30)
         self.failed_tracks: deque = deque(maxlen=30)
@@ -457,6 +688,7 @@ class LavalinkPlayer(wavelink.Player):
         self._new_node_task: Optional[asyncio.Task] = None
         self._queue_updater_task: Optional[asyncio.Task] = None
         self.auto_skip_track_task: Optional[asyncio.Task] = None
+        self._prefetch_tasks: Dict[str, asyncio.Task] = {}
 
         stage_template = kwargs.pop("stage_title_template", None)
 
@@ -576,15 +808,8 @@ class LavalinkPlayer(wavelink.Player):
 
         return min(position, self.current.duration)
 
-    async def update_state(self, state: dict) -> None:
-        state = state['state']
-
-        if not self.auto_pause:
-            self.last_position = state.get('position', 0)
-
-        self.last_update = time() * 1000
-        self.position_timestamp = state.get('time', 0)
-        self.ping = state.get('ping', None)
+    def can_update_position(self) -> bool:
+        return not self.auto_pause
 
     async def report_error(self, embed: disnake.Embed, track: Union[LavalinkTrack, PartialTrack]):
 
@@ -766,6 +991,11 @@ class LavalinkPlayer(wavelink.Player):
 
             error_format = pprint.pformat(event.data)
 
+            if isinstance(track, PartialTrack) and self.bot.pool.track_index and \
+                    (index_keys := self.get_resolution_keys(track)):
+                # the track chosen for this song failed: it will be searched again next time.
+                self.bot.loop.create_task(self.bot.pool.track_index.invalidate(index_keys))
+
             async def send_report():
 
                 print(("-" * 50) + f"\nError while playing the song: {track.uri or track.search_uri}\n"
@@ -834,8 +1064,8 @@ class LavalinkPlayer(wavelink.Player):
 
                 self.retries_403 = {"last_time": None, 'counter': 0}
 
-                if track.info["sourceName"] == "youtube" or (self.bot.config["PARTIALTRACK_SEARCH_PROVIDER"] == "ytsearch" and
-                                                             track.info["sourceName"] == "spotify"):
+                if track.source_name == "youtube" or (self.bot.config["PARTIALTRACK_SEARCH_PROVIDER"] == "ytsearch" and
+                                                             track.source_name == "spotify"):
 
                     await send_report()
 
@@ -1280,14 +1510,14 @@ class LavalinkPlayer(wavelink.Player):
 
             for track_data in tracks_search:
 
-                if track_data.info["sourceName"] == "spotify" and self.bot.spotify:
-                    track_ids = list(set(t.original_id for t in tracks_search if t.info["sourceName"] == "spotify"))[:5]
+                if track_data.source_name == "spotify" and self.bot.spotify:
+                    track_ids = list(set(t.original_id for t in tracks_search if t.source_name == "spotify"))[:5]
 
                     result = None
 
                     for i in range(3):
                         try:
-                            result = await self.bot.loop.run_in_executor(None, lambda: self.bot.spotify.recommendations(seed_tracks=track_ids))
+                            result = await self.bot.spotify.recommendations(seed_tracks=track_ids)
                             break
                         except Exception as e:
                             self.set_command_log(emoji="⚠️", text=f"Failed to retrieve recommended songs from Spotify, attempt {i+1} of 3.")
@@ -1319,16 +1549,16 @@ class LavalinkPlayer(wavelink.Player):
                                     autoplay=True,
                                 )
 
-                            partial_track.info["extra"]["authors"] = [fix_characters(i['name']) for i in t['artists'] if
+                            partial_track.authors = [fix_characters(i['name']) for i in t['artists'] if
                                                           f"feat. {i['name'].lower()}"
                                                           not in t['name'].lower()]
 
-                            partial_track.info["extra"]["authors_md"] = ", ".join(
+                            partial_track.authors_md = ", ".join(
                                 f"[`{a['name']}`]({a['external_urls']['spotify']})" for a in t["artists"])
 
                             try:
                                 if t["album"]["name"] != t["name"]:
-                                    partial_track.info["extra"]["album"] = {
+                                    partial_track.album = {
                                         "name": t["album"]["name"],
                                         "url": t["album"]["external_urls"]["spotify"]
                                     }
@@ -1338,7 +1568,7 @@ class LavalinkPlayer(wavelink.Player):
                             tracks.append(partial_track)
 
                 if not tracks:
-                    if track_data.info["sourceName"] == "youtube":
+                    if track_data.source_name == "youtube":
                         query = f"https://music.youtube.com/watch?v={track_data.ytid}&list=RD{track_data.ytid}"
                     else:
                         query = f"ytmsearch:{track_data.author}"
@@ -1428,9 +1658,9 @@ class LavalinkPlayer(wavelink.Player):
                     continue
 
                 if not isinstance(t, PartialTrack):
-                    t = LavalinkTrack(id_=t.id, info=t.info, autoplay=True, requester=self.bot.user.id)
+                    t = LavalinkTrack(id_=t.id, info=t.to_dict(), autoplay=True, requester=self.bot.user.id)
 
-                t.info["extra"]["related"] = info
+                t.set_extra("related", info)
                 tracks_final.append(t)
 
             tracks.clear()
@@ -1515,6 +1745,10 @@ class LavalinkPlayer(wavelink.Player):
 
         if isinstance(track, PartialTrack):
 
+            if not track.id and (prefetch_task := self._prefetch_tasks.pop(track.unique_id, None)):
+                # the song is still being resolved in background.
+                await asyncio.wait([prefetch_task])
+
             if not track.id:
                 try:
                     await self.resolve_track(track)
@@ -1629,6 +1863,8 @@ class LavalinkPlayer(wavelink.Player):
 
         self.process_hint()
 
+        self.prefetch_tracks()
+
         if self.auto_pause:
             self.last_update = time() * 1000
         else:
@@ -1904,6 +2140,8 @@ class LavalinkPlayer(wavelink.Player):
 
     async def invoke_np(self, force=False, interaction=None, rpc_update=False):
 
+        self.prefetch_tracks()
+
         if not self.text_channel:
             try:
                 if not interaction.response.is_done():
@@ -2300,6 +2538,8 @@ class LavalinkPlayer(wavelink.Player):
         self.queue.clear()
         self.played.clear()
 
+        self.prefetch_tracks()
+
         try:
             self.members_timeout_task.cancel()
         except:
@@ -2477,6 +2717,53 @@ class LavalinkPlayer(wavelink.Player):
                 traceback.print_exc()
                 return
 
+    def get_prefetch_semaphore(self) -> asyncio.Semaphore:
+        # shared by the players of the same node (limits the searches made in background on each server).
+        if not self.node.prefetch_semaphore:
+            self.node.prefetch_semaphore = asyncio.Semaphore(self.bot.config["PARTIALTRACK_PREFETCH_NODE_CONCURRENCY"])
+        return self.node.prefetch_semaphore
+
+    def prefetch_tracks(self):
+
+        if self.is_closing:
+            upcoming = {}
+        else:
+            upcoming = {t.unique_id: t for t in islice(self.queue, self.bot.config["PARTIALTRACK_PREFETCH"])
+                        if isinstance(t, PartialTrack) and not t.id}
+
+        # songs that left the prefetch window (queue reordered, cleared or songs removed).
+        for unique_id in [i for i in self._prefetch_tasks if i not in upcoming]:
+            self._prefetch_tasks.pop(unique_id).cancel()
+
+        for unique_id, track in upcoming.items():
+            if unique_id not in self._prefetch_tasks:
+                self._prefetch_tasks[unique_id] = self.bot.loop.create_task(self.prefetch_track(track))
+
+    async def prefetch_track(self, track: PartialTrack):
+
+        try:
+            async with self.get_prefetch_semaphore():
+                if not track.id:
+                    await self.resolve_track(track)
+        finally:
+            if self._prefetch_tasks.get(track.unique_id) is asyncio.current_task():
+                del self._prefetch_tasks[track.unique_id]
+
+    def get_resolution_keys(self, track: PartialTrack) -> list:
+
+        # the encoded tracks depend on the lavalink version and the result depends on the search provider.
+        prefix = f"v{self.node.version}:{self.bot.config['PARTIALTRACK_SEARCH_PROVIDER']}"
+
+        keys = []
+
+        if track.original_id:
+            keys.append(f"{prefix}:{track.source_name}:{track.original_id}")
+
+        if track.isrc:
+            keys.append(f"{prefix}:isrc:{track.isrc}")
+
+        return keys
+
     async def resolve_track(self, track: PartialTrack):
 
         if track.id:
@@ -2486,13 +2773,28 @@ class LavalinkPlayer(wavelink.Player):
 
             exceptions = []
 
+            index_keys = None
+
             try:
                 to_search = track.info["search_uri"]
                 check_duration = False
             except KeyError:
-                to_search = f"{self.bot.config['PARTIALTRACK_SEARCH_PROVIDER']}:" + (f"\"{track.info['isrc']}\"" if track.info.get("isrc") else f"{track.single_title.replace(' - ', ' ')} - {track.authors_string}")
+                to_search = f"{self.bot.config['PARTIALTRACK_SEARCH_PROVIDER']}:" + (f"\"{track.isrc}\"" if track.isrc else f"{track.single_title.replace(' - ', ' ')} - {track.authors_string}")
                 check_duration = True
 
+                if self.bot.pool.track_index and (index_keys := self.get_resolution_keys(track)):
+
+                    try:
+                        resolved = await self.bot.pool.track_index.get(*index_keys)
+                    except Exception:
+                        traceback.print_exc()
+                        resolved = None
+
+                    if resolved:
+                        track.id = resolved["track"]
+                        track.duration = resolved["length"]
+                        return
+
             try:
                 tracks = (await self.node.get_tracks(to_search, track_cls=LavalinkTrack, playlist_cls=LavalinkPlaylist))
             except wavelink.TrackNotFound as e:
@@ -2501,9 +2803,9 @@ class LavalinkPlayer(wavelink.Player):
 
             if not tracks and self.bot.config['PARTIALTRACK_SEARCH_PROVIDER'] not in ("ytsearch", "ytmsearch", "scsearch"):
 
-                if track.info.get("isrc"):
+                if track.isrc:
                     try:
-                        tracks = await self.node.get_tracks(f"ytsearch:\"{track.info['isrc']}\"",track_cls=LavalinkTrack, playlist_cls=LavalinkPlaylist)
+                        tracks = await self.node.get_tracks(f"ytsearch:\"{track.isrc}\"",track_cls=LavalinkTrack, playlist_cls=LavalinkPlaylist)
                     except Exception as e:
                         exceptions.append(e)
 
@@ -2542,7 +2844,16 @@ class LavalinkPlayer(wavelink.Player):
                 selected_track = tracks[0]
 
             track.id = selected_track.id
-            track.info["length"] = selected_track.duration
+            track.duration = selected_track.duration
+
+            if index_keys:
+                try:
+                    await self.bot.pool.track_index.set(
+                        index_keys, track=selected_track.id, identifier=selected_track.identifier,
+                        length=selected_track.duration
+                    )
+                except Exception:
+                    traceback.print_exc()
 
         except Exception as e:
             traceback.print_exc()
@@ -2823,7 +3134,7 @@ class LavalinkPlayer(wavelink.Player):
                 self.queue.insert(1, self.last_track)
                 self.is_previows_music = False
             elif self.last_track.track_loops:
-                self.last_track.info["extra"]["track_loops"] -= 1
+                self.last_track.track_loops -= 1
                 self.queue.insert(0, self.last_track)
             elif self.loop == "queue": # or self.keep_connected:
                 if self.is_previows_music:
@@ -2996,4 +3307,69 @@ class LavalinkPlayer(wavelink.Player):
 
 
 def music_mode(bot: BotCore):
-    return wavelink.Client(bot=bot)
+    return wavelink.Client(bot=bot, session=bot.session, request_limit=bot.config["LAVALINK_NODE_REQUEST_LIMIT"],
+                           track_cache=bot.pool.track_cache, event_queue_size=bot.config["LAVALINK_EVENT_QUEUE_SIZE"],
+                           event_lane_timeout=bot.config["LAVALINK_EVENT_LANE_TIMEOUT"],
+                           player_update_tick=bot.config["LAVALINK_PLAYER_UPDATE_TICK_MS"] / 1000,
+                           json_codec=bot.config["LAVALINK_JSON_CODEC"])
+
+
+def benchmark_memory(total: int = 100000, players: int = 50) -> Dict[str, Dict[str, float]]:
+    # memory (MiB) of the queued tracks (split across the players) before and after creating the info dicts.
+    import gc
+    import tracemalloc
+
+    results = {}
+
+    def lavalink_track(i: int):
+        return LavalinkTrack(
+            f"QAAA{'x' * 200}{i}",
+            {
+                "identifier": f"id{i:09d}", "isSeekable": True, "author": f"Artist {i % 500} - Topic",
+                "length": 180000 + i, "isStream": False, "position": 0, "title": f"Track number {i} (Official Audio)",
+                "uri": f"https://www.youtube.com/watch?v=id{i:09d}", "sourceName": "youtube",
+                "artworkUrl": f"https://i.ytimg.com/vi/id{i:09d}/maxresdefault.jpg", "isrc": None
+            },
+            requester=100000000000000000 + i % 20, track_loops=0
+        )
+
+    def partial_track(i: int):
+        track = PartialTrack(
+            uri=f"https://open.spotify.com/track/{i:022d}", author=f"Artist {i % 500}", title=f"Track number {i}",
+            thumb=f"https://i.scdn.co/image/{i:040d}", duration=180000 + i, source_name="spotify",
+            original_id=f"{i:022d}", requester=100000000000000000 + i % 20
+        )
+        track.authors = [f"Artist {i % 500}", f"Artist {i % 300}"]
+        return track
+
+    for name, build in (("LavalinkTrack", lavalink_track), ("PartialTrack", partial_track)):
+
+        gc.collect()
+        tracemalloc.start()
+
+        queues = [TrackQueue() for _ in range(players)]
+
+        for i in range(total):
+            queues[i % players].append(build(i))
+
+        compact = tracemalloc.get_traced_memory()[0]
+
+        for queue in queues:
+            for track in queue:
+                track.info
+
+        materialized = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        results[name] = {"compact": compact / 1048576, "materialized": materialized / 1048576}
+
+        del queues
+
+    return results
+
+
+if __name__ == "__main__":
+
+    for track_type, data in benchmark_memory().items():
+        print(f"{track_type:>13} | 100000 tracks | compact: {data['compact']:.1f} MiB | "
+              f"with info dicts: {data['materialized']:.1f} MiB")
@@ -1,14 +1,19 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import asyncio
+import json
 import re
+import time
 import traceback
-from typing import Optional, TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING, List, Callable
 from urllib.parse import quote
 
+import aiohttp
 import spotipy
-from spotipy import SpotifyClientCredentials
+from spotipy import SpotifyClientCredentials, SpotifyException
 
+from utils.db import TTLCache
 from utils.music.converters import fix_characters
 from utils.music.errors import MissingSpotifyClient, GenericError
 from utils.music.models import PartialPlaylist, PartialTrack
@@ -25,7 +30,220 @@ def query_spotify_track(func, url_id: str):
     return func(url_id)
 
 
-async def process_spotify(bot: BotCore, requester: int, query: str):
+class SpotifyClient:
+
+    api_url = "https://api.spotify.com/v1/"
+    token_url = "https://accounts.spotify.com/api/token"
+
+    # cache time (in seconds) of the responses per endpoint.
+    cache_ttls = {
+        "tracks": 86400,
+        "albums": 86400,
+        "artists": 3600,
+        "playlists": 600,
+        "recommendations": 600,
+        "users": 3600,
+    }
+
+    def __init__(self, client_id: str, client_secret: str, *, session_getter: Callable[[], aiohttp.ClientSession],
+                 fallback: Optional[spotipy.Spotify] = None, cache_size: int = 2000):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.session_getter = session_getter
+        self.fallback = fallback
+        self.token: Optional[str] = None
+        self.token_expires_at: float = 0
+        self._token_lock = asyncio.Lock()
+        self.cache = {endpoint: TTLCache(ttl=ttl, max_size=cache_size) for endpoint, ttl in self.cache_ttls.items()}
+
+    async def get_token(self, force: bool = False) -> str:
+
+        async with self._token_lock:
+
+            # renews the token a little before it expires.
+            if force or not self.token or self.token_expires_at - 60 < time.time():
+
+                async with self.session_getter().post(
+                        self.token_url, data={"grant_type": "client_credentials"},
+                        auth=aiohttp.BasicAuth(self.client_id, self.client_secret)
+                ) as r:
+                    if r.status != 200:
+                        raise SpotifyException(r.status, -1, f"Failed to get the spotify token: {await r.text()}")
+                    data = await r.json()
+
+                self.token = data["access_token"]
+                self.token_expires_at = time.time() + data["expires_in"]
+
+        return self.token
+
+    async def get(self, path: str, **params):
+
+        params = {k: v for k, v in params.items() if v is not None}
+
+        endpoint = path.split("/", 1)[0]
+        key = (path, tuple(sorted(params.items())))
+
+        try:
+            cache = self.cache[endpoint]
+        except KeyError:
+            cache = None
+        else:
+            if (data := cache.get(key)) is not None:
+                return json.loads(data)
+
+        refreshed_token = False
+
+        for attempt in range(4):
+
+            token = await self.get_token()
+
+            async with self.session_getter().get(self.api_url + path, params=params,
+                                                 headers={"Authorization": f"Bearer {token}"}) as r:
+
+                if r.status == 200:
+                    data = await r.text()
+                    break
+
+                if r.status == 401 and not refreshed_token:
+                    refreshed_token = True
+                    await self.get_token(force=True)
+                    continue
+
+                if r.status == 429 and attempt < 3:
+                    retry_after = int(r.headers.get("Retry-After", 1))
+                    if retry_after <= 60:
+                        await asyncio.sleep(retry_after)
+                        continue
+
+                raise SpotifyException(r.status, -1, f"{self.api_url + path}:\n {await r.text()}", headers=dict(r.headers))
+
+        if cache is not None:
+            cache.set(key, data)
+
+        return json.loads(data)
+
+    async def request(self, path: str, fallback: Callable[[spotipy.Spotify], dict], **params):
+
+        try:
+            return await self.get(path, **params)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if not self.fallback:
+                raise
+            # network failure: uses the spotipy client instead.
+            traceback.print_exc()
+            return await asyncio.get_running_loop().run_in_executor(None, lambda: fallback(self.fallback))
+
+    async def track(self, track_id: str):
+        return await self.request(f"tracks/{track_id}", lambda sp: sp.track(track_id))
+
+    async def album(self, album_id: str):
+        return await self.request(f"albums/{album_id}", lambda sp: sp.album(album_id))
+
+    async def album_tracks(self, album_id: str, limit: int = 50, offset: int = 0):
+        return await self.request(f"albums/{album_id}/tracks",
+                                  lambda sp: sp.album_tracks(album_id, limit=limit, offset=offset),
+                                  limit=limit, offset=offset)
+
+    async def artist_top_tracks(self, artist_id: str, country: str = "US"):
+        return await self.request(f"artists/{artist_id}/top-tracks",
+                                  lambda sp: sp.artist_top_tracks(artist_id, country=country), country=country)
+
+    async def playlist(self, playlist_id: str):
+        return await self.request(f"playlists/{playlist_id}", lambda sp: sp.playlist(playlist_id),
+                                  additional_types="track")
+
+    async def playlist_items(self, playlist_id: str, limit: int = 100, offset: int = 0):
+        return await self.request(f"playlists/{playlist_id}/tracks",
+                                  lambda sp: sp.playlist_items(playlist_id, limit=limit, offset=offset),
+                                  limit=limit, offset=offset, additional_types="track,episode")
+
+    async def recommendations(self, seed_tracks: list, limit: int = 20):
+        return await self.request("recommendations",
+                                  lambda sp: sp.recommendations(seed_tracks=seed_tracks, limit=limit),
+                                  seed_tracks=",".join(seed_tracks), limit=limit)
+
+    async def user(self, user_id: str):
+        return await self.request(f"users/{user_id}", lambda sp: sp.user(user_id))
+
+    async def user_playlists(self, user_id: str, limit: int = 50, offset: int = 0):
+        return await self.request(f"users/{user_id}/playlists",
+                                  lambda sp: sp.user_playlists(user_id, limit=limit, offset=offset),
+                                  limit=limit, offset=offset)
+
+
+def fetch_remaining_pages(bot: BotCore, func, url_id: str, page: dict) -> List[asyncio.Task]:
+
+    if not page.get("next"):
+        return []
+
+    semaphore = asyncio.Semaphore(bot.config["SPOTIFY_PAGE_CONCURRENCY"])
+
+    async def fetch_page(offset: int):
+        async with semaphore:
+            return await func(url_id, limit=page["limit"], offset=offset)
+
+    return [bot.loop.create_task(fetch_page(offset))
+            for offset in range(page["offset"] + page["limit"], page["total"], page["limit"])]
+
+
+def build_partial_track(t: dict, playlist: PartialPlaylist, requester: int) -> PartialTrack:
+
+    try:
+        thumb = t["album"]["images"][0]["url"]
+    except (IndexError, KeyError):
+        thumb = ""
+
+    track = PartialTrack(
+        uri=t["external_urls"].get("spotify", f"https://www.youtube.com/results?search_query={quote(t['name'])}"),
+        author=t["artists"][0]["name"] or "Unknown Artist",
+        title=t["name"],
+        thumb=thumb,
+        duration=t["duration_ms"],
+        source_name="spotify",
+        original_id=t["id"],
+        playlist=playlist,
+        requester=requester
+    )
+
+    try:
+        track.isrc = t["external_ids"]["isrc"]
+    except KeyError:
+        pass
+
+    try:
+        track.album = {
+            "name": t["album"]["name"],
+            "url": t["album"]["external_urls"]["spotify"]
+        }
+    except (AttributeError, KeyError):
+        pass
+
+    if t["artists"][0]["name"]:
+        track.authors = [fix_characters(i['name']) for i in t['artists'] if f"feat. {i['name'].lower()}" not in t['name'].lower()]
+        track.authors_md = ", ".join(f"[`{fix_characters(a['name'])}`](" + a['external_urls'].get('spotify', f'https://www.youtube.com/results?search_query={quote(t["name"])}') + ")" for a in t['artists'])
+    else:
+        track.authors = ["Unknown Artist"]
+        track.authors_md = "`Unknown Artist`"
+
+    return track
+
+
+async def load_remaining_tracks(playlist: PartialPlaylist, page_tasks: List[asyncio.Task], get_items, requester: int):
+
+    # the pages are fetched concurrently but added in the playlist order.
+    try:
+        for task in page_tasks:
+            for t in get_items(await task):
+                if t:
+                    playlist.tracks.append(build_partial_track(t, playlist, requester))
+    except Exception:
+        traceback.print_exc()
+    finally:
+        for task in page_tasks:
+            task.cancel()
+
+
+async def process_spotify(bot: BotCore, requester: int, query: str, *, progressive: bool = False):
 
     if spotify_link_regex.match(query):
         async with bot.session.get(query, allow_redirects=False) as r:
@@ -43,7 +261,7 @@ async def process_spotify(bot: BotCore, requester: int, query: str):
 
     if url_type == "track":
 
-        result = await bot.loop.run_in_executor(None, lambda: bot.spotify.track(url_id))
+        result = await bot.spotify.track(url_id)
 
         t = PartialTrack(
             uri=result["external_urls"]["spotify"],
@@ -56,14 +274,14 @@ async def process_spotify(bot: BotCore, requester: int, query: str):
             requester=requester
         )
 
-        t.info["extra"]["authors"] = [fix_characters(i['name']) for i in result['artists'] if f"feat. {i['name'].lower()}"
-                                      not in result['name'].lower()]
+        t.authors = [fix_characters(i['name']) for i in result['artists'] if f"feat. {i['name'].lower()}"
+                     not in result['name'].lower()]
 
-        t.info["extra"]["authors_md"] = ", ".join(f"[`{a['name']}`]({a['external_urls']['spotify']})" for a in result["artists"])
+        t.authors_md = ", ".join(f"[`{a['name']}`]({a['external_urls']['spotify']})" for a in result["artists"])
 
         try:
             if result["album"]["name"] != result["name"]:
-                t.info["extra"]["album"] = {
+                t.album = {
                     "name": result["album"]["name"],
                     "url": result["album"]["external_urls"]["spotify"]
                 }
@@ -83,7 +301,7 @@ async def process_spotify(bot: BotCore, requester: int, query: str):
 
     if url_type == "album":
 
-        result = await bot.loop.run_in_executor(None, lambda: bot.spotify.album(url_id))
+        result = await bot.spotify.album(url_id)
 
         try:
             thumb = result["tracks"][0]["album"]["images"][0]["url"]
@@ -108,14 +326,17 @@ async def process_spotify(bot: BotCore, requester: int, query: str):
         data["playlistInfo"]["name"] = result["name"]
         data["playlistInfo"]["is_album"] = True
 
-        for t in result["tracks"]["items"]:
-            t["album"] = result
+        def get_items(page: dict):
+            for t in page["items"]:
+                t["album"] = result
+            return page["items"]
 
-        tracks_data = result["tracks"]["items"]
+        tracks_data = get_items(result["tracks"])
+        page_tasks = fetch_remaining_pages(bot, bot.spotify.album_tracks, url_id, result["tracks"])
 
     elif url_type == "artist":
 
-        result = await bot.loop.run_in_executor(None, lambda: bot.spotify.artist_top_tracks(url_id))
+        result = await bot.spotify.artist_top_tracks(url_id)
 
         try:
             data["playlistInfo"]["name"] = "Top tracks of: " + \
@@ -123,17 +344,23 @@ async def process_spotify(bot: BotCore, requester: int, query: str):
         except IndexError:
             data["playlistInfo"]["name"] = "Top tracks of: " + result["tracks"][0]["artists"][0]["name"]
         tracks_data = result["tracks"]
+        page_tasks = []
 
     elif url_type == "playlist":
 
         try:
-            result = await bot.loop.run_in_executor(None, lambda: bot.spotify.playlist(url_id))
+            result = await bot.spotify.playlist(url_id)
         except spotipy.SpotifyException as e:
             raise GenericError("**An error occurred when processing the playlist:** ```py"
                                f"{repr(e)}```")
         data["playlistInfo"]["name"] = result["name"]
         data["playlistInfo"]["thumb"] = result["images"][0]["url"]
-        tracks_data = [t["track"] for t in result["tracks"]["items"]]
+
+        def get_items(page: dict):
+            return [t["track"] for t in page["items"]]
+
+        tracks_data = get_items(result["tracks"])
+        page_tasks = fetch_remaining_pages(bot, bot.spotify.playlist_items, url_id, result["tracks"])
 
     else:
         raise GenericError(f"**Spotify link not recognized/supported:**\n{query}")
@@ -146,53 +373,24 @@ async def process_spotify(bot: BotCore, requester: int, query: str):
     playlist = PartialPlaylist(data, url=query)
 
     for t in tracks_data:
+        if t:
+            playlist.tracks.append(build_partial_track(t, playlist, requester))
 
-        if not t:
-            continue
-
-        try:
-            thumb = t["album"]["images"][0]["url"]
-        except (IndexError, KeyError):
-            thumb = ""
-
-        track = PartialTrack(
-            uri=t["external_urls"].get("spotify", f"https://www.youtube.com/results?search_query={quote(t['name'])}"),
-            author=t["artists"][0]["name"] or "Unknown Artist",
-            title=t["name"],
-            thumb=thumb,
-            duration=t["duration_ms"],
-            source_name="spotify",
-            original_id=t["id"],
-            playlist=playlist,
-            requester=requester
-        )
-
-        try:
-            track.info["isrc"] = t["external_ids"]["isrc"]
-        except KeyError:
-            pass
-
-        try:
-            track.info["extra"]["album"] = {
-                "name": t["album"]["name"],
-                "url": t["album"]["external_urls"]["spotify"]
-            }
-        except (AttributeError, KeyError):
-            pass
-
-        if t["artists"][0]["name"]:
-            track.info["extra"]["authors"] = [fix_characters(i['name']) for i in t['artists'] if f"feat. {i['name'].lower()}" not in t['name'].lower()]
-            track.info["extra"]["authors_md"] = ", ".join(f"[`{fix_characters(a['name'])}`](" + a['external_urls'].get('spotify', f'https://www.youtube.com/results?search_query={quote(t["name"])}') + ")" for a in t['artists'])
-        else:
-            track.info["extra"]["authors"] = ["Unknown Artist"]
-            track.info["extra"]["authors_md"] = "`Unknown Artist`"
+    try:
+        playlist.total = result["tracks"]["total"]
+    except (KeyError, TypeError):
+        pass
 
-        playlist.tracks.append(track)
+    if page_tasks:
+        playlist.loading_task = bot.loop.create_task(load_remaining_tracks(playlist, page_tasks, get_items, requester))
+        # progressive: the playlist is returned with the first page while the remaining tracks are still being added.
+        if not progressive or not playlist.tracks:
+            await playlist.loading_task
 
     return playlist
 
 
-def spotify_client(config: dict) -> Optional[spotipy.Spotify]:
+def spotify_client(config: dict, session_getter: Callable[[], aiohttp.ClientSession]) -> Optional[SpotifyClient]:
     if not config['SPOTIFY_CLIENT_ID']:
         print(
             f"[Ignored] - Spotify Support: Spotify_Client_id was not configured in the host ENV (or .env file)."
@@ -206,11 +404,17 @@ def spotify_client(config: dict) -> Optional[spotipy.Spotify]:
         return
 
     try:
-        return spotipy.Spotify(
-            auth_manager=SpotifyClientCredentials(
-                client_id=config['SPOTIFY_CLIENT_ID'],
-                client_secret=config['SPOTIFY_CLIENT_SECRET']
-            )
+        return SpotifyClient(
+            config['SPOTIFY_CLIENT_ID'],
+            config['SPOTIFY_CLIENT_SECRET'],
+            session_getter=session_getter,
+            fallback=spotipy.Spotify(
+                auth_manager=SpotifyClientCredentials(
+                    client_id=config['SPOTIFY_CLIENT_ID'],
+                    client_secret=config['SPOTIFY_CLIENT_SECRET']
+                )
+            ),
+            cache_size=config["SPOTIFY_CACHE_SIZE"]
         )
 
     except KeyError as e:
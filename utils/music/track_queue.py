@@ -0,0 +1,608 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import random
+from bisect import bisect_right
+from collections.abc import Sequence
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+
+class QueueSearchIndex:
+
+    # longer words are stored only up to this size in the prefix map (the rest is checked on the matched tracks).
+    max_prefix = 12
+
+    def __init__(self):
+        self.tracks: Dict[str, object] = {}
+        self.counts: Dict[str, int] = {}
+        self.tokens: Dict[str, tuple] = {}
+        self.title_tokens: Dict[str, tuple] = {}
+        self.prefixes: Dict[str, Set[str]] = {}
+
+    @staticmethod
+    def split(text: str) -> tuple:
+        return tuple(dict.fromkeys((text or "").lower().split()))
+
+    def get_tokens(self, track) -> tuple:
+
+        words = [track.title, track.author]
+
+        try:
+            words.append(track.playlist_name or "")
+        except AttributeError:
+            pass
+
+        return self.split(" ".join(words))
+
+    def add(self, track):
+
+        unique_id = track.unique_id
+
+        if unique_id in self.counts:
+            self.counts[unique_id] += 1
+            return
+
+        tokens = self.get_tokens(track)
+
+        self.tracks[unique_id] = track
+        self.counts[unique_id] = 1
+        self.tokens[unique_id] = tokens
+        self.title_tokens[unique_id] = self.split(track.title)
+
+        for token in tokens:
+            for i in range(1, min(len(token), self.max_prefix) + 1):
+                try:
+                    self.prefixes[token[:i]].add(unique_id)
+                except KeyError:
+                    self.prefixes[token[:i]] = {unique_id}
+
+    def discard(self, track):
+
+        unique_id = track.unique_id
+
+        try:
+            self.counts[unique_id] -= 1
+        except KeyError:
+            return
+
+        if self.counts[unique_id] > 0:
+            return
+
+        del self.counts[unique_id]
+        del self.tracks[unique_id]
+        del self.title_tokens[unique_id]
+
+        # words with the same beginning share prefixes (each prefix is removed once).
+        for prefix in {t[:i] for t in self.tokens.pop(unique_id) for i in range(1, min(len(t), self.max_prefix) + 1)}:
+            ids = self.prefixes[prefix]
+            ids.discard(unique_id)
+            if not ids:
+                del self.prefixes[prefix]
+
+    def clear(self):
+        self.tracks.clear()
+        self.counts.clear()
+        self.tokens.clear()
+        self.title_tokens.clear()
+        self.prefixes.clear()
+
+    def get(self, unique_id: str):
+        return self.tracks.get(unique_id)
+
+    def search(self, query: str, limit: int = 20, positions: Optional[Callable[[list], Dict[str, int]]] = None) -> list:
+
+        if not (words := list(dict.fromkeys(query.lower().split()))):
+            return []
+
+        candidates = None
+
+        for word in words:
+
+            ids = self.prefixes.get(word[:self.max_prefix], set())
+
+            if len(word) > self.max_prefix:
+                ids = {i for i in ids if any(t.startswith(word) for t in self.tokens[i])}
+
+            candidates = ids if candidates is None else candidates & ids
+
+            if not candidates:
+                return []
+
+        results = []
+
+        for unique_id in candidates:
+            tokens = self.tokens[unique_id]
+            title = self.title_tokens[unique_id]
+            # tracks found only by the author/playlist come after the tracks found by the title.
+            tier = 0 if all(any(t.startswith(w) for t in title) for w in words) else 1
+            # whole words found count more than the words found only by the beginning.
+            score = sum(2 if w in tokens else 1 for w in words)
+            results.append((tier, -score, unique_id))
+
+        results.sort()
+
+        if positions and results:
+            # ties are ordered by the position in the queue (the first copy of a song comes first).
+            cutoff = results[min(limit, len(results)) - 1][:2]
+            selected = [r for r in results if r[:2] <= cutoff]
+            order = positions([unique_id for *_, unique_id in selected])
+            selected.sort(key=lambda r: (r[0], r[1], order.get(r[2], len(order))))
+            results = selected
+
+        return [self.tracks[unique_id] for *_, unique_id in results[:limit]]
+
+
+class QueueSnapshot(Sequence):
+
+    # read-only view of the queue chunks at the time it was created (the queue copies a chunk before changing it).
+    __slots__ = ("chunks", "starts", "size")
+
+    def __init__(self, chunks: List[list]):
+        self.chunks = chunks
+        self.starts = []
+        self.size = 0
+        for c in chunks:
+            self.starts.append(self.size)
+            self.size += len(c)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return chain.from_iterable(self.chunks)
+
+    def __getitem__(self, index):
+
+        if isinstance(index, slice):
+            return list(self)[index]
+
+        if index < 0:
+            index += self.size
+
+        if not 0 <= index < self.size:
+            raise IndexError("snapshot index out of range")
+
+        i = bisect_right(self.starts, index) - 1
+        return self.chunks[i][index - self.starts[i]]
+
+
+class TrackQueue:
+
+    # max number of tracks in a chunk before splitting it in two.
+    load = 128
+
+    def __init__(self, iterable: Iterable = (), maxlen: Optional[int] = None):
+        self.maxlen = maxlen
+        # the search index is built on the first search and then updated with each change in the queue.
+        self.search_index: Optional[QueueSearchIndex] = None
+        self._version = 0
+        self._shared: Set[int] = set()
+        self._build(list(iterable)[-maxlen:] if maxlen is not None else list(iterable))
+
+    def _build(self, items: list):
+        self._chunks: List[list] = [items[i:i + self.load] for i in range(0, len(items), self.load)]
+        self._len = len(items)
+        self._ids: Dict[str, list] = {}
+        # number of copies of each track in the queue (the position of a track with copies is found by iterating).
+        self._counts: Dict[str, int] = {}
+        for c in self._chunks:
+            for t in c:
+                self._ids.setdefault(t.unique_id, c)
+                self._counts[t.unique_id] = self._counts.get(t.unique_id, 0) + 1
+        self._shared.clear()
+        self._version += 1
+        self._rebuild_tree()
+
+    def _rebuild_tree(self):
+        # fenwick tree with the size of each chunk (used to find positions in O(log n)).
+        self._chunk_pos = {id(c): i for i, c in enumerate(self._chunks)}
+        tree = [0] + [len(c) for c in self._chunks]
+        for i in range(1, len(tree)):
+            if (j := i + (i & -i)) < len(tree):
+                tree[j] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, pos: int, delta: int):
+        pos += 1
+        while pos < len(self._tree):
+            self._tree[pos] += delta
+            pos += pos & -pos
+
+    def _prefix(self, pos: int) -> int:
+        total = 0
+        while pos:
+            total += self._tree[pos]
+            pos -= pos & -pos
+        return total
+
+    def _locate(self, index: int):
+
+        if index < 0:
+            index += self._len
+
+        if not 0 <= index < self._len:
+            raise IndexError("deque index out of range")
+
+        pos = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+
+        while step:
+            if (nxt := pos + step) < len(self._tree) and self._tree[nxt] <= index:
+                pos = nxt
+                index -= self._tree[nxt]
+            step >>= 1
+
+        return pos, index
+
+    def _writable(self, pos: int) -> list:
+
+        chunk = self._chunks[pos]
+
+        if id(chunk) not in self._shared:
+            return chunk
+
+        self._shared.discard(id(chunk))
+        new_chunk = list(chunk)
+        self._chunks[pos] = new_chunk
+        del self._chunk_pos[id(chunk)]
+        self._chunk_pos[id(new_chunk)] = pos
+
+        for t in new_chunk:
+            if self._ids.get(t.unique_id) is chunk:
+                self._ids[t.unique_id] = new_chunk
+
+        return new_chunk
+
+    def _insert(self, index: int, track):
+
+        self._version += 1
+
+        if not self._chunks:
+            chunk = [track]
+            self._chunks.append(chunk)
+            self._count_add(track, chunk)
+            self._len = 1
+            self._rebuild_tree()
+            return
+
+        if index < 0:
+            index = max(index + self._len, 0)
+
+        if index >= self._len:
+            pos = len(self._chunks) - 1
+            offset = len(self._chunks[pos])
+        else:
+            pos, offset = self._locate(index)
+
+        chunk = self._writable(pos)
+        chunk.insert(offset, track)
+        self._count_add(track, chunk)
+        self._len += 1
+
+        if len(chunk) > self.load * 2:
+            half = chunk[self.load:]
+            del chunk[self.load:]
+            self._chunks.insert(pos + 1, half)
+            for t in half:
+                if self._ids.get(t.unique_id) is chunk:
+                    self._ids[t.unique_id] = half
+            self._rebuild_tree()
+        else:
+            self._tree_add(pos, 1)
+
+    def _delete(self, index: int):
+
+        pos, offset = self._locate(index)
+
+        self._version += 1
+
+        chunk = self._writable(pos)
+        track = chunk.pop(offset)
+        self._len -= 1
+
+        self._count_discard(track, chunk)
+
+        if not chunk:
+            del self._chunks[pos]
+            self._rebuild_tree()
+        elif len(chunk) < self.load // 4 and pos + 1 < len(self._chunks) and \
+                len(chunk) + len(self._chunks[pos + 1]) <= self.load:
+            # merges small chunks to keep the number of chunks low.
+            next_chunk = self._chunks.pop(pos + 1)
+            chunk.extend(next_chunk)
+            for t in next_chunk:
+                if self._ids.get(t.unique_id) is next_chunk:
+                    self._ids[t.unique_id] = chunk
+            self._rebuild_tree()
+        else:
+            self._tree_add(pos, -1)
+
+        return track
+
+    def _count_add(self, track, chunk: list):
+        self._counts[track.unique_id] = self._counts.get(track.unique_id, 0) + 1
+        self._ids[track.unique_id] = chunk
+
+    def _count_discard(self, track, chunk: list):
+
+        unique_id = track.unique_id
+
+        if (count := self._counts.get(unique_id, 0) - 1) > 0:
+            self._counts[unique_id] = count
+            if self._ids.get(unique_id) is chunk and track not in chunk:
+                # points to another chunk that still has a copy of the track.
+                self._ids[unique_id] = next(c for c in self._chunks if track in c)
+            return
+
+        self._counts.pop(unique_id, None)
+        self._ids.pop(unique_id, None)
+
+    def _index_add(self, tracks):
+        if self.search_index is not None:
+            for t in tracks:
+                self.search_index.add(t)
+
+    def _index_discard(self, tracks):
+        if self.search_index is not None:
+            for t in tracks:
+                self.search_index.discard(t)
+
+    def get_search_index(self) -> QueueSearchIndex:
+        if self.search_index is None:
+            self.search_index = QueueSearchIndex()
+            for t in self:
+                self.search_index.add(t)
+        return self.search_index
+
+    def search(self, query: str, limit: int = 20) -> list:
+        return self.get_search_index().search(query, limit=limit, positions=self.get_positions)
+
+    def get_positions(self, unique_ids: list) -> Dict[str, int]:
+        # position of the first track of each unique_id.
+        if len(unique_ids) <= 64:
+            positions = {}
+            for unique_id in unique_ids:
+                if (track := self.get_track(unique_id)) is not None:
+                    positions[unique_id] = self.index(track)
+            return positions
+
+        unique_ids = set(unique_ids)
+        positions = {}
+        for i, t in enumerate(self):
+            if t.unique_id in unique_ids and t.unique_id not in positions:
+                positions[t.unique_id] = i
+        return positions
+
+    def get_track(self, unique_id: str):
+        try:
+            for t in self._ids[unique_id]:
+                if t.unique_id == unique_id:
+                    return t
+        except KeyError:
+            pass
+
+    def snapshot(self) -> QueueSnapshot:
+        self._shared.update(id(c) for c in self._chunks)
+        return QueueSnapshot(list(self._chunks))
+
+    def copy(self):
+        return self.__class__(self, self.maxlen)
+
+    def __copy__(self):
+        return self.copy()
+
+    def __reduce__(self):
+        return self.__class__, (list(self), self.maxlen)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    def __iter__(self):
+        version = self._version
+        for chunk in list(self._chunks):
+            for t in chunk:
+                if version != self._version:
+                    raise RuntimeError("deque mutated during iteration")
+                yield t
+
+    def __reversed__(self):
+        version = self._version
+        for chunk in reversed(list(self._chunks)):
+            for t in reversed(chunk):
+                if version != self._version:
+                    raise RuntimeError("deque mutated during iteration")
+                yield t
+
+    def __contains__(self, track):
+        try:
+            return track in self._ids[track.unique_id] or any(t is track for t in self)
+        except (KeyError, AttributeError):
+            return False
+
+    def __getitem__(self, index):
+
+        if isinstance(index, slice):
+            return list(self)[index]
+
+        pos, offset = self._locate(index)
+        return self._chunks[pos][offset]
+
+    def __setitem__(self, index: int, track):
+        pos, offset = self._locate(index)
+        chunk = self._writable(pos)
+        old = chunk[offset]
+        chunk[offset] = track
+        self._count_discard(old, chunk)
+        self._count_add(track, chunk)
+        self._version += 1
+        self._index_discard((old,))
+        self._index_add((track,))
+
+    def __delitem__(self, index: int):
+        self._index_discard((self._delete(index),))
+
+    def __add__(self, other: Iterable):
+        return self.__class__(chain(self, other), self.maxlen)
+
+    def __iadd__(self, tracks: Iterable):
+        self.extend(tracks)
+        return self
+
+    def index(self, track, start: int = 0, stop: Optional[int] = None) -> int:
+
+        try:
+            if self._counts[track.unique_id] == 1:
+                chunk = self._ids[track.unique_id]
+                i = self._prefix(self._chunk_pos[id(chunk)]) + chunk.index(track)
+            else:
+                i = None
+        except (KeyError, ValueError, AttributeError):
+            pass
+        else:
+            if i is not None and start <= i and (stop is None or i < stop):
+                return i
+
+        for i, t in enumerate(islice(self, start, stop), start=start):
+            if t is track or t == track:
+                return i
+
+        raise ValueError(f"{track!r} is not in deque")
+
+    def count(self, track) -> int:
+        return sum(1 for t in self if t is track or t == track)
+
+    def append(self, track):
+        if self.maxlen is not None and self._len >= self.maxlen:
+            self._index_discard((self._delete(0),))
+        self._insert(self._len, track)
+        self._index_add((track,))
+
+    def appendleft(self, track):
+        if self.maxlen is not None and self._len >= self.maxlen:
+            self._index_discard((self._delete(-1),))
+        self._insert(0, track)
+        self._index_add((track,))
+
+    def extend(self, tracks: Iterable):
+
+        if self.maxlen is not None:
+            for t in list(tracks):
+                self.append(t)
+            return
+
+        tracks = list(tracks)
+
+        if not tracks:
+            return
+
+        if not self._chunks:
+            self._build(tracks)
+        else:
+            self._version += 1
+            last = self._writable(len(self._chunks) - 1)
+            room = max(self.load - len(last), 0)
+            last.extend(tracks[:room])
+            for t in tracks[:room]:
+                self._count_add(t, last)
+            for i in range(room, len(tracks), self.load):
+                chunk = tracks[i:i + self.load]
+                self._chunks.append(chunk)
+                for t in chunk:
+                    self._count_add(t, chunk)
+            self._len += len(tracks)
+            self._rebuild_tree()
+
+        self._index_add(tracks)
+
+    def extendleft(self, tracks: Iterable):
+        for t in tracks:
+            self.appendleft(t)
+
+    def insert(self, index: int, track):
+        if self.maxlen is not None and self._len >= self.maxlen:
+            raise IndexError("deque already at its maximum size")
+        self._insert(index, track)
+        self._index_add((track,))
+
+    def pop(self):
+        if not self._len:
+            raise IndexError("pop from an empty deque")
+        track = self._delete(-1)
+        self._index_discard((track,))
+        return track
+
+    def popleft(self):
+        if not self._len:
+            raise IndexError("pop from an empty deque")
+        track = self._delete(0)
+        self._index_discard((track,))
+        return track
+
+    def remove(self, track):
+        del self[self.index(track)]
+
+    def clear(self):
+        self._build([])
+        if self.search_index is not None:
+            self.search_index.clear()
+
+    def rotate(self, n: int = 1):
+
+        if self._len < 2 or not (n := n % self._len):
+            return
+
+        # the tracks don't leave the queue, so the search index doesn't need to be updated.
+        if n <= self.load:
+            for _ in range(n):
+                self._insert(0, self._delete(-1))
+        elif self._len - n <= self.load:
+            for _ in range(self._len - n):
+                self._insert(self._len, self._delete(0))
+        else:
+            items = list(self)
+            self._build(items[-n:] + items[:-n])
+
+    def reverse(self):
+        self._build(list(reversed(self)))
+
+    def shuffle(self):
+        items = list(self)
+        random.shuffle(items)
+        self._build(items)
+
+
+def match_tracks(tracks: Iterable, query: str) -> List:
+    # linear search (all the words typed need to be found in the title).
+    query_words = query.lower().split()
+
+    results = []
+
+    for track in tracks:
+
+        title = track.title.lower().split()
+
+        word_count = 0
+
+        for query_word in query_words:
+            for title_word in title:
+                if query_word in title_word:
+                    title.remove(title_word)
+                    word_count += 1
+                    break
+
+        if word_count == len(query_words):
+            results.append(track)
+
+    return results
+
+
+def iter_queue(player) -> chain:
+    # iterates over the queue and the recommended songs without copying them.
+    return chain(player.queue, player.queue_autoplay)
@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
 import asyncio
+import queue
 import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from urllib.parse import urlparse
 
 import disnake
 import yt_dlp
 
+from utils.db import TTLCache
 from utils.music.errors import GenericError
 from utils.music.models import PartialTrack
 
@@ -42,81 +47,247 @@ YTDL_OPTS = {
     }
 }
 
+_worker_ydl: Optional[yt_dlp.YoutubeDL] = None
+
+
+def _init_worker(opts: dict):
+    # loads the extractors once per process (the first extraction of each worker doesn't pay this cost).
+    global _worker_ydl
+    _worker_ydl = yt_dlp.YoutubeDL(opts)
+    yt_dlp.list_extractors()
+
+
+def _worker_extract_info(url: str) -> dict:
+    # sanitize_info returns only plain (picklable) data.
+    return _worker_ydl.sanitize_info(_worker_ydl.extract_info(url=url, download=False))
+
+
+def _worker_ping():
+    return True
+
+
 class YTDLTools:
 
-    extractors = [
-        {
-            "name": type(e).__name__.lower(),
-            "ie_key": e.ie_key(),
-            "regex": e._VALID_URL,
-            "age_limit": e.age_limit
-        } for e in yt_dlp.list_extractors() if e._VALID_URL
-    ]
+    _extractors: Optional[list] = None
 
-    def extract_info(self, url: str):
-        return yt_dlp.YoutubeDL(YTDL_OPTS).extract_info(url=url, download=False)
+    def __init__(self, opts: Optional[dict] = None, pool_size: int = 4, cache_ttl: int = 300, cache_size: int = 500,
+                 process_workers: int = 0, timeout: float = 30, max_concurrency: int = 8):
+        self.opts = opts or YTDL_OPTS
+        self.pool_size = pool_size
+        self._ydl_pool = queue.SimpleQueue()
+        # the media urls returned by the extractors expire after some time (short ttl).
+        self.cache = TTLCache(ttl=cache_ttl, max_size=cache_size)
+        self._host_candidates = {}
+        # process mode: the extraction (cpu heavy) runs in separate processes instead of the default thread pool.
+        self.process_workers = process_workers
+        self.timeout = timeout
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+        self.stats = {"queued": 0, "running": 0, "completed": 0, "errors": 0, "timeouts": 0, "max_queued": 0}
 
-    async def get_track_info(self, url: str, user: disnake.Member = None, loop = None):
+    def get_process_pool(self) -> ProcessPoolExecutor:
+        if not self.process_pool:
+            self.process_pool = ProcessPoolExecutor(max_workers=self.process_workers, initializer=_init_worker,
+                                                    initargs=(self.opts,))
+        return self.process_pool
 
-        for e in self.extractors:
+    def recycle_process_pool(self):
+        # a worker stuck in an extraction would keep using a slot of the pool: the pool is replaced
+        # (and the stuck workers are finished) instead of returning the slot.
+        if not (pool := self.process_pool):
+            return
 
-            if not (matches := re.compile(e['regex']).match(url)) or not matches.groups():
-                continue
+        self.process_pool = None
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
 
-            if any(ee in e["name"] for ee in exclude_extractors):
-                continue
+        for p in processes:
+            try:
+                p.terminate()
+            except Exception:
+                pass
 
-            if e["age_limit"] > 17 and e["ie_key"] != "Twitter":
-                raise GenericError("**This link contains content for over 18!**")
+    async def warmup(self):
+        # starts all the workers in advance.
+        if self.process_workers > 0:
+            loop = asyncio.get_running_loop()
+            pool = self.get_process_pool()
+            await asyncio.gather(*[loop.run_in_executor(pool, _worker_ping) for _ in range(self.process_workers)])
+
+    def close(self):
+        if self.process_pool:
+            self.process_pool.shutdown(wait=False, cancel_futures=True)
+            self.process_pool = None
+
+    async def extract_info_process(self, url: str, loop=None) -> dict:
+
+        if not loop:
+            loop = asyncio.get_running_loop()
+
+        self.stats["queued"] += 1
+        self.stats["max_queued"] = max(self.stats["max_queued"], self.stats["queued"])
+
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.stats["queued"] -= 1
+
+        self.stats["running"] += 1
+
+        try:
+            while True:
+                pool = self.get_process_pool()
+                future = pool.submit(_worker_extract_info, url)
+                try:
+                    data = await asyncio.wait_for(asyncio.wrap_future(future, loop=loop), timeout=self.timeout)
+                    break
+                except asyncio.CancelledError:
+                    # the pool was recycled by another extraction before this one started (run it in the new pool).
+                    if future.cancelled() and pool is not self.process_pool:
+                        continue
+                    raise
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            self.recycle_process_pool()
+            raise GenericError("**The link took too long to be processed...**")
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self.stats["running"] -= 1
+            self._semaphore.release()
+
+        self.stats["completed"] += 1
+        return data
+
+    @property
+    def extractors(self) -> list:
+
+        # built only on first use (listing the extractors is slow and delays the startup).
+        if YTDLTools._extractors is None:
+            YTDLTools._extractors = [
+                {
+                    "name": type(e).__name__.lower(),
+                    "ie_key": e.ie_key(),
+                    "regex": e._VALID_URL if isinstance(e._VALID_URL, (list, tuple)) else (e._VALID_URL,),
+                    "compiled": None,
+                    "excluded": any(ee in type(e).__name__.lower() for ee in exclude_extractors),
+                    "age_limit": e.age_limit
+                } for e in yt_dlp.list_extractors() if e._VALID_URL
+            ]
+
+        return YTDLTools._extractors
+
+    def get_candidates(self, url: str) -> list:
+
+        try:
+            host = urlparse(url).hostname or ""
+        except ValueError:
+            host = ""
+
+        labels = host.split(".")
+        label = labels[-2] if len(labels) > 1 else host
 
+        # only the extractors that mention the site name are tested (keeping the original order).
+        try:
+            return self._host_candidates[label]
+        except KeyError:
+            candidates = [e for e in self.extractors if label and any(label in r for r in e["regex"])]
+            self._host_candidates[label] = candidates
+            return candidates
+
+    def match_extractor(self, url: str) -> Optional[dict]:
+
+        for extractors in (self.get_candidates(url), self.extractors):
+
+            for e in extractors:
+
+                if e["excluded"]:
+                    continue
+
+                if e["compiled"] is None:
+                    e["compiled"] = [re.compile(r) for r in e["regex"]]
+
+                for regex in e["compiled"]:
+                    if (matches := regex.match(url)) and matches.groups():
+                        return e
+
+    def extract_info(self, url: str):
+
+        try:
+            ydl = self._ydl_pool.get_nowait()
+        except queue.Empty:
+            ydl = yt_dlp.YoutubeDL(self.opts)
+
+        try:
+            return ydl.extract_info(url=url, download=False)
+        finally:
+            if self._ydl_pool.qsize() < self.pool_size:
+                self._ydl_pool.put(ydl)
+
+    async def extract(self, url: str, loop=None) -> dict:
+
+        if (data := self.cache.get(url)) is not None:
+            return data
+
+        if self.process_workers > 0:
+            data = await self.extract_info_process(url, loop=loop)
+        else:
             if not loop:
                 loop = asyncio.get_event_loop()
-
             data = await loop.run_in_executor(None, self.extract_info, url)
 
-            try:
-                if data["_type"] == "playlist":
-                    raise GenericError("**There is currently no support for playlists with the link provided...**")
-            except KeyError:
-                pass
+        self.cache.set(url, data)
+        return data
 
-            try:
-                entrie = data["entries"][0]
-            except KeyError:
-                entrie = data
+    async def get_track_info(self, url: str, user: disnake.Member = None, loop = None):
 
-            try:
-                if entrie["age_limit"] > 17:
-                    raise GenericError("**This link contains content for over 18!**")
-            except KeyError:
-                pass
+        if not (e := self.match_extractor(url)):
+            return
+
+        if e["age_limit"] > 17 and e["ie_key"] != "Twitter":
+            raise GenericError("**This link contains content for over 18!**")
 
-            t = PartialTrack(
-                uri=entrie.get("webpage_url") or url,
-                title=entrie["title"],
-                author=entrie["uploader"],
-                thumb=entrie["thumbnail"],
-                duration=entrie["duration"] * 1000,
-                requester=user.id,
-                source_name=entrie["extractor"],
-            )
+        data = await self.extract(url, loop=loop)
 
-            t.info.update({
-                "search_uri": entrie["url"],
-                "authors": entrie["uploader"]
-            })
+        try:
+            if data["_type"] == "playlist":
+                raise GenericError("**There is currently no support for playlists with the link provided...**")
+        except KeyError:
+            pass
 
-            return [t]
+        try:
+            entrie = data["entries"][0]
+        except KeyError:
+            entrie = data
+
+        try:
+            if entrie["age_limit"] > 17:
+                raise GenericError("**This link contains content for over 18!**")
+        except KeyError:
+            pass
+
+        t = PartialTrack(
+            uri=entrie.get("webpage_url") or url,
+            title=entrie["title"],
+            author=entrie["uploader"],
+            thumb=entrie["thumbnail"],
+            duration=entrie["duration"] * 1000,
+            requester=user.id,
+            source_name=entrie["extractor"],
+        )
+
+        t.info.update({
+            "search_uri": entrie["url"],
+            "authors": entrie["uploader"]
+        })
+
+        return [t]
 
 if __name__ == "__main__":
 
     ydl = YTDLTools()
     url = "https://www.youtube.com/channel/UC9AiU8Srqw7iPu3UcR9IJ8g"
-    for e in ydl.extractors:
-
-        if e['ie_key'] == "Generic":
-            continue
 
-        a = re.compile(e['regex']).match(url)
-        if a:
-            print(e['ie_key'], e['name'])
+    if e := ydl.match_extractor(url):
+        print(e['ie_key'], e['name'])
@@ -15,6 +15,7 @@ from disnake.ext import commands
 
 from utils.db import DBModel
 from utils.music.errors import GenericError, ArgumentParsingError
+from utils.music.track_queue import iter_queue, match_tracks
 
 if TYPE_CHECKING:
     from utils.client import BotCore
@@ -728,21 +729,38 @@ def queue_track_index(inter: disnake.AppCmdInter, bot: BotCore, query: str, matc
     except:
         unique_id = None
 
-    query_split = query.lower().split()
+    if unique_id is not None:
 
-    tracklist = []
+        if track := player.queue.get_track(unique_id):
+            return [(player.queue.index(track), track,)]
 
-    count = int(match_count)
+        for counter, track in enumerate(player.queue_autoplay):
+            if unique_id == track.unique_id:
+                return [(len(player.queue) + counter, track,)]
 
-    for counter, track in enumerate(player.queue + player.queue_autoplay):
+        if match_count < 2:
+            return []
 
-        if unique_id is not None:
+    if not case_sensitive:
 
-            if unique_id == track.unique_id:
-                return [(counter, track,)]
+        tracklist = [(player.queue.index(t), t) for t in player.queue.search(query, limit=int(match_count))]
 
-            if match_count < 2:
-                continue
+        if len(tracklist) < match_count:
+            tracklist.extend(
+                (len(player.queue) + player.queue_autoplay.index(t), t) for t in
+                match_tracks(player.queue_autoplay, query)[:int(match_count) - len(tracklist)]
+            )
+
+        if tracklist:
+            return tracklist
+
+    query_split = query.lower().split()
+
+    tracklist = []
+
+    count = int(match_count)
+
+    for counter, track in enumerate(iter_queue(player)):
 
         if case_sensitive:
 
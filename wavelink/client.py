@@ -22,15 +22,16 @@ SOFTWARE.
 """
 import asyncio
 import logging
-from json import dumps
 from typing import Optional, Union
 
 import aiohttp
 from disnake.ext import commands
 
+from .codec import get_codec
 from .errors import *
 from .node import Node
 from .player import Player
+from .player_state import PlayerStateTable
 
 __log__ = logging.getLogger(__name__)
 
@@ -53,14 +54,23 @@ class Client:
 
         return super().__new__(cls)
 
-    def __init__(self, bot: Union[commands.Bot, commands.AutoShardedBot], *, session: aiohttp.ClientSession = None):
+    def __init__(self, bot: Union[commands.Bot, commands.AutoShardedBot], *, session: aiohttp.ClientSession = None,
+                 request_limit: int = 0, track_cache=None, event_queue_size: int = 2000,
+                 event_lane_timeout: float = 10, player_update_tick: float = 1.0, json_codec: Optional[str] = None):
         self.bot = bot
         self.loop = bot.loop or asyncio.get_event_loop()
         self.session = session or aiohttp.ClientSession()
+        self.request_limit = request_limit
+        self.event_queue_size = event_queue_size
+        self.event_lane_timeout = event_lane_timeout
+        self.player_states = PlayerStateTable(self.loop, tick=player_update_tick)
+        self.track_cache = track_cache
 
         self.nodes = {}
 
-        self._dumps = dumps
+        # encoder/decoder of the websocket frames and REST bodies (orjson/msgspec when installed).
+        self.codec = get_codec(json_codec)
+        self._dumps = self.codec.dumps
 
         if not hasattr(bot, "music"):
             bot.music = self
@@ -395,7 +405,11 @@ class Client:
                     user_agent=user_agent,
                     auto_reconnect=auto_reconnect,
                     dumps=self._dumps,
+                    codec=self.codec,
                     version=kwargs.pop("version", 3),
+                    request_limit=kwargs.pop("request_limit", self.request_limit),
+                    event_queue_size=kwargs.pop("event_queue_size", self.event_queue_size),
+                    event_lane_timeout=kwargs.pop("event_lane_timeout", self.event_lane_timeout),
                     **kwargs)
 
         await node.connect()
@@ -426,6 +440,13 @@ class Client:
 
         await node.destroy()
 
+    def close(self) -> None:
+        """Cancel the pending batch of player states and discard the pending states.
+
+        Should be called when the bot is closing (the nodes are not destroyed).
+        """
+        self.player_states.close()
+
     async def update_handler(self, data) -> None:
         if not data or 't' not in data:
             return
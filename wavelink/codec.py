@@ -0,0 +1,196 @@
+"""MIT License
+
+Copyright (c) 2019-2020 PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import json
+import logging
+from typing import Any, Dict, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+__log__ = logging.getLogger(__name__)
+
+
+class JSONCodec:
+    """JSON encoder/decoder used for the websocket frames and the REST bodies of the nodes.
+
+    Attributes
+    ------------
+    name: str
+        The name of the library used by the codec.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize the object to UTF-8 encoded JSON."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """Deserialize a JSON document (str or bytes)."""
+        return json.loads(data)
+
+    def __repr__(self):
+        return f"<JSONCodec name={self.name}>"
+
+
+class OrjsonCodec(JSONCodec):
+
+    name = "orjson"
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+
+    name = "msgspec"
+
+    def __init__(self):
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._decoder.decode(data)
+
+
+CODECS = {
+    "orjson": (OrjsonCodec, orjson),
+    "msgspec": (MsgspecCodec, msgspec),
+    "json": (JSONCodec, json),
+}
+
+
+def available_codecs() -> list:
+    """Returns the names of the codecs that can be used in this environment (fastest first)."""
+    return [name for name, (_, module) in CODECS.items() if module is not None]
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """Returns a codec instance.
+
+    Parameters
+    ------------
+    name: Optional[str]
+        orjson, msgspec or json. When not informed (or "auto") the fastest installed library is used.
+        If the requested library is not installed the stdlib json is used.
+    """
+    name = (name or "auto").lower()
+
+    if name == "auto":
+        name = available_codecs()[0]
+
+    try:
+        codec_cls, module = CODECS[name]
+    except KeyError:
+        __log__.warning(f"CODEC | Unknown json codec: {name} (using json)")
+        return JSONCodec()
+
+    if module is None:
+        __log__.warning(f"CODEC | {name} is not installed (using json)")
+        return JSONCodec()
+
+    return codec_cls()
+
+
+def _sample_loadtracks(size: int) -> Dict[str, Any]:
+
+    return {
+        "loadType": "playlist",
+        "data": {
+            "info": {"name": "Benchmark playlist", "selectedTrack": -1},
+            "pluginInfo": {},
+            "tracks": [
+                {
+                    "encoded": "QAAA" + "x" * 220 + str(i),
+                    "info": {
+                        "identifier": f"id{i:09d}",
+                        "isSeekable": True,
+                        "author": f"Artist {i % 97} - Topic",
+                        "length": 180000 + i,
+                        "isStream": False,
+                        "position": 0,
+                        "title": f"Track number {i} (Official Audio) ♪",
+                        "uri": f"https://www.youtube.com/watch?v=id{i:09d}",
+                        "artworkUrl": f"https://i.ytimg.com/vi/id{i:09d}/maxresdefault.jpg",
+                        "isrc": None,
+                        "sourceName": "youtube",
+                    },
+                    "pluginInfo": {},
+                    "userData": {},
+                } for i in range(size)
+            ]
+        }
+    }
+
+
+def benchmark(sizes=(1, 100, 5000), rounds: int = 20) -> Dict[str, Dict[int, tuple]]:
+    """Measure the average encode/decode time (in milliseconds) of each available codec using
+    loadtracks-like payloads with the given number of tracks."""
+    import time
+
+    results = {}
+
+    for name in available_codecs():
+
+        codec = get_codec(name)
+        results[name] = {}
+
+        for size in sizes:
+
+            raw = JSONCodec().dumps(_sample_loadtracks(size))
+            obj = codec.loads(raw)
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                codec.loads(raw)
+            decode = (time.perf_counter() - start) / rounds * 1000
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                codec.dumps(obj)
+            encode = (time.perf_counter() - start) / rounds * 1000
+
+            results[name][size] = (decode, encode, len(raw))
+
+    return results
+
+
+if __name__ == "__main__":
+
+    for codec_name, data in benchmark().items():
+        for tracks, (decode_ms, encode_ms, length) in data.items():
+            print(f"{codec_name:>8} | {tracks:>5} tracks ({length / 1024:.0f} KiB) | "
+                  f"decode: {decode_ms:.3f} ms | encode: {encode_ms:.3f} ms")
@@ -0,0 +1,201 @@
+"""MIT License
+
+Copyright (c) 2019-2020 PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import asyncio
+import logging
+import time
+import traceback
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+__log__ = logging.getLogger(__name__)
+
+# upper bounds (in seconds) of the event latency histograms.
+EVENT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, float("inf"))
+
+# ops where only the most recent frame of a lane matters.
+COALESCED_OPS = ("playerUpdate", "stats")
+
+
+class EventDispatcher:
+    """Bounded dispatcher for the frames received by the node websocket.
+
+    Frames of the same guild are handled serially in a lane (keeping the order of events like
+    TrackEnd and TrackStart) while different guilds run concurrently. Frames without a guild (ready and
+    stats) share the node lane.
+
+    Attributes
+    ------------
+    max_pending: int
+        The maximum of frames waiting to be processed. When reached the oldest pending playerUpdate/stats
+        frame is dropped and, if there is none, :meth:`put` waits until a lane consumes a frame.
+    lane_timeout: float
+        Seconds a lane waits for the handler of an event before moving to the next frame (the handler
+        keeps running in background). 0 means no limit.
+    stats: dict
+        Frames received/processed/dropped, errors, slow events, current and max queue depth, active lanes and
+        the queue wait/processing latency histograms.
+    """
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], Awaitable[None]], *, loop: asyncio.AbstractEventLoop,
+                 max_pending: int = 2000, lane_timeout: float = 10):
+        self.handler = handler
+        self.loop = loop
+        self.max_pending = max(max_pending, 1)
+        self.lane_timeout = lane_timeout or None
+
+        self.lanes: Dict[Optional[int], Deque[list]] = {}
+        self.workers: Dict[Optional[int], asyncio.Task] = {}
+        self.pending = 0
+        self._coalesced: Dict[Tuple[Optional[int], str], list] = {}
+        self._space = asyncio.Event()
+        self._space.set()
+
+        self.stats = {
+            "received": 0,
+            "processed": 0,
+            "dropped": 0,
+            "errors": 0,
+            "slow": 0,
+            "max_depth": 0,
+            "wait_latency": {bucket: 0 for bucket in EVENT_LATENCY_BUCKETS},
+            "process_latency": {bucket: 0 for bucket in EVENT_LATENCY_BUCKETS},
+        }
+
+    def get_stats(self) -> dict:
+        """Returns the dispatcher metrics including the current queue depth and number of lanes."""
+        return {**self.stats, "depth": self.pending, "lanes": len(self.workers)}
+
+    def _drop(self, item: list):
+        item[0] = None
+        self.pending -= 1
+        self.stats["dropped"] += 1
+
+    async def put(self, data: Dict[str, Any]) -> None:
+        """Queue a frame in the lane of its guild, waiting if the dispatcher is full."""
+        op = data.get("op")
+
+        try:
+            key = int(data["guildId"])
+        except (KeyError, TypeError, ValueError):
+            key = None
+
+        self.stats["received"] += 1
+
+        if op in COALESCED_OPS:
+            # a newer state makes the pending one obsolete (drop-oldest).
+            if old := self._coalesced.pop((key, op), None):
+                self._drop(old)
+
+        while self.pending >= self.max_pending:
+
+            if self._coalesced:
+                self._drop(self._coalesced.pop(next(iter(self._coalesced))))
+                continue
+
+            self._space.clear()
+            await self._space.wait()
+
+        item = [data, time.perf_counter(), op]
+
+        try:
+            self.lanes[key].append(item)
+        except KeyError:
+            self.lanes[key] = deque([item])
+
+        self.pending += 1
+
+        if self.pending > self.stats["max_depth"]:
+            self.stats["max_depth"] = self.pending
+
+        if op in COALESCED_OPS:
+            self._coalesced[(key, op)] = item
+
+        if key not in self.workers:
+            self.workers[key] = self.loop.create_task(self._run_lane(key))
+
+    async def _run_lane(self, key: Optional[int]):
+
+        lane = self.lanes[key]
+
+        try:
+            while lane:
+
+                data, enqueued, op = item = lane.popleft()
+
+                if data is None:
+                    continue
+
+                self.pending -= 1
+
+                if op in COALESCED_OPS and self._coalesced.get((key, op)) is item:
+                    del self._coalesced[(key, op)]
+
+                if self.pending < self.max_pending:
+                    self._space.set()
+
+                start = time.perf_counter()
+                self.stats["wait_latency"][next(b for b in EVENT_LATENCY_BUCKETS if start - enqueued <= b)] += 1
+
+                try:
+                    if op == "event" and self.lane_timeout:
+                        task = self.loop.create_task(self.handler(data))
+                        done, _ = await asyncio.wait({task}, timeout=self.lane_timeout)
+                        if not done:
+                            self.stats["slow"] += 1
+                            __log__.warning(f"DISPATCHER | Slow event handler (guild: {key}):: {data.get('type')}")
+                            task.add_done_callback(self._task_done)
+                        else:
+                            task.result()
+                    else:
+                        await self.handler(data)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    self.stats["errors"] += 1
+                    traceback.print_exc()
+
+                elapsed = time.perf_counter() - start
+                self.stats["processed"] += 1
+                self.stats["process_latency"][next(b for b in EVENT_LATENCY_BUCKETS if elapsed <= b)] += 1
+
+        finally:
+            for item in lane:
+                if item[0] is not None:
+                    self._drop(item)
+                    if self._coalesced.get((key, item[2])) is item:
+                        del self._coalesced[(key, item[2])]
+            lane.clear()
+            del self.lanes[key]
+            del self.workers[key]
+            if self.pending < self.max_pending:
+                self._space.set()
+
+    def _task_done(self, task: asyncio.Task):
+        if not task.cancelled() and (exc := task.exception()):
+            self.stats["errors"] += 1
+            traceback.print_exception(type(exc), exc, exc.__traceback__)
+
+    def clear(self) -> None:
+        """Cancel the lanes and discard every pending frame."""
+        for task in list(self.workers.values()):
+            task.cancel()
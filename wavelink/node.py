@@ -25,16 +25,25 @@ import inspect
 import json
 import logging
 import os
+import time
+from contextlib import asynccontextmanager
+from copy import deepcopy
 from typing import Any, Callable, Dict, Optional, Union
 from urllib.parse import quote
 
+import aiohttp
+
 from .backoff import ExponentialBackoff
+from .codec import JSONCodec, get_codec
 from .errors import *
 from .player import Player, Track, TrackPlaylist
 from .websocket import WebSocket
 
 __log__ = logging.getLogger(__name__)
 
+# upper bounds (in seconds) of the REST request latency histogram.
+REQUEST_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float("inf"))
+
 
 class Node:
     """A WaveLink Node instance.
@@ -54,6 +63,16 @@ class Node:
         The region provided to the node on connection.
     identifier: str
         The unique indentifier associated with the node.
+    request_limit: int
+        The maximum of concurrent REST requests per route (loadtracks, players and decodetrack). 0 means unlimited.
+    request_stats: dict
+        The REST request metrics per route (in-flight, total requests, errors and latency histogram).
+    event_queue_size: int
+        The maximum of websocket frames waiting to be processed by the per-guild lanes.
+    event_lane_timeout: float
+        Seconds a guild lane waits for an event handler before processing the next frame.
+    codec: :class:`wavelink.codec.JSONCodec`
+        The JSON codec used to decode the websocket frames and encode/decode the REST bodies.
     """
 
     def __init__(self, host: str,
@@ -95,6 +114,7 @@ class Node:
         self.session_id: Optional[int] = None
 
         self._dumps = dumps
+        self.codec: JSONCodec = kwargs.get("codec") or get_codec()
 
         self.shard_id = shard_id
 
@@ -102,6 +122,15 @@ class Node:
 
         self.session = session
         self._websocket = None
+
+        self.request_limit: int = kwargs.get("request_limit") or 0
+        self._request_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.request_stats: Dict[str, dict] = {}
+        self._pending_loads: Dict[tuple, list] = {}
+        self.event_queue_size: int = kwargs.get("event_queue_size") or 2000
+        self.event_lane_timeout: float = kwargs.get("event_lane_timeout", 10)
+        # limits the background track searches of the players of this node (created by the bot on first use).
+        self.prefetch_semaphore: Optional[asyncio.Semaphore] = None
         self._client = client
 
         self.hook = None
@@ -142,6 +171,14 @@ class Node:
 
         return self.stats.penalty.total
 
+    @property
+    def event_stats(self) -> dict:
+        """Returns the metrics of the websocket event dispatcher (queue depth, dropped frames and latencies)."""
+        try:
+            return self._websocket.dispatcher.get_stats()
+        except AttributeError:
+            return {}
+
     @property
     def headers(self) -> Dict[str, str]:
         return {
@@ -150,6 +187,47 @@ class Node:
             "Client-Name": f"Wavelink/custom",
         }
 
+    @asynccontextmanager
+    async def rest_request(self, route: str, method: str, url: str, **kwargs):
+        """Make a REST request to the node within the connection budget of the given route,
+        recording the request metrics."""
+        semaphore = self._request_semaphores.get(route)
+
+        if semaphore is None and self.request_limit > 0:
+            semaphore = self._request_semaphores[route] = asyncio.Semaphore(self.request_limit)
+
+        try:
+            stats = self.request_stats[route]
+        except KeyError:
+            stats = self.request_stats[route] = {
+                "in_flight": 0,
+                "requests": 0,
+                "errors": 0,
+                "latency": {bucket: 0 for bucket in REQUEST_LATENCY_BUCKETS},
+            }
+
+        if semaphore:
+            await semaphore.acquire()
+
+        stats["in_flight"] += 1
+        start = time.perf_counter()
+
+        try:
+            async with self.session.request(method, url, **kwargs) as resp:
+                if resp.status >= 400:
+                    stats["errors"] += 1
+                yield resp
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            stats["errors"] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            stats["in_flight"] -= 1
+            stats["requests"] += 1
+            stats["latency"][next(b for b in REQUEST_LATENCY_BUCKETS if elapsed <= b)] += 1
+            if semaphore:
+                semaphore.release()
+
     async def connect(self, *args, **kwargs) -> None:
 
         if not self._websocket:
@@ -164,6 +242,8 @@ class Node:
                                         secure=self.secure,
                                         dumps=self._dumps,
                                         auto_reconnect=self.auto_reconnect,
+                                        event_queue_size=self.event_queue_size,
+                                        event_lane_timeout=self.event_lane_timeout,
                                         **kwargs,
                                         )
 
@@ -180,19 +260,22 @@ class Node:
 
         uri: str = f"{self.rest_uri}/v4/sessions/{self.session_id}/players/{guild_id}?noReplace={no_replace}"
 
-        async with self.session.patch(url=uri, json=data, headers=self._websocket.headers) as resp:
+        async with self.rest_request("players", "PATCH", uri, data=self.codec.dumps(data),
+                                     headers={**self._websocket.headers, "Content-Type": "application/json"}) as resp:
+
+            body = await resp.read()
 
             try:
-                resp_data = await resp.json()
+                resp_data = self.codec.loads(body)
             except:
-                resp_data = await resp.text()
+                resp_data = body.decode(errors="replace")
 
             if resp.status == 200:
                 return resp_data
 
             raise WavelinkException(f"UpdatePlayer Failed: {resp.status}: {resp_data}")
 
-    async def get_tracks(self, query: str, *, retry_on_failure: bool = True, **kwargs) -> Union[list, TrackPlaylist, None]:
+    async def get_tracks(self, query: str, *, retry_on_failure: bool = True, use_cache: bool = True, **kwargs) -> Union[list, TrackPlaylist, None]:
         """|coro|
 
         Search for and return a list of Tracks for the given query.
@@ -206,6 +289,8 @@ class Node:
             Bool indicating whether the Node should retry upto a maximum of 5 attempts on load failure.
             If this is set to True, the Node will attempt to retrieve tracks with an exponential backoff delay
             between retries. Defaults to True.
+        use_cache: bool
+            Whether the result can be fetched from (and stored in) the track cache of the client. Defaults to True.
 
         Returns
         ---------
@@ -213,13 +298,70 @@ class Node:
             A list of or TrackPlaylist instance of :class:`wavelink.player.Track` objects.
             This could be None if no tracks were found.
         """
+        # concurrent searches for the same query on this node share the same request.
+        key = (query, use_cache)
+
+        try:
+            future, waiters = self._pending_loads[key]
+        except KeyError:
+            future = asyncio.get_running_loop().create_future()
+            self._pending_loads[key] = [future, 0]
+            try:
+                data = await self._load_tracks_data(query, retry_on_failure=retry_on_failure, use_cache=use_cache)
+            except BaseException as e:
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+                    future.exception()  # the waiters (if any) retrieve the error.
+                raise
+            else:
+                future.set_result(data)
+            finally:
+                waiters = self._pending_loads.pop(key)[1]
+
+            if waiters:
+                data = deepcopy(data)
+
+        else:
+            self._pending_loads[key][1] += 1
+            try:
+                data = deepcopy(await asyncio.shield(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                return await self.get_tracks(query, retry_on_failure=retry_on_failure, use_cache=use_cache, **kwargs)
+
+        return self._build_tracks(query, data, **kwargs)
+
+    async def _load_tracks_data(self, query: str, *, retry_on_failure: bool = True, use_cache: bool = True):
+
+        cache = self._client.track_cache if use_cache else None
+
+        if not cache:
+            return await self._fetch_tracks_data(query, retry_on_failure=retry_on_failure)
+
+        key = f"v{self.version}:{query}"
+
+        if (data := await cache.get(key)) is not None:
+            return data
+
+        data = await self._fetch_tracks_data(query, retry_on_failure=retry_on_failure)
+
+        if data is not None:
+            await cache.set(key, query, data)
+
+        return data
+
+    async def _fetch_tracks_data(self, query: str, *, retry_on_failure: bool = True):
+
         backoff = ExponentialBackoff(base=1)
 
         base_uri = f'{self.rest_uri}/v4' if self.version == 4 else self.rest_uri
 
         for attempt in range(2):
 
-            async with self.session.get(f"{base_uri}/loadtracks?identifier={quote(query)}", headers={'Authorization': self.password}) as resp:
+            async with self.rest_request("loadtracks", "GET", f"{base_uri}/loadtracks?identifier={quote(query)}", headers={'Authorization': self.password}) as resp:
 
                 if resp.status != 200 and retry_on_failure:
                     retry = backoff.delay()
@@ -235,70 +377,75 @@ class Node:
                     return
 
                 try:
-                    data = await resp.json()
+                    return self.codec.loads(await resp.read())
                 except Exception as e:
                     raise WavelinkException(f"{self.identifier}: Failed to parse json result. | Error: {repr(e)}")
 
-                if isinstance(data, list):
-                    return data
+        __log__.warning(f'REST | {self.identifier} | Failure to load tracks after 5 attempts.')
 
-                loadtype = data.get('loadType')
+    def _build_tracks(self, query: str, data, **kwargs) -> Union[list, TrackPlaylist, None]:
 
-                try:
-                    data = data.pop('data')
-                except KeyError:
-                    pass
+        if data is None:
+            return
 
-                if not loadtype:
-                    raise WavelinkException('There was an error while trying to load this track.')
+        if isinstance(data, list):
+            return data
 
-                if loadtype == 'NO_MATCHES':
-                    __log__.info(f'REST | {self.identifier} | No tracks with query:: <{query}> found.')
-                    return []
+        loadtype = data.get('loadType')
 
-                if loadtype in ('LOAD_FAILED', 'error'):
+        try:
+            data = data.pop('data')
+        except KeyError:
+            pass
 
-                    if self.version == 4:
-                        data['exception'] = data
+        if not loadtype:
+            raise WavelinkException('There was an error while trying to load this track.')
 
-                    try:
-                        error = f"There was an error of severity '{data['exception']['severity']}' while loading tracks.\n\n{data['exception']['message']}"
-                    except KeyError:
-                        error = f"There was an error of severity '{data['exception']['severity']}:\n{data['exception']['error']}"
-                    e = TrackLoadError(error=error, node=self, data=data)
-                    if not e.message:
-                        e.message = data['exception']['error']
-                    raise e
+        if loadtype == 'NO_MATCHES':
+            __log__.info(f'REST | {self.identifier} | No tracks with query:: <{query}> found.')
+            return []
 
-                try:
-                    tracks = data.get('tracks')
-                except AttributeError:
-                    tracks = data
+        if loadtype in ('LOAD_FAILED', 'error'):
 
-                if loadtype == 'track':
-                    tracks = [data]
+            if self.version == 4:
+                data['exception'] = data
 
-                if not tracks:
-                    __log__.info(f'REST | {self.identifier} | No tracks with query:: <{query}> found.')
-                    raise TrackNotFound(f"{self.identifier}: Track not found... | {query}")
+            try:
+                error = f"There was an error of severity '{data['exception']['severity']}' while loading tracks.\n\n{data['exception']['message']}"
+            except KeyError:
+                error = f"There was an error of severity '{data['exception']['severity']}:\n{data['exception']['error']}"
+            e = TrackLoadError(error=error, node=self, data=data)
+            if not e.message:
+                e.message = data['exception']['error']
+            raise e
 
-                encoded_name = "track" if self.version == 3 else "encoded"
+        try:
+            tracks = data.get('tracks')
+        except AttributeError:
+            tracks = data
 
-                if loadtype in ('PLAYLIST_LOADED', 'playlist'):
-                    try:
-                        data['playlistInfo'] = data.pop('info')
-                    except KeyError:
-                        pass
-                    playlist_cls = kwargs.pop('playlist_cls', TrackPlaylist)
-                    return playlist_cls(data=data, url=query, encoded_name=encoded_name, **kwargs)
+        if loadtype == 'track':
+            tracks = [data]
 
-                track_cls = kwargs.pop('track_cls', Track)
+        if not tracks:
+            __log__.info(f'REST | {self.identifier} | No tracks with query:: <{query}> found.')
+            raise TrackNotFound(f"{self.identifier}: Track not found... | {query}")
 
-                tracks = [track_cls(id_=track[encoded_name], info=track['info'], **kwargs) for track in tracks]
+        encoded_name = "track" if self.version == 3 else "encoded"
 
-                return tracks
+        if loadtype in ('PLAYLIST_LOADED', 'playlist'):
+            try:
+                data['playlistInfo'] = data.pop('info')
+            except KeyError:
+                pass
+            playlist_cls = kwargs.pop('playlist_cls', TrackPlaylist)
+            return playlist_cls(data=data, url=query, encoded_name=encoded_name, **kwargs)
 
-        __log__.warning(f'REST | {self.identifier} | Failure to load tracks after 5 attempts.')
+        track_cls = kwargs.pop('track_cls', Track)
+
+        tracks = [track_cls(id_=track[encoded_name], info=track['info'], **kwargs) for track in tracks]
+
+        return tracks
 
     async def build_track(self, identifier: str) -> Track:
         """|coro|
@@ -320,10 +467,10 @@ class Node:
         BuildTrackError
             Decoding and building the track failed.
         """
-        async with self.session.get(f'{self.rest_uri}/decodetrack?',
-                                    headers={'Authorization': self.password},
-                                    params={'track': identifier}) as resp:
-            data = await resp.json()
+        async with self.rest_request("decodetrack", "GET", f'{self.rest_uri}/decodetrack?',
+                                     headers={'Authorization': self.password},
+                                     params={'track': identifier}) as resp:
+            data = self.codec.loads(await resp.read())
 
             if not resp.status == 200:
                 raise BuildTrackError(f'Failed to build track. Status: {data["status"]}, Error: {data["error"]}.'
@@ -407,11 +554,15 @@ class Node:
 
         try:
             self._websocket._task.cancel()
+            self._websocket.dispatcher.clear()
         except Exception:
             pass
 
         del self._client.nodes[self.identifier]
 
+        if not self._client.nodes:
+            self._client.player_states.close()
+
     async def _send(self, **data) -> None:
         __log__.debug(f'NODE | Sending payload:: <{data}> ({self.__repr__()})')
         await self._websocket._send(**data)
@@ -36,7 +36,7 @@ from .eqs import *
 from .errors import *
 from .events import *
 
-__all__ = ('Track', 'TrackPlaylist', 'Player')
+__all__ = ('Track', 'TrackInfo', 'TrackPlaylist', 'Player')
 __log__ = logging.getLogger(__name__)
 
 
@@ -83,9 +83,93 @@ class WavelinkVoiceClient(VoiceClient):
         self.cleanup()
 
 
+YOUTUBE_ID_REGEX = re.compile(r"^[a-zA-Z0-9_-]{11}$")
+
+# marks the lazy attributes that were not computed yet.
+MISSING = object()
+
+# values repeated in many tracks (authors, source names, requesters) share the same object.
+INTERN_MAX_SIZE = 50000
+_interned = {}
+
+
+def intern_value(value):
+    """Returns a shared instance of an equal str/int value (the table is reset when it gets too big)."""
+    if type(value) not in (str, int):
+        return value
+
+    try:
+        return _interned[value]
+    except KeyError:
+        if len(_interned) >= INTERN_MAX_SIZE:
+            _interned.clear()
+        _interned[value] = value
+        return value
+
+
+class TrackInfo:
+    """Compact record with the track info returned by the node.
+
+    The fields are stored in slots instead of a dict per track. Fields missing (or null) in the node
+    response are stored as None and left out by :meth:`to_dict`, other keys are kept in ``others``.
+    """
+
+    __slots__ = ('identifier',
+                 'is_seekable',
+                 'author',
+                 'length',
+                 'is_stream',
+                 'position',
+                 'title',
+                 'uri',
+                 'source_name',
+                 'artwork_url',
+                 'isrc',
+                 'others')
+
+    keys = (('identifier', 'identifier'),
+            ('isSeekable', 'is_seekable'),
+            ('author', 'author'),
+            ('length', 'length'),
+            ('isStream', 'is_stream'),
+            ('position', 'position'),
+            ('title', 'title'),
+            ('uri', 'uri'),
+            ('sourceName', 'source_name'),
+            ('artworkUrl', 'artwork_url'),
+            ('isrc', 'isrc'))
+
+    attrs = dict(keys)
+
+    def __init__(self, info: dict):
+        get = info.get
+        self.identifier = get('identifier')
+        self.is_seekable = get('isSeekable')
+        self.author = intern_value(get('author'))
+        self.length = get('length')
+        self.is_stream = get('isStream')
+        self.position = get('position')
+        self.title = get('title')
+        self.uri = get('uri')
+        self.source_name = intern_value(get('sourceName'))
+        self.artwork_url = get('artworkUrl')
+        self.isrc = get('isrc')
+        self.others = {k: v for k, v in info.items() if k not in self.attrs} or None
+
+    def to_dict(self) -> dict:
+        """Returns the info as the dict returned by the node."""
+        data = {key: value for key, attr in self.keys if (value := getattr(self, attr)) is not None}
+        if self.others:
+            data.update(self.others)
+        return data
+
+
 class Track:
     """Wavelink Track object.
 
+    The info received from the node is kept in a compact :class:`TrackInfo` record and the info dict is only
+    created when :attr:`info` is accessed (after that the dict is used by all the attributes).
+
     Attributes
     ------------
     id: str
@@ -113,43 +197,126 @@ class Track:
     """
 
     __slots__ = ('id',
-                 'info',
                  'query',
-                 'title',
-                 'identifier',
-                 'ytid',
-                 'length',
-                 'duration',
-                 'uri',
-                 'author',
-                 'is_stream',
                  'dead',
-                 'thumb')
+                 '_record',
+                 '_info',
+                 '_ytid',
+                 '_thumb')
 
-    def __init__(self, id_, info: dict, query: str = None, *args, **kwargs):
+    def __init__(self, id_, info: Union[dict, TrackInfo], query: str = None, *args, **kwargs):
         self.id = id_
-        self.info = info
         self.query = query
-
-        self.title = info.get('title', '')[:97]
-        self.identifier = info.get('identifier', '')
-        self.ytid = self.identifier if re.match(r"^[a-zA-Z0-9_-]{11}$", self.identifier) else None
-        self.length = info.get('length')
-        self.duration = self.length
-        self.uri = info.get('uri')
-        self.author = info.get('author', '')[:97]
-
-        self.is_stream = info.get('isStream')
         self.dead = False
 
-        if self.ytid:
-            self.thumb = f"https://img.youtube.com/vi/{self.ytid}/hqdefault.jpg"
-        else:
-            self.thumb = None
+        self._record = info if isinstance(info, TrackInfo) else TrackInfo(info)
+        self._info = None
+        self._ytid = MISSING
+        self._thumb = MISSING
 
     def __str__(self):
         return self.title
 
+    def _get(self, key: str):
+        if self._info is not None:
+            return self._info.get(key)
+        return getattr(self._record, TrackInfo.attrs[key])
+
+    def _set(self, key: str, value):
+        if self._info is not None:
+            self._info[key] = value
+        else:
+            setattr(self._record, TrackInfo.attrs[key], value)
+
+    def _build_info(self) -> dict:
+        return self._record.to_dict()
+
+    def to_dict(self) -> dict:
+        """Returns a new dict with the track info (without creating the :attr:`info` dict)."""
+        if self._info is not None:
+            return dict(self._info)
+        return self._build_info()
+
+    @property
+    def info(self) -> dict:
+        if self._info is None:
+            self._info = self._build_info()
+            self._record = None
+        return self._info
+
+    @info.setter
+    def info(self, value: dict):
+        self._info = value
+        self._record = None
+
+    @property
+    def title(self) -> str:
+        return (self._get('title') or '')[:97]
+
+    @title.setter
+    def title(self, value: str):
+        self._set('title', value)
+
+    @property
+    def identifier(self) -> str:
+        return self._get('identifier') or ''
+
+    @property
+    def ytid(self) -> Optional[str]:
+        if self._ytid is MISSING:
+            self._ytid = self.identifier if YOUTUBE_ID_REGEX.match(self.identifier) else None
+        return self._ytid
+
+    @property
+    def length(self) -> int:
+        return self._get('length')
+
+    @property
+    def duration(self) -> int:
+        return self._get('length')
+
+    @duration.setter
+    def duration(self, value: int):
+        self._set('length', value)
+
+    @property
+    def source_name(self) -> Optional[str]:
+        return self._get('sourceName')
+
+    @property
+    def isrc(self) -> Optional[str]:
+        return self._get('isrc')
+
+    @isrc.setter
+    def isrc(self, value: Optional[str]):
+        self._set('isrc', value)
+
+    @property
+    def uri(self) -> Optional[str]:
+        return self._get('uri')
+
+    @uri.setter
+    def uri(self, value: str):
+        self._set('uri', value)
+
+    @property
+    def author(self) -> str:
+        return (self._get('author') or '')[:97]
+
+    @property
+    def is_stream(self) -> bool:
+        return self._get('isStream')
+
+    @property
+    def thumb(self) -> Optional[str]:
+        if self._thumb is MISSING:
+            self._thumb = f"https://img.youtube.com/vi/{self.ytid}/hqdefault.jpg" if self.ytid else None
+        return self._thumb
+
+    @thumb.setter
+    def thumb(self, value: Optional[str]):
+        self._thumb = value
+
     @property
     def is_dead(self):
         return self.dead
@@ -167,9 +334,11 @@ class TrackPlaylist:
     """
 
     def __init__(self, data: dict, **kwargs):
-        self.data = data
         encoded_name = kwargs.pop("encoded_name", "track")
-        self.tracks = [kwargs.pop("track_cls", Track)(id_=track[encoded_name], info=track['info']) for track in data['tracks']]
+        track_cls = kwargs.pop("track_cls", Track)
+        self.tracks = [track_cls(id_=track[encoded_name], info=track['info']) for track in data.pop('tracks')]
+        # the raw track dicts are not kept (the tracks have their own compact records).
+        self.data = data
 
 
 class Player:
@@ -196,6 +365,9 @@ class Player:
         self.guild_id = guild_id
         self.node = node
 
+        # the position/ping values are kept in the state table of the client (shared by all nodes).
+        self._states = node._client.player_states
+
         self.last_update = None
         self.last_position = None
         self.position_timestamp = None
@@ -253,13 +425,44 @@ class Player:
 
         return min(position, self.current.duration)
 
-    async def update_state(self, state: dict) -> None:
-        state = state['state']
+    @property
+    def last_position(self) -> Optional[int]:
+        return self._states.get(self.guild_id, "last_position")
+
+    @last_position.setter
+    def last_position(self, value: Optional[int]):
+        self._states.set(self.guild_id, "last_position", value)
 
-        self.last_update = time.time() * 1000
-        self.last_position = state.get('position', 0)
-        self.position_timestamp = state.get('time', 0)
-        self.ping = state.get('ping', None)
+    @property
+    def last_update(self) -> Optional[float]:
+        return self._states.get(self.guild_id, "last_update")
+
+    @last_update.setter
+    def last_update(self, value: Optional[float]):
+        self._states.set(self.guild_id, "last_update", value)
+
+    @property
+    def position_timestamp(self) -> Optional[int]:
+        return self._states.get(self.guild_id, "position_timestamp")
+
+    @position_timestamp.setter
+    def position_timestamp(self, value: Optional[int]):
+        self._states.set(self.guild_id, "position_timestamp", value)
+
+    @property
+    def ping(self) -> Optional[int]:
+        return self._states.get(self.guild_id, "ping")
+
+    @ping.setter
+    def ping(self, value: Optional[int]):
+        self._states.set(self.guild_id, "ping", value)
+
+    def can_update_position(self) -> bool:
+        """Whether the position reported by the node in playerUpdate should replace the player position."""
+        return True
+
+    async def update_state(self, state: dict) -> None:
+        self._states.apply(self, state['state'])
 
     async def _voice_server_update(self, data) -> None:
         self._voice_state.update({
@@ -504,6 +707,8 @@ class Player:
             del self.node.players[self.guild_id]
         except KeyError:
             pass
+        else:
+            self._states.release(self.guild_id)
 
     async def set_eq(self, equalizer: Equalizer) -> None:
         """|coro|
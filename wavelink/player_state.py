@@ -0,0 +1,195 @@
+"""MIT License
+
+Copyright (c) 2019-2020 PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import asyncio
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+# typecode of each column (ints for the values in milliseconds reported by the node).
+STATE_FIELDS = {
+    "last_position": "q",
+    "last_update": "d",
+    "position_timestamp": "q",
+    "ping": "q",
+}
+
+# values used in the int/float columns to represent None.
+NULL_INT = -(2 ** 63)
+NULL_FLOAT = float("nan")
+
+
+class PlayerStateTable:
+    """Compact table with the last state reported by the nodes for each player.
+
+    playerUpdate frames are not processed one by one: :meth:`push` only keeps the latest state per guild
+    and the pending states are applied in batches once per tick. Reading a field applies the pending
+    state of that guild first, so the values returned are always up to date.
+
+    Attributes
+    ------------
+    tick: float
+        Seconds between each batch of pending states.
+    stats: dict
+        Number of states received, applied, replaced before being applied (coalesced) and batches.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, *, tick: float = 1.0):
+        self.loop = loop
+        self.tick = tick
+
+        self.slots: Dict[int, int] = {}
+        self._free: List[int] = []
+        self.columns: Dict[str, array] = {name: array(code) for name, code in STATE_FIELDS.items()}
+        self._null = {name: NULL_INT if code == "q" else NULL_FLOAT for name, code in STATE_FIELDS.items()}
+
+        self._pending: Dict[int, Tuple[Any, dict, float]] = {}
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+        self.stats = {"received": 0, "applied": 0, "coalesced": 0, "batches": 0}
+
+    def __len__(self):
+        return len(self.slots)
+
+    def slot(self, guild_id: int) -> int:
+        """Returns the row of the guild in the table, allocating a new one if necessary."""
+        try:
+            return self.slots[guild_id]
+        except KeyError:
+            pass
+
+        if self._free:
+            index = self._free.pop()
+            for name, column in self.columns.items():
+                column[index] = self._null[name]
+        else:
+            index = len(self.columns["last_position"])
+            for name, column in self.columns.items():
+                column.append(self._null[name])
+
+        self.slots[guild_id] = index
+        return index
+
+    def release(self, guild_id: int) -> None:
+        """Remove the guild from the table (the row is reused by the next player)."""
+        self._pending.pop(guild_id, None)
+
+        try:
+            self._free.append(self.slots.pop(guild_id))
+        except KeyError:
+            pass
+
+    def get(self, guild_id: int, field: str):
+
+        if guild_id in self._pending:
+            self.sync(guild_id)
+
+        try:
+            value = self.columns[field][self.slots[guild_id]]
+        except KeyError:
+            return None
+
+        if value == NULL_INT or value != value:
+            return None
+
+        return value
+
+    def set(self, guild_id: int, field: str, value) -> None:
+
+        if field in ("last_position", "last_update"):
+            # a local change (play, seek, pause...) is newer than the pending state reported by the node.
+            self._pending.pop(guild_id, None)
+
+        if value is None:
+            value = self._null[field]
+        elif STATE_FIELDS[field] == "q":
+            value = int(value)
+
+        self.columns[field][self.slot(guild_id)] = value
+
+    def push(self, node, guild_id: int, state: dict) -> None:
+        """Store the state received in a playerUpdate frame to be applied in the next batch."""
+        self.stats["received"] += 1
+
+        if guild_id in self._pending:
+            self.stats["coalesced"] += 1
+
+        self._pending[guild_id] = (node, state, time.time() * 1000)
+
+        if not self._handle:
+            self._handle = self.loop.call_later(self.tick, self.flush)
+
+    def sync(self, guild_id: int) -> None:
+        """Apply the pending state of the guild (if any)."""
+        try:
+            node, state, received = self._pending.pop(guild_id)
+        except KeyError:
+            return
+
+        try:
+            player = node.players[guild_id]
+        except KeyError:
+            return
+
+        self.apply(player, state, received)
+
+    def flush(self) -> None:
+        """Apply every pending state."""
+        self._handle = None
+
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        self.stats["batches"] += 1
+
+        for guild_id, (node, state, received) in pending.items():
+            try:
+                player = node.players[guild_id]
+            except KeyError:
+                # player destroyed or moved to another node.
+                continue
+            self.apply(player, state, received)
+
+    def apply(self, player, state: dict, received: Optional[float] = None) -> None:
+
+        index = self.slot(player.guild_id)
+        columns = self.columns
+
+        if player.can_update_position():
+            columns["last_position"][index] = int(state.get("position", 0))
+
+        columns["last_update"][index] = received or time.time() * 1000
+        columns["position_timestamp"][index] = int(state.get("time", 0))
+
+        if (ping := state.get("ping")) is None:
+            columns["ping"][index] = NULL_INT
+        else:
+            columns["ping"][index] = int(ping)
+
+        self.stats["applied"] += 1
+
+    def close(self) -> None:
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+        self._pending.clear()
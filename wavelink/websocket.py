@@ -29,6 +29,7 @@ from typing import Any, Dict
 import aiohttp
 
 from .backoff import ExponentialBackoff
+from .dispatcher import EventDispatcher
 from .events import *
 from .stats import Stats
 
@@ -55,6 +56,10 @@ class WebSocket:
         self.auto_reconnect = attrs.get('auto_reconnect', True)
         self._dumps = attrs.get('dumps')
 
+        self.dispatcher = EventDispatcher(self.process_data, loop=self.bot.loop,
+                                          max_pending=attrs.get('event_queue_size') or 2000,
+                                          lane_timeout=attrs.get('event_lane_timeout', 10))
+
         self._websocket = None
         self._last_exc = None
         self._task = None
@@ -153,12 +158,20 @@ class WebSocket:
                 __log__.debug(f'WEBSOCKET | Received Payload:: <{msg.data}>')
 
                 try:
-                    json_data = msg.json()
+                    json_data = self._node.codec.loads(msg.data)
                 except Exception:
                     traceback.print_exc()
                     print(repr(msg))
                 else:
-                    self.bot.loop.create_task(self.process_data(json_data))
+                    if json_data.get('op') == 'playerUpdate':
+                        # only the latest state of each player is kept and applied in batches.
+                        try:
+                            self.client.player_states.push(self._node, int(json_data['guildId']), json_data['state'])
+                        except (KeyError, TypeError, ValueError):
+                            pass
+                    else:
+                        # waits here when the dispatcher is full (backpressure on the websocket reading).
+                        await self.dispatcher.put(json_data)
 
     async def process_data(self, data: Dict[str, Any]):
         op = data.get('op', None)
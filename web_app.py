@@ -291,8 +291,8 @@ class WSClient:
 
     async def connect(self):
 
-        if not self.session:
-            self.session = aiohttp.ClientSession()
+        if not self.session or self.session.closed:
+            self.session = self.pool.get_http_session()
 
         self.connection = await self.session.ws_connect(self.url, heartbeat=30)
 